@@ -1,18 +1,120 @@
-import io
+import functools
+import os
+import tempfile
+import threading
+import time
+import uuid
 import warnings
-import zipfile
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import CancelledError
 from datetime import datetime
+from pathlib import Path
 
-import matplotlib.pyplot as plt
-import numpy as np
 import pandas as pd
-import seaborn as sns
 import streamlit as st
-from matplotlib.ticker import FuncFormatter
-from scipy import stats
+
+from visual_lab import engine, pairplot, store
+from visual_lab.datasets import (
+    BUILTIN_LOADERS,
+    FALLBACK_LOADERS,
+    DatasetRegistry,
+    enable_copy_on_write,
+)
+from visual_lab.density import DEFAULT_DENSITY_ROWS, DENSITY_ROW_OPTIONS
+from visual_lab.export import ZipEntry, ZipExport
+from visual_lab.figures import FigureManager, png_size
+from visual_lab.gallery import GalleryRef, GalleryStore, make_thumbnail
+from visual_lab.profile import DatasetProfile
+from visual_lab.render_cache import RenderCache, make_key
+from visual_lab.sampling import (
+    DEFAULT_PAIRPLOT_SAMPLE,
+    DEFAULT_ROW_BUDGET,
+    MAX_PAIRPLOT_SAMPLE,
+    ROW_BUDGET_OPTIONS,
+)
+from visual_lab.specs import (
+    CompareDistribution,
+    CompareRelationship,
+    MatplotlibBar,
+    MatplotlibBox,
+    MatplotlibHistogram,
+    MatplotlibLine,
+    MatplotlibScatter,
+    MatplotlibSubplots,
+    OverviewCorrelation,
+    OverviewDistribution,
+    PlotSpec,
+    SeabornCategory,
+    SeabornDistribution,
+    SeabornHeatmap,
+    SeabornPairplot,
+    SeabornRelationship,
+    spec_from_dict,
+    spec_to_dict,
+)
+from visual_lab.workers import (
+    DEFAULT_MAX_QUEUE,
+    DEFAULT_PER_SESSION,
+    DEFAULT_WORKERS,
+    WAIT_WINDOW,
+    QueueFull,
+    RenderJob,
+    RenderPool,
+    init_worker,
+    render_job,
+)
 
 warnings.filterwarnings("ignore")
 
+RERUN_STARTED = time.perf_counter()
+# Figure rasterizations during this rerun, by purpose (module globals are rebuilt per rerun).
+RERUN_RENDERS: Counter[str] = Counter()
+
+# Display renders use st.pyplot's default resolution, capped at the widest image
+# st.image shows unchanged (wider ones it decodes, resizes and re-encodes on
+# every call). Exports use the DPI slider.
+DISPLAY_DPI = 200
+DISPLAY_MAX_WIDTH = 1460
+RENDER_CACHE_MB = int(os.getenv("VISUAL_LAB_RENDER_CACHE_MB", "128"))
+RECYCLE_FIGURES = os.getenv("VISUAL_LAB_RECYCLE_FIGURES", "0") == "1"
+ARROW_STRINGS = os.getenv("VISUAL_LAB_ARROW_STRINGS", "0") == "1"
+DENSITY_ROWS = int(os.getenv("VISUAL_LAB_DENSITY_ROWS", str(DEFAULT_DENSITY_ROWS)))
+# Render worker processes shared by all sessions (0 renders on the script thread),
+# renders allowed to wait for one, and renders one session may run at once.
+RENDER_WORKERS = int(os.getenv("VISUAL_LAB_RENDER_WORKERS", str(DEFAULT_WORKERS)))
+RENDER_QUEUE = int(os.getenv("VISUAL_LAB_RENDER_QUEUE", str(DEFAULT_MAX_QUEUE)))
+SESSION_RENDERS = int(os.getenv("VISUAL_LAB_SESSION_RENDERS", str(DEFAULT_PER_SESSION)))
+RENDER_POLL_SECONDS = 0.2
+# How long a background render (ZIP entry, PNG download) waits for room in a full queue.
+EXPORT_QUEUE_SECONDS = 60.0
+GALLERY_DIR = Path(
+    os.getenv("VISUAL_LAB_GALLERY_DIR", Path(tempfile.gettempdir()) / "visual_lab_gallery")
+)
+GALLERY_MB = int(os.getenv("VISUAL_LAB_GALLERY_MB", "512"))
+GALLERY_SESSION_MB = int(os.getenv("VISUAL_LAB_GALLERY_SESSION_MB", "64"))
+# More live figures than this after a rerun means something is not released.
+FIGURE_LEAK_THRESHOLD = 8
+
+RENDER_ACTIVE_VIEW = "Active view only"
+RENDER_ALL_TABS = "All tabs"
+# Widget keys owned by each view. Buttons (and download buttons) cannot be
+# assigned through Session State, so keys with these markers are left alone.
+VIEW_WIDGET_PREFIXES = {
+    "Overview": ("ov_",),
+    "Seaborn builder": ("sb_family", "sb_dist_", "sb_rel_", "sb_cat_", "sb_hm_", "sb_multi_"),
+    "Matplotlib builder": ("mpl_",),
+    "Compare": ("cmp_",),
+    "Gallery": ("gal_",),
+}
+BUTTON_KEY_MARKERS = ("_save", "_clear", "_btn", "_dl")
+RERUN_HISTORY = 50
+GALLERY_PAGE_SIZE = 6
+ZIP_POLL_SECONDS = 0.5
+
+# Shared datasets are handed out as shallow copies; Copy-on-Write keeps them read-only.
+enable_copy_on_write()
+
 # ==================== PAGE CONFIG ====================
 st.set_page_config(
     page_title="Seaborn & Matplotlib Visual Lab",
@@ -192,90 +294,310 @@ st.markdown(
 )
 
 # ==================== SESSION STATE ====================
+# The gallery holds GalleryRef handles; the images live in the shared GalleryStore.
 if "gallery" not in st.session_state:
     st.session_state["gallery"] = []
 
+if "gallery_session" not in st.session_state:
+    st.session_state["gallery_session"] = uuid.uuid4().hex
+
 if "export_dpi" not in st.session_state:
     st.session_state["export_dpi"] = 300
 
+if "rerun_timings" not in st.session_state:
+    st.session_state["rerun_timings"] = []
+
 
 # ==================== HELPERS ====================
-def use_theme(context: str = "notebook", style: str = "whitegrid", palette: str = "deep") -> None:
-    sns.set_theme(context=context, style=style)
-    sns.set_palette(palette)
-    plt.rcParams.update(
-        {
-            "figure.figsize": (10, 6),
-            "savefig.dpi": 300,
-            "figure.dpi": 150,
-            "axes.spines.top": False,
-            "axes.spines.right": False,
-            "figure.autolayout": True,
-            "grid.alpha": 0.3,
-            "grid.linestyle": "--",
-            "font.size": 10,
-            "axes.labelsize": 11,
-            "axes.titlesize": 13,
-            "legend.fontsize": 9,
-        }
-    )
+@st.cache_resource(show_spinner=False)
+def get_dataset_registry() -> DatasetRegistry:
+    return DatasetRegistry(BUILTIN_LOADERS, fallback=FALLBACK_LOADERS, arrow_strings=ARROW_STRINGS)
 
 
-def apply_dark(fig: plt.Figure, dark: bool = False) -> None:
-    if not dark:
-        return
-    fig.patch.set_facecolor("#020617")
-    for ax in fig.get_axes():
-        ax.set_facecolor("#020617")
-        ax.tick_params(colors="#e5e7eb")
-        for spine in ax.spines.values():
-            spine.set_color("#4b5563")
-        for item in [ax.title, ax.xaxis.label, ax.yaxis.label]:
-            if item:
-                item.set_color("#e5e7eb")
-        for t in ax.get_xticklabels() + ax.get_yticklabels():
-            t.set_color("#e5e7eb")
-        legend = ax.get_legend()
-        if legend:
-            legend.get_frame().set_facecolor("#020617")
-            for text in legend.get_texts():
-                text.set_color("#e5e7eb")
-
-
-@st.cache_data
-def load_builtin_data() -> dict:
-    return {
-        "Tips": sns.load_dataset("tips"),
-        "Penguins": sns.load_dataset("penguins").dropna(),
-        "Flights": sns.load_dataset("flights"),
-        "Iris": sns.load_dataset("iris"),
-        "Diamonds (1K sample)": sns.load_dataset("diamonds").sample(1000, random_state=42),
-        "Titanic": sns.load_dataset("titanic"),
-        "Car Crashes": sns.load_dataset("car_crashes"),
-    }
+@st.cache_resource(show_spinner=False, max_entries=32)
+def get_dataset_profile(fingerprint: str, _df: pd.DataFrame) -> DatasetProfile:
+    """Profile of the dataset with this fingerprint (the frame itself is not hashed)."""
+    return DatasetProfile.from_frame(_df)
+
+
+@st.cache_resource(show_spinner=False)
+def get_render_cache() -> RenderCache:
+    return RenderCache(max_bytes=RENDER_CACHE_MB * 1024 * 1024)
 
 
-def save_to_gallery(fig: plt.Figure, name: str, description: str) -> None:
-    buf = io.BytesIO()
-    dpi = st.session_state.get("export_dpi", 300)
-    fig.savefig(
-        buf,
-        dpi=dpi,
-        bbox_inches="tight",
-        format="png",
-        facecolor=fig.get_facecolor(),
+@st.cache_resource(show_spinner=False)
+def get_render_pool() -> RenderPool | None:
+    if RENDER_WORKERS <= 0:
+        return None
+    return RenderPool(
+        RENDER_WORKERS,
+        RENDER_QUEUE,
+        SESSION_RENDERS,
+        initializer=init_worker,
+        initargs=(ARROW_STRINGS,),
     )
-    buf.seek(0)
-    st.session_state["gallery"].append(
-        {
-            "name": name,
-            "description": description,
-            "image": buf.getvalue(),
-            "timestamp": datetime.now(),
-        }
+
+
+@st.cache_resource(show_spinner=False)
+def get_gallery_store() -> GalleryStore:
+    return GalleryStore(
+        GALLERY_DIR,
+        max_bytes=GALLERY_MB * 1024 * 1024,
+        session_max_bytes=GALLERY_SESSION_MB * 1024 * 1024,
     )
 
 
+@st.cache_resource(show_spinner=False)
+def get_figure_manager() -> FigureManager:
+    return FigureManager(recycle=RECYCLE_FIGURES)
+
+
+def pooled_render(
+    job: RenderJob,
+    session: str,
+    slot: str,
+    local: Callable[[], bytes],
+    interactive: bool = True,
+    cancelled: Callable[[], bool] | None = None,
+) -> bytes:
+    """Render `job` on the worker pool, or with `local` when there is no pool.
+
+    On the script thread (`interactive`) the wait shows the queue position.
+    Writing it lets Streamlit stop the wait when the user reruns the script;
+    a render that has not started by then is dropped. Background callers
+    give up with `QueueFull` after EXPORT_QUEUE_SECONDS of a full queue, and
+    with `CancelledError` as soon as `cancelled()` is true.
+    """
+    pool = get_render_pool()
+    if pool is None:
+        return local()
+    status = st.empty() if interactive else None
+
+    def show(text: str) -> None:
+        if status is not None:
+            status.caption(text)
+
+    def check() -> None:
+        if cancelled is not None and cancelled():
+            raise CancelledError
+
+    deadline = None if interactive else time.monotonic() + EXPORT_QUEUE_SECONDS
+    ticket = None
+    try:
+        while ticket is None:
+            check()
+            try:
+                ticket = pool.submit(session, slot, render_job, job)
+            except QueueFull:
+                if deadline is not None and time.monotonic() > deadline:
+                    raise
+                show("Render queue is full, waiting for a free place...")
+                time.sleep(RENDER_POLL_SECONDS)
+        while not ticket.wait(RENDER_POLL_SECONDS):
+            check()
+            ahead = ticket.position()
+            show("Rendering..." if ahead is None else f"Queued behind {ahead} render(s)...")
+        return ticket.result()
+    finally:
+        if ticket is not None:
+            ticket.cancel()
+        if status is not None:
+            status.empty()
+
+
+def render_png(spec: PlotSpec) -> bytes:
+    """Display PNG for `spec` on the current dataset and theme, rendered only on a cache miss.
+
+    The same bytes are shown by st.image and downscaled into the gallery thumbnail.
+    """
+    key = make_key(dataset_fp, spec_to_dict(spec), theme, DISPLAY_DPI, DISPLAY_MAX_WIDTH)
+
+    def _render() -> bytes:
+        RERUN_RENDERS["display"] += 1
+        job = RenderJob(
+            dataset_label, dataset_fp, spec_to_dict(spec), theme, DISPLAY_DPI, DISPLAY_MAX_WIDTH
+        )
+        return pooled_render(
+            job,
+            st.session_state["gallery_session"],
+            "display",
+            lambda: engine.render(
+                spec,
+                df,
+                theme,
+                DISPLAY_DPI,
+                figures=figures,
+                profile=profile,
+                max_width=DISPLAY_MAX_WIDTH,
+            ),
+        )
+
+    png = get_render_cache().get_or_render(key, _render)
+    if png_size(png)[0] > DISPLAY_MAX_WIDTH:
+        RERUN_RENDERS["resized by st.image"] += 1
+    return png
+
+
+def budget_rows() -> int:
+    """Rows a point-level plot may draw under the sidebar row budget."""
+    return min(len(df), row_budget)
+
+
+def show_row_budget_note(n_rows: int) -> None:
+    if n_rows > row_budget:
+        st.caption(f"Sampled {row_budget:,} of {n_rows:,} rows (row budget per plot).")
+
+
+def use_density() -> bool:
+    """Whether scatter plots bin every row into a grid instead of drawing points."""
+    return len(df) > density_rows
+
+
+def show_sampling_note(spec: PlotSpec) -> None:
+    if getattr(spec, "density", False):
+        st.caption(
+            f"Density view: all {len(df):,} rows binned into a grid "
+            f"(scatter plots switch above {density_rows:,} rows)."
+        )
+    elif getattr(spec, "rows", None):
+        show_row_budget_note(len(df))
+
+
+def save_to_gallery(spec: PlotSpec, name: str, description: str) -> bool:
+    """Store a thumbnail of the display render plus what is needed to re-render `spec`."""
+    settings = {"dataset": dataset_label, "spec": spec_to_dict(spec), "theme": theme}
+    thumbnail = make_thumbnail(render_png(spec))
+    RERUN_RENDERS["thumbnail"] += 1
+    ref = get_gallery_store().put(
+        st.session_state["gallery_session"], thumbnail, name, description, settings
+    )
+    if ref is None:
+        st.warning("This image is larger than the gallery budget.")
+        return False
+    st.session_state["gallery"].append(ref)
+    return True
+
+
+def gallery_refs() -> list[GalleryRef]:
+    """This session's gallery entries that have not been evicted from the store."""
+    refs = get_gallery_store().live(st.session_state["gallery"])
+    st.session_state["gallery"] = refs
+    return refs
+
+
+def gallery_png(
+    ref: GalleryRef,
+    dpi: int,
+    session: str,
+    slot: str = "download",
+    cancelled: Callable[[], bool] | None = None,
+) -> bytes:
+    """Full-resolution PNG of a gallery entry, rendered when it is first downloaded.
+
+    Runs outside the script thread (ZIP export, deferred download), so `session`
+    is passed in rather than read. PNG downloads and the ZIP export use their
+    own queue slots, so neither supersedes the other's queued render.
+    """
+    settings = ref.settings
+    entry = datasets.entry(settings["dataset"])
+    key = make_key(entry.fingerprint, settings["spec"], settings["theme"], dpi)
+
+    def _render() -> bytes:
+        RERUN_RENDERS["export"] += 1
+        job = RenderJob(
+            settings["dataset"], entry.fingerprint, settings["spec"], settings["theme"], dpi
+        )
+        return pooled_render(
+            job,
+            session,
+            slot,
+            lambda: engine.render(
+                spec_from_dict(settings["spec"]),
+                entry.frame.copy(deep=False),
+                settings["theme"],
+                dpi,
+                figures=figures,
+                profile=get_dataset_profile(entry.fingerprint, entry.frame),
+            ),
+            interactive=False,
+            cancelled=cancelled,
+        )
+
+    return get_render_cache().get_or_render(key, _render)
+
+
+def start_gallery_zip(refs: list[GalleryRef], dpi: int, include_manifest: bool) -> None:
+    """Build the gallery ZIP in the background, replacing any export in progress."""
+    cancel_gallery_zip()
+    session = st.session_state["gallery_session"]
+    stop = threading.Event()
+    entries, plots = [], []
+    for idx, ref in enumerate(refs):
+        filename = f"{idx + 1:02d}_{ref.name.replace(' ', '_')}.png"
+        render = functools.partial(gallery_png, ref, dpi, session, "zip", stop.is_set)
+        entries.append(ZipEntry(filename, render))
+        plots.append(
+            {
+                "file": filename,
+                "name": ref.name,
+                "description": ref.description,
+                "saved": datetime.fromtimestamp(ref.created).isoformat(timespec="seconds"),
+                "dpi": dpi,
+                **ref.settings,
+            }
+        )
+    now = datetime.now()
+    manifest = {"generated": now.isoformat(timespec="seconds"), "plots": plots}
+    st.session_state["gallery_zip"] = ZipExport(
+        entries,
+        manifest if include_manifest else None,
+        name=f"visual_lab_gallery_{now:%Y%m%d_%H%M%S}.zip",
+        stop=stop,
+    ).start()
+
+
+def cancel_gallery_zip() -> None:
+    job = st.session_state.pop("gallery_zip", None)
+    if job is not None:
+        job.cancel()
+
+
+def show_gallery_zip() -> None:
+    """Progress of the background ZIP export, then its download button."""
+    job: ZipExport | None = st.session_state.get("gallery_zip")
+    if job is None:
+        return
+    polling = not job.finished
+
+    @st.fragment(run_every=ZIP_POLL_SECONDS if polling else None)
+    def status() -> None:
+        if not job.finished:
+            st.progress(job.done / max(job.total, 1), text=f"Rendering {job.done}/{job.total}")
+            return
+        if polling:
+            st.rerun()  # a full rerun redefines the fragment without polling
+        if job.error:
+            st.error(f"ZIP export failed: {job.error}")
+            return
+        st.download_button(
+            "Download ZIP",
+            data=job.read,
+            file_name=job.name,
+            mime="application/zip",
+            width="stretch",
+            key="gal_zip_dl",
+        )
+        st.caption(f"{job.total} images · {job.size() / 1024**2:.1f} MB")
+
+    status()
+
+
+def clear_gallery() -> None:
+    cancel_gallery_zip()
+    get_gallery_store().remove_session(st.session_state["gallery_session"])
+    st.session_state["gallery"] = []
+
+
 def show_code_example(code: str, description: str = "") -> None:
     if description:
         st.markdown(
@@ -287,6 +609,41 @@ def show_code_example(code: str, description: str = "") -> None:
     st.markdown("</div>", unsafe_allow_html=True)
 
 
+def keep_hidden_view_state() -> None:
+    """Carry the widget values of views that are not drawn in this rerun.
+
+    Streamlit drops the state of widgets that were not rendered in a run, so the
+    values of hidden views are re-assigned through Session State. After a dataset
+    switch they are dropped instead, so column pickers start from the new columns.
+    """
+    state = st.session_state
+    if state.get("perf_render_mode", RENDER_ACTIVE_VIEW) == RENDER_ACTIVE_VIEW:
+        active_view = state.get("nav_view", next(iter(VIEW_WIDGET_PREFIXES)))
+        hidden = tuple(
+            prefix
+            for view, prefixes in VIEW_WIDGET_PREFIXES.items()
+            if view != active_view
+            for prefix in prefixes
+        )
+    else:
+        hidden = ("nav_",)
+
+    dataset_changed = state.get("_state_dataset") not in (None, state.get("sb_dataset"))
+    state["_state_dataset"] = state.get("sb_dataset")
+
+    for key in list(state.keys()):
+        key = str(key)
+        if not key.startswith(hidden) or any(marker in key for marker in BUTTON_KEY_MARKERS):
+            continue
+        if dataset_changed and not key.startswith("nav_"):
+            del state[key]
+        else:
+            state[key] = state[key]
+
+
+figures = get_figure_manager()
+keep_hidden_view_state()
+
 # ==================== HEADER ====================
 st.markdown(
     '<h1 class="main-header">Seaborn & Matplotlib Visual Lab</h1>',
@@ -302,13 +659,42 @@ with st.sidebar:
     st.markdown("### Data settings")
 
     # Built-in datasets only
-    builtin = load_builtin_data()
+    datasets = get_dataset_registry()
     dataset_label = st.selectbox(
         "Built-in only",
-        list(builtin.keys()),
+        datasets.names(),
         key="sb_dataset",
     )
-    df = builtin[dataset_label]
+    try:
+        with st.spinner(f"Loading {dataset_label}..."):
+            df = datasets.get(dataset_label)
+    except (OSError, ValueError):
+        dataset_label = datasets.fallback_name
+        df = datasets.get(dataset_label)
+    if datasets.errors:
+        st.caption(
+            f"{len(datasets.errors)} dataset(s) unavailable offline; "
+            "run `python scripts/vendor_datasets.py` to vendor them."
+        )
+    row_budget = st.select_slider(
+        "Row budget per plot",
+        options=ROW_BUDGET_OPTIONS,
+        value=DEFAULT_ROW_BUDGET,
+        format_func=lambda n: f"{n:,}",
+        key="sb_row_budget",
+        help="Scatter, regression and mean-bar plots sample down to this many rows. "
+        "Line plots are downsampled to the plot width instead; aggregating plots "
+        "always use every row.",
+    )
+    density_rows = st.select_slider(
+        "Density scatter above",
+        options=sorted({*DENSITY_ROW_OPTIONS, DENSITY_ROWS}),
+        value=DENSITY_ROWS,
+        format_func=lambda n: f"{n:,} rows",
+        key="sb_density_rows",
+        help="Larger datasets draw scatter plots as binned 2D densities from every row "
+        "instead of sampled points.",
+    )
 
     st.markdown("---")
 
@@ -331,8 +717,6 @@ with st.sidebar:
             index=0,
             key="sb_palette",
         )
-        use_theme(context, style, palette)
-
         theme_mode = st.radio(
             "Figure mode",
             ["Light", "Dark"],
@@ -342,6 +726,8 @@ with st.sidebar:
         )
         DARK = theme_mode == "Dark"
 
+    theme = {"context": context, "style": style, "palette": palette, "dark": DARK}
+
     st.markdown("---")
 
     st.markdown("### Export settings")
@@ -358,17 +744,31 @@ with st.sidebar:
     if st.session_state["gallery"]:
         st.success(f"{len(st.session_state['gallery'])} plots in gallery")
         if st.button("Clear gallery", key="sb_clear_gallery"):
-            st.session_state["gallery"] = []
+            clear_gallery()
             st.rerun()
 
+    st.markdown("---")
+    st.markdown("### Performance")
+    render_mode = st.radio(
+        "Render mode",
+        [RENDER_ACTIVE_VIEW, RENDER_ALL_TABS],
+        index=0,
+        key="perf_render_mode",
+        help="Run only the selected view, or every tab on each rerun (previous behaviour).",
+    )
+    # Filled at the end of the script so the counters include this rerun.
+    diagnostics = st.container()
+
 # fallback
 if df is None:
-    df = builtin["Tips"]
-    dataset_label = "Tips"
+    dataset_label = datasets.names()[0]
+    df = datasets.get(dataset_label)
+
+dataset_fp = datasets.fingerprint(dataset_label)
+profile = get_dataset_profile(dataset_fp, df)
 
-numeric_cols_all = df.select_dtypes(include=[np.number]).columns.tolist()
-categorical_cols_all = df.select_dtypes(include=["object", "category"]).columns.tolist()
-missing_ratio = float(df.isna().mean().mean() * 100)
+numeric_cols_all = list(profile.numeric_columns)
+categorical_cols_all = list(profile.categorical_columns)
 
 # ==================== TOP METRICS ====================
 st.markdown(
@@ -380,11 +780,11 @@ st.markdown(
   </div>
   <div class="metric-card">
     <div class="metric-card-label">Rows</div>
-    <div class="metric-card-value">{len(df):,}</div>
+    <div class="metric-card-value">{profile.n_rows:,}</div>
   </div>
   <div class="metric-card">
     <div class="metric-card-label">Columns</div>
-    <div class="metric-card-value">{len(df.columns):,}</div>
+    <div class="metric-card-value">{profile.n_columns:,}</div>
   </div>
   <div class="metric-card">
     <div class="metric-card-label">Numeric features</div>
@@ -396,26 +796,16 @@ st.markdown(
   </div>
   <div class="metric-card">
     <div class="metric-card-label">Missing ratio</div>
-    <div class="metric-card-value">{missing_ratio:.1f}%</div>
+    <div class="metric-card-value">{profile.missing_ratio:.1f}%</div>
   </div>
 </div>
 """,
     unsafe_allow_html=True,
 )
 
-# ==================== TABS ====================
-tab_overview, tab_seaborn, tab_mpl, tab_compare, tab_gallery = st.tabs(
-    [
-        "Overview",
-        "Seaborn builder",
-        "Matplotlib builder",
-        "Compare",
-        "Gallery",
-    ]
-)
 
-# ==================== TAB: OVERVIEW ====================
-with tab_overview:
+# ==================== VIEW: OVERVIEW ====================
+def view_overview() -> None:
     st.markdown("## Overview")
     st.markdown(
         '<div class="info-box"><strong>Goal:</strong> Quick health check of the current dataset and a first look at its distributions.</div>',
@@ -428,6 +818,10 @@ with tab_overview:
         st.markdown("### Sample")
         st.dataframe(df.head(10), width="stretch")
 
+        if numeric_cols_all:
+            st.markdown("### Numeric summary")
+            st.dataframe(profile.quantiles.round(3), width="stretch")
+
         if numeric_cols_all:
             st.markdown("### Quick distribution")
             dist_col = st.selectbox(
@@ -435,43 +829,24 @@ with tab_overview:
                 numeric_cols_all,
                 key="ov_dist_col",
             )
-            fig, ax = plt.subplots(figsize=(10, 4))
-            sns.histplot(df, x=dist_col, bins=30, kde=True, ax=ax)
-            ax.set_title(f"{dist_col} distribution", fontsize=13, fontweight="bold")
-            apply_dark(fig, DARK)
-            st.pyplot(fig)
+
+            png = render_png(OverviewDistribution(x=dist_col))
+            st.image(png, width="stretch")
 
     with col_right:
         st.markdown("### Types & missing")
-        schema_data = {
-            "column": df.columns,
-            "dtype": df.dtypes.astype(str),
-            "missing_%": (df.isna().mean() * 100).round(1),
-        }
-        schema_df = pd.DataFrame(schema_data)
-        st.dataframe(schema_df, height=260, width="stretch")
+        st.dataframe(profile.schema(), height=260, width="stretch")
 
         if len(numeric_cols_all) >= 2:
             st.markdown("### Small correlation view")
             cols_small = numeric_cols_all[: min(4, len(numeric_cols_all))]
-            corr = df[cols_small].corr()
-            fig2, ax2 = plt.subplots(figsize=(4, 4))
-            sns.heatmap(
-                corr,
-                annot=True,
-                fmt=".2f",
-                cmap="vlag",
-                center=0,
-                square=True,
-                cbar=False,
-                ax=ax2,
-            )
-            ax2.set_title("Correlation (subset)", fontsize=11, fontweight="bold")
-            apply_dark(fig2, DARK)
-            st.pyplot(fig2)
 
-# ==================== TAB: SEABORN BUILDER ====================
-with tab_seaborn:
+            png = render_png(OverviewCorrelation(columns=cols_small))
+            st.image(png, width="stretch")
+
+
+# ==================== VIEW: SEABORN BUILDER ====================
+def view_seaborn_builder() -> None:
     st.markdown("## Seaborn builder")
     st.markdown(
         '<div class="info-box"><strong>Goal:</strong> Build Seaborn plots by selecting columns and options. The code snippet updates automatically.</div>',
@@ -508,7 +883,7 @@ with tab_seaborn:
 
             code_str = ""
             description = ""
-            fig_seaborn = None
+            spec_seaborn = None
 
             if family == "Distribution":
                 kind = st.selectbox(
@@ -640,8 +1015,8 @@ with tab_seaborn:
                     order_top = st.slider(
                         "Top categories",
                         3,
-                        min(15, df[cat_var].nunique()),
-                        min(8, df[cat_var].nunique()),
+                        min(15, profile.n_unique[cat_var]),
+                        min(8, profile.n_unique[cat_var]),
                         key="sb_cat_top",
                     )
 
@@ -656,6 +1031,12 @@ with tab_seaborn:
                         default=numeric_cols_all[: min(6, len(numeric_cols_all))],
                         key="sb_hm_vars",
                     )
+                hm_method = st.selectbox(
+                    "Method",
+                    ["Pearson", "Spearman", "Kendall"],
+                    key="sb_hm_method",
+                    help="Spearman and Kendall are rank-based: robust to outliers and monotone trends.",
+                )
                 annot_hm = st.checkbox(
                     "Show values",
                     value=True,
@@ -681,9 +1062,12 @@ with tab_seaborn:
                 sample_n = st.slider(
                     "Sample rows",
                     100,
-                    min(len(df), 1000),
-                    min(400, len(df)),
+                    min(len(df), MAX_PAIRPLOT_SAMPLE),
+                    min(DEFAULT_PAIRPLOT_SAMPLE, len(df)),
+                    step=100,
                     key="sb_multi_sample",
+                    help="With a color column the sample is stratified, so rare "
+                    "categories keep some rows.",
                 )
                 hue_multi = None
                 if categorical_cols_all:
@@ -704,61 +1088,13 @@ with tab_seaborn:
 
             # ------- Distribution -------
             if family == "Distribution" and numeric_cols_all and num_col is not None:
-                fig_seaborn, ax = plt.subplots(figsize=(10, 5))
-
-                if kind == "Histogram":
-                    sns.histplot(
-                        data=df,
-                        x=num_col,
-                        bins=bins,
-                        hue=hue_col,
-                        kde=False,
-                        ax=ax,
-                        log_scale=log_scale,
-                    )
-                elif kind == "KDE":
-                    sns.kdeplot(
-                        data=df,
-                        x=num_col,
-                        hue=hue_col,
-                        fill=True,
-                        ax=ax,
-                        log_scale=log_scale,
-                    )
-                elif kind == "Histogram + KDE":
-                    sns.histplot(
-                        data=df,
-                        x=num_col,
-                        bins=bins,
-                        hue=hue_col,
-                        kde=True,
-                        ax=ax,
-                        log_scale=log_scale,
-                    )
-                elif kind == "Box":
-                    sns.boxplot(
-                        data=df,
-                        x=num_col,
-                        ax=ax,
-                    )
-                elif kind == "Violin":
-                    sns.violinplot(
-                        data=df,
-                        x=num_col,
-                        ax=ax,
-                    )
-                else:  # ECDF
-                    sns.ecdfplot(
-                        data=df,
-                        x=num_col,
-                        hue=hue_col,
-                        ax=ax,
-                    )
-                    ax.yaxis.set_major_formatter(FuncFormatter(lambda y, _: f"{y:.0%}"))
-
-                ax.set_title(f"{kind} for {num_col}", fontsize=13, fontweight="bold")
-                apply_dark(fig_seaborn, DARK)
-                st.pyplot(fig_seaborn)
+                spec_seaborn = SeabornDistribution(
+                    kind=kind,
+                    x=num_col,
+                    hue=hue_col,
+                    bins=bins,
+                    log_scale=log_scale,
+                )
 
                 hue_part = f', hue="{hue_col}"' if hue_col else ""
                 extra_kwargs = ""
@@ -792,43 +1128,15 @@ plt.show()"""
 
             # ------- Relationship -------
             elif family == "Relationship" and len(numeric_cols_all) >= 2 and x_rel is not None:
-                fig_seaborn, ax = plt.subplots(figsize=(10, 5))
-
-                if rel_kind == "Scatter":
-                    sns.scatterplot(
-                        data=df,
-                        x=x_rel,
-                        y=y_rel,
-                        hue=hue_rel,
-                        alpha=alpha_rel,
-                        s=70,
-                        ax=ax,
-                    )
-                elif rel_kind == "Line":
-                    sns.lineplot(
-                        data=df,
-                        x=x_rel,
-                        y=y_rel,
-                        hue=hue_rel,
-                        ax=ax,
-                    )
-                else:  # Regression
-                    sns.regplot(
-                        data=df,
-                        x=x_rel,
-                        y=y_rel,
-                        ax=ax,
-                        scatter_kws={"alpha": alpha_rel, "s": 60},
-                        line_kws={"linewidth": 2},
-                    )
-
-                ax.set_title(
-                    f"{rel_kind}: {y_rel} vs {x_rel}",
-                    fontsize=13,
-                    fontweight="bold",
+                spec_seaborn = SeabornRelationship(
+                    kind=rel_kind,
+                    x=x_rel,
+                    y=y_rel,
+                    hue=hue_rel,
+                    alpha=alpha_rel,
+                    rows=budget_rows(),
+                    density=use_density(),
                 )
-                apply_dark(fig_seaborn, DARK)
-                st.pyplot(fig_seaborn)
 
                 if rel_kind == "Scatter":
                     hue_part = f', hue="{hue_rel}"' if hue_rel else ""
@@ -870,54 +1178,13 @@ plt.show()"""
 
             # ------- Category -------
             elif family == "Category" and categorical_cols_all and cat_var is not None:
-                fig_seaborn, ax = plt.subplots(figsize=(10, 5))
-
-                df_tmp = df.copy()
-                top_cats = df_tmp[cat_var].value_counts().head(order_top).index
-                df_tmp = df_tmp[df_tmp[cat_var].isin(top_cats)]
-
-                if cat_kind == "Count":
-                    sns.countplot(
-                        data=df_tmp,
-                        y=cat_var,
-                        order=top_cats,
-                        ax=ax,
-                    )
-                    for container in ax.containers:
-                        ax.bar_label(container, padding=3)
-                elif cat_kind == "Bar (mean)":
-                    sns.barplot(
-                        data=df_tmp,
-                        y=cat_var,
-                        x=num_cat,
-                        order=top_cats,
-                        ax=ax,
-                        ci=95,
-                    )
-                elif cat_kind == "Box":
-                    sns.boxplot(
-                        data=df_tmp,
-                        y=cat_var,
-                        x=num_cat,
-                        order=top_cats,
-                        ax=ax,
-                    )
-                else:  # Violin
-                    sns.violinplot(
-                        data=df_tmp,
-                        y=cat_var,
-                        x=num_cat,
-                        order=top_cats,
-                        ax=ax,
-                    )
-
-                ax.set_title(
-                    f"{cat_kind} for {cat_var}",
-                    fontsize=13,
-                    fontweight="bold",
+                spec_seaborn = SeabornCategory(
+                    kind=cat_kind,
+                    category=cat_var,
+                    value=num_cat,
+                    top=order_top,
+                    rows=budget_rows(),
                 )
-                apply_dark(fig_seaborn, DARK)
-                st.pyplot(fig_seaborn)
 
                 if cat_kind == "Count":
                     code_str = f"""fig, ax = plt.subplots(figsize=(10, 5))
@@ -934,7 +1201,7 @@ sns.barplot(
     data=df,
     y="{cat_var}",
     x="{num_cat}",
-    ci=95,
+    errorbar=("ci", 95),
     ax=ax,
 )
 ax.set_title("Mean {num_cat} by {cat_var}")
@@ -963,25 +1230,15 @@ plt.show()"""
 
             # ------- Matrix / Heatmap -------
             elif family == "Matrix / Heatmap" and selected_hm:
-                corr = df[selected_hm].corr()
-                fig_seaborn, ax = plt.subplots(figsize=(7, 6))
-                sns.heatmap(
-                    corr,
+                spec_seaborn = SeabornHeatmap(
+                    columns=selected_hm,
+                    method=hm_method,
                     annot=annot_hm,
-                    fmt=".2f",
-                    cmap="vlag",
-                    center=0 if center_zero else None,
-                    square=True,
-                    linewidths=1,
-                    cbar_kws={"shrink": 0.8},
-                    ax=ax,
+                    center_zero=center_zero,
                 )
-                ax.set_title("Correlation heatmap", fontsize=13, fontweight="bold")
-                apply_dark(fig_seaborn, DARK)
-                st.pyplot(fig_seaborn)
 
                 center_value = "0" if center_zero else "None"
-                code_str = f"""corr = df[{selected_hm}].corr()
+                code_str = f"""corr = df[{selected_hm}].corr(method="{hm_method.lower()}")
 fig, ax = plt.subplots(figsize=(7, 6))
 sns.heatmap(
     corr,
@@ -994,32 +1251,31 @@ sns.heatmap(
     cbar_kws={{"shrink": 0.8}},
     ax=ax,
 )
-ax.set_title("Correlation heatmap")
+ax.set_title("Correlation heatmap ({hm_method})")
 plt.show()"""
                 description = "Matrix pattern: scan many pairwise relationships at once."
 
             # ------- Multi-variable (pairplot) -------
             elif family == "Multi-variable" and multi_vars:
                 sample_size = min(sample_n, len(df))
-                cols_to_use = multi_vars + ([hue_multi] if hue_multi else [])
-                df_sample = df[cols_to_use].dropna().sample(sample_size, random_state=42)
-
-                with st.spinner("Building pairplot..."):
-                    g = sns.pairplot(
-                        df_sample,
-                        vars=multi_vars,
-                        hue=hue_multi,
-                        corner=True,
-                        diag_kind="kde",
-                        plot_kws={"alpha": 0.6},
-                        diag_kws={"alpha": 0.7},
-                    )
-                    g.fig.suptitle("Pairplot", y=1.01, fontweight="bold")
-                    fig_seaborn = g.fig
-                    apply_dark(fig_seaborn, DARK)
-                    st.pyplot(fig_seaborn)
+                spec_seaborn = SeabornPairplot(
+                    columns=multi_vars,
+                    hue=hue_multi,
+                    sample=sample_size,
+                )
 
-                code_str = f"""sample = df[{multi_vars + ([hue_multi] if hue_multi else [])}].dropna().sample({sample_n}, random_state=42)
+                complete = f"df[{multi_vars + ([hue_multi] if hue_multi else [])}].dropna()"
+                if hue_multi:
+                    # Approximates the app's stratified sample: an equal share per level.
+                    sample_line = (
+                        f"complete = {complete}\n"
+                        f"per_level = {sample_size} // complete[{hue_multi!r}].nunique()\n"
+                        f"sample = complete.groupby({hue_multi!r}, observed=True, group_keys=False)"
+                        ".apply(lambda g: g.sample(min(len(g), per_level), random_state=42))"
+                    )
+                else:
+                    sample_line = f"sample = {complete}.sample({sample_size}, random_state=42)"
+                code_str = f"""{sample_line}
 g = sns.pairplot(
     sample,
     vars={multi_vars},
@@ -1032,19 +1288,29 @@ g.fig.suptitle("Pairplot", y=1.01)
 plt.show()"""
                 description = "Multi-variable view: every pair of variables in one grid."
 
+            if spec_seaborn is not None:
+                spinner_text = (
+                    "Building pairplot..." if family == "Multi-variable" else "Rendering plot..."
+                )
+                with st.spinner(spinner_text):
+                    png_seaborn = render_png(spec_seaborn)
+                st.image(png_seaborn, width="stretch")
+                show_sampling_note(spec_seaborn)
+
             st.markdown("</div>", unsafe_allow_html=True)
 
         st.markdown("### Code preview")
         if code_str:
             show_code_example(code_str, description)
 
-        if "fig_seaborn" in locals() and fig_seaborn is not None:
+        if spec_seaborn is not None:
             if st.button("Save last Seaborn plot to gallery", key="sb_save_gallery"):
-                save_to_gallery(fig_seaborn, f"Seaborn: {family}", "Seaborn builder plot")
-                st.success("Saved to gallery.")
+                if save_to_gallery(spec_seaborn, f"Seaborn: {family}", "Seaborn builder plot"):
+                    st.success("Saved to gallery.")
+
 
-# ==================== TAB: MATPLOTLIB BUILDER ====================
-with tab_mpl:
+# ==================== VIEW: MATPLOTLIB BUILDER ====================
+def view_matplotlib_builder() -> None:
     st.markdown("## Matplotlib builder")
     st.markdown(
         '<div class="info-box"><strong>Goal:</strong> Build Matplotlib plots with fine-grained control on axes and layouts.</div>',
@@ -1080,7 +1346,7 @@ with tab_mpl:
             )
 
             code_mpl = ""
-            fig_mpl = None
+            spec_mpl = None
 
             if mpl_type == "Line":
                 x_line = st.selectbox(
@@ -1220,24 +1486,13 @@ with tab_mpl:
                 if not numeric_cols_all:
                     st.error("No numeric columns for line plot.")
                 else:
-                    if x_line == "index":
-                        x_vals = np.arange(len(df))
-                        x_label = "Index"
-                    else:
-                        x_vals = df[x_line].values
-                        x_label = x_line
-                    y_vals = df[y_line].values
-
-                    fig_mpl, ax = plt.subplots(figsize=(10, 5))
-                    line_marker = None if marker == "None" else marker
-                    ax.plot(x_vals, y_vals, marker=line_marker, lw=2)
-                    ax.set_title(f"Line: {y_line} over {x_label}", fontsize=13, fontweight="bold")
-                    ax.set_xlabel(x_label)
-                    ax.set_ylabel(y_line)
-                    if use_grid:
-                        ax.grid(alpha=0.3)
-                    apply_dark(fig_mpl, DARK)
-                    st.pyplot(fig_mpl)
+                    x_label = "Index" if x_line == "index" else x_line
+                    spec_mpl = MatplotlibLine(
+                        x=x_line,
+                        y=y_line,
+                        marker=marker,
+                        grid=use_grid,
+                    )
 
                     code_mpl = f"""fig, ax = plt.subplots(figsize=(10, 5))
 ax.plot(
@@ -1256,42 +1511,59 @@ plt.show()"""
                 if len(numeric_cols_all) < 2:
                     st.error("No numeric columns for scatter plot.")
                 else:
-                    fig_mpl, ax = plt.subplots(figsize=(10, 5))
-                    if color_by:
-                        unique_vals = df[color_by].dropna().unique()
-                        cmap = plt.get_cmap("tab10")
-                        for idx, val in enumerate(unique_vals):
-                            mask = df[color_by] == val
-                            ax.scatter(
-                                df.loc[mask, x_sc],
-                                df.loc[mask, y_sc],
-                                alpha=alpha_sc,
-                                s=size_sc,
-                                label=str(val),
-                                color=cmap(idx % 10),
-                            )
-                        ax.legend(title=color_by)
-                    else:
-                        ax.scatter(
-                            df[x_sc],
-                            df[y_sc],
-                            alpha=alpha_sc,
-                            s=size_sc,
-                        )
-                    ax.set_title(f"Scatter: {y_sc} vs {x_sc}", fontsize=13, fontweight="bold")
-                    ax.set_xlabel(x_sc)
-                    ax.set_ylabel(y_sc)
-                    ax.grid(alpha=0.3)
-                    apply_dark(fig_mpl, DARK)
-                    st.pyplot(fig_mpl)
+                    spec_mpl = MatplotlibScatter(
+                        x=x_sc,
+                        y=y_sc,
+                        color_by=color_by,
+                        alpha=alpha_sc,
+                        size=size_sc,
+                        rows=budget_rows(),
+                        density=use_density(),
+                    )
 
-                    code_mpl = f"""fig, ax = plt.subplots(figsize=(10, 5))
+                    n_levels = len(profile.codes.get(color_by)[0]) if color_by else 0
+                    if color_by and n_levels <= engine.SCATTER_LAYER_LEVELS:
+                        # One single-colour layer per level, as the engine draws it.
+                        scatter_code = f"""codes, levels = pd.factorize(df["{color_by}"])
+palette = plt.get_cmap("tab10")(np.arange(len(levels)) % 10)
+for idx, level in enumerate(levels):
+    mask = codes == idx
+    ax.scatter(
+        df["{x_sc}"][mask],
+        df["{y_sc}"][mask],
+        color=palette[idx],
+        alpha={alpha_sc},
+        s={size_sc},
+        label=level,
+    )
+ax.legend(title="{color_by}")"""
+                    elif color_by:
+                        scatter_code = f"""from matplotlib.lines import Line2D
+
+codes, levels = pd.factorize(df["{color_by}"])
+palette = plt.get_cmap("tab10")(np.arange(len(levels)) % 10)
+keep = codes >= 0
 ax.scatter(
+    df["{x_sc}"][keep],
+    df["{y_sc}"][keep],
+    c=palette[codes[keep]],
+    alpha={alpha_sc},
+    s={size_sc},
+)
+handles = [
+    Line2D([], [], marker="o", linestyle="", color=color, alpha={alpha_sc}, label=level)
+    for level, color in zip(levels[:{engine.LEGEND_MAX}], palette)
+]
+ax.legend(handles=handles, title="{color_by}")"""
+                    else:
+                        scatter_code = f"""ax.scatter(
     df["{x_sc}"],
     df["{y_sc}"],
     alpha={alpha_sc},
     s={size_sc},
-)
+)"""
+                    code_mpl = f"""fig, ax = plt.subplots(figsize=(10, 5))
+{scatter_code}
 ax.set_title("Scatter: {y_sc} vs {x_sc}")
 ax.set_xlabel("{x_sc}")
 ax.set_ylabel("{y_sc}")
@@ -1302,47 +1574,25 @@ plt.show()"""
                 if cat_for_bar is None:
                     st.error("Select a categorical column for the bar plot.")
                 else:
-                    grouped = getattr(df.groupby(cat_for_bar)[num_for_bar], agg_bar)()
-                    grouped = grouped.sort_values(ascending=True)
-                    fig_mpl, ax = plt.subplots(figsize=(9, 5))
-                    if horiz:
-                        ax.barh(grouped.index, grouped.values)
-                        ax.set_xlabel(num_for_bar)
-                        ax.set_ylabel(cat_for_bar)
-                    else:
-                        ax.bar(grouped.index, grouped.values)
-                        ax.set_ylabel(num_for_bar)
-                        ax.set_xlabel(cat_for_bar)
-                        plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
-                    ax.set_title(
-                        f"{agg_bar} of {num_for_bar} by {cat_for_bar}",
-                        fontsize=13,
-                        fontweight="bold",
+                    spec_mpl = MatplotlibBar(
+                        category=cat_for_bar,
+                        value=num_for_bar,
+                        agg=agg_bar,
+                        horizontal=horiz,
                     )
-                    ax.grid(axis="x" if horiz else "y", alpha=0.3)
-                    apply_dark(fig_mpl, DARK)
-                    st.pyplot(fig_mpl)
 
-                    code_mpl = f"""grouped = df.groupby("{cat_for_bar}")["{num_for_bar}"].{agg_bar}().sort_values()
+                    code_mpl = f"""grouped = df.groupby("{cat_for_bar}", observed=True)["{num_for_bar}"].{agg_bar}().sort_values()
 fig, ax = plt.subplots(figsize=(9, 5))
 ax.barh(grouped.index, grouped.values) if {horiz} else ax.bar(grouped.index, grouped.values)
 ax.set_title("{agg_bar} of {num_for_bar} by {cat_for_bar}")
 plt.show()"""
 
             elif mpl_type == "Histogram":
-                fig_mpl, ax = plt.subplots(figsize=(9, 5))
-                ax.hist(
-                    df[num_hist].dropna().values,
+                spec_mpl = MatplotlibHistogram(
+                    x=num_hist,
                     bins=bins_hist,
                     density=density_hist,
-                    alpha=0.85,
                 )
-                ax.set_title(f"Histogram of {num_hist}", fontsize=13, fontweight="bold")
-                ax.set_xlabel(num_hist)
-                ax.set_ylabel("Density" if density_hist else "Count")
-                ax.grid(alpha=0.3)
-                apply_dark(fig_mpl, DARK)
-                st.pyplot(fig_mpl)
 
                 code_mpl = f"""fig, ax = plt.subplots(figsize=(9, 5))
 ax.hist(
@@ -1361,21 +1611,14 @@ plt.show()"""
                 if not nums_box:
                     st.warning("Select at least one numeric column.")
                 else:
-                    fig_mpl, ax = plt.subplots(figsize=(10, 5))
-                    ax.boxplot(
-                        [df[c].dropna().values for c in nums_box],
-                        labels=nums_box,
-                        vert=True,
+                    spec_mpl = MatplotlibBox(
+                        columns=nums_box,
                     )
-                    ax.set_title("Box plots", fontsize=13, fontweight="bold")
-                    ax.grid(alpha=0.3)
-                    apply_dark(fig_mpl, DARK)
-                    st.pyplot(fig_mpl)
 
                     code_mpl = f"""fig, ax = plt.subplots(figsize=(10, 5))
 ax.boxplot(
     [{", ".join([f'df["{c}"].dropna().values' for c in nums_box])}],
-    labels={nums_box},
+    tick_labels={nums_box},
 )
 ax.set_title("Box plots")
 ax.grid(alpha=0.3)
@@ -1385,27 +1628,10 @@ plt.show()"""
                 if not nums_over:
                     st.warning("Select at least one numeric column.")
                 else:
-                    k = len(nums_over)
-                    fig_mpl, axes = plt.subplots(
-                        1,
-                        k,
-                        figsize=(4 * k, 4),
-                        squeeze=False,
+                    spec_mpl = MatplotlibSubplots(
+                        columns=nums_over,
+                        kde=use_kde,
                     )
-                    for idx, col_name in enumerate(nums_over):
-                        ax = axes[0, idx]
-                        data = df[col_name].dropna().values
-                        ax.hist(data, bins=30, alpha=0.8, density=True)
-                        if use_kde and len(data) > 10:
-                            x_vals = np.linspace(data.min(), data.max(), 200)
-                            kde = stats.gaussian_kde(data)
-                            ax.plot(x_vals, kde(x_vals), lw=2)
-                        ax.set_title(col_name)
-                        ax.grid(alpha=0.3)
-                    fig_mpl.suptitle("Numeric overview", fontsize=13, fontweight="bold")
-                    plt.tight_layout()
-                    apply_dark(fig_mpl, DARK)
-                    st.pyplot(fig_mpl)
 
                     code_mpl = f"""cols = {nums_over}
 fig, axes = plt.subplots(1, len(cols), figsize=(4 * len(cols), 4), squeeze=False)
@@ -1418,19 +1644,26 @@ for idx, name in enumerate(cols):
 plt.tight_layout()
 plt.show()"""
 
+            if spec_mpl is not None:
+                with st.spinner("Rendering plot..."):
+                    png_mpl = render_png(spec_mpl)
+                st.image(png_mpl, width="stretch")
+                show_sampling_note(spec_mpl)
+
             st.markdown("</div>", unsafe_allow_html=True)
 
         st.markdown("### Code preview")
         if code_mpl:
             show_code_example(code_mpl, "Matplotlib commands that reproduce the current plot.")
 
-        if fig_mpl is not None:
+        if spec_mpl is not None:
             if st.button("Save last Matplotlib plot to gallery", key="mpl_save_gallery"):
-                save_to_gallery(fig_mpl, f"Matplotlib: {mpl_type}", "Matplotlib builder plot")
-                st.success("Saved to gallery.")
+                if save_to_gallery(spec_mpl, f"Matplotlib: {mpl_type}", "Matplotlib builder plot"):
+                    st.success("Saved to gallery.")
 
-# ==================== TAB: COMPARE ====================
-with tab_compare:
+
+# ==================== VIEW: COMPARE ====================
+def view_compare() -> None:
     st.markdown("## Compare Seaborn and Matplotlib")
     st.markdown(
         '<div class="info-box"><strong>Goal:</strong> See the same idea expressed once with Seaborn and once with Matplotlib.</div>',
@@ -1470,42 +1703,29 @@ with tab_compare:
                     )
 
             col_s, col_m = st.columns(2)
+            spec_s = CompareDistribution(
+                library="seaborn",
+                x=num_cmp,
+                hue=hue_cmp,
+            )
 
             with col_s:
                 st.markdown("### Seaborn view")
-                fig_s, ax_s = plt.subplots(figsize=(7, 4))
-                sns.histplot(
-                    data=df,
-                    x=num_cmp,
-                    hue=hue_cmp,
-                    kde=True,
-                    bins=30,
-                    ax=ax_s,
-                )
-                ax_s.set_title("Seaborn: histogram + KDE", fontsize=12, fontweight="bold")
-                apply_dark(fig_s, DARK)
-                st.pyplot(fig_s)
+                st.image(render_png(spec_s), width="stretch")
 
             with col_m:
                 st.markdown("### Matplotlib view")
-                fig_m, ax_m = plt.subplots(figsize=(7, 4))
-                values = df[num_cmp].dropna().values
-                ax_m.hist(values, bins=30, alpha=0.85, density=True)
-                x_vals = np.linspace(values.min(), values.max(), 200)
-                kde = stats.gaussian_kde(values)
-                ax_m.plot(x_vals, kde(x_vals), lw=2)
-                ax_m.set_title("Matplotlib: histogram + KDE", fontsize=12, fontweight="bold")
-                ax_m.set_xlabel(num_cmp)
-                ax_m.set_ylabel("Density")
-                ax_m.grid(alpha=0.3)
-                apply_dark(fig_m, DARK)
-                st.pyplot(fig_m)
+                spec_m = CompareDistribution(
+                    library="matplotlib",
+                    x=num_cmp,
+                )
+                st.image(render_png(spec_m), width="stretch")
 
             if st.button("Save Seaborn comparison plot to gallery", key="cmp_dist_save"):
-                save_to_gallery(
-                    fig_s, "Compare: Distribution", "Seaborn vs Matplotlib distribution"
-                )
-                st.success("Saved Seaborn figure to gallery.")
+                if save_to_gallery(
+                    spec_s, "Compare: Distribution", "Seaborn vs Matplotlib distribution"
+                ):
+                    st.success("Saved Seaborn figure to gallery.")
 
         else:  # Relationship (scatter)
             if len(numeric_cols_all) < 2:
@@ -1536,45 +1756,53 @@ with tab_compare:
                         )
 
                 col_s2, col_m2 = st.columns(2)
+                spec_s2 = CompareRelationship(
+                    library="seaborn",
+                    x=x_cmp,
+                    y=y_cmp,
+                    hue=hue_cmp_rel,
+                    rows=budget_rows(),
+                    density=use_density(),
+                )
 
                 with col_s2:
                     st.markdown("### Seaborn view")
-                    fig_s2, ax_s2 = plt.subplots(figsize=(7, 4))
-                    sns.scatterplot(
-                        data=df,
+                    st.image(render_png(spec_s2), width="stretch")
+
+                with col_m2:
+                    st.markdown("### Matplotlib view")
+                    spec_m2 = CompareRelationship(
+                        library="matplotlib",
                         x=x_cmp,
                         y=y_cmp,
-                        hue=hue_cmp_rel,
-                        alpha=0.7,
-                        s=70,
-                        ax=ax_s2,
+                        rows=budget_rows(),
+                        density=use_density(),
                     )
-                    ax_s2.set_title("Seaborn: scatterplot", fontsize=12, fontweight="bold")
-                    apply_dark(fig_s2, DARK)
-                    st.pyplot(fig_s2)
+                    st.image(render_png(spec_m2), width="stretch")
 
-                with col_m2:
-                    st.markdown("### Matplotlib view")
-                    fig_m2, ax_m2 = plt.subplots(figsize=(7, 4))
-                    ax_m2.scatter(df[x_cmp], df[y_cmp], alpha=0.7)
-                    ax_m2.set_title("Matplotlib: scatter", fontsize=12, fontweight="bold")
-                    ax_m2.set_xlabel(x_cmp)
-                    ax_m2.set_ylabel(y_cmp)
-                    ax_m2.grid(alpha=0.3)
-                    apply_dark(fig_m2, DARK)
-                    st.pyplot(fig_m2)
+                show_sampling_note(spec_s2)
 
                 if st.button("Save Seaborn comparison plot to gallery", key="cmp_rel_save"):
-                    save_to_gallery(
-                        fig_s2, "Compare: Relationship", "Seaborn vs Matplotlib scatter"
-                    )
-                    st.success("Saved Seaborn figure to gallery.")
+                    if save_to_gallery(
+                        spec_s2, "Compare: Relationship", "Seaborn vs Matplotlib scatter"
+                    ):
+                        st.success("Saved Seaborn figure to gallery.")
 
-# ==================== TAB: GALLERY ====================
-with tab_gallery:
+
+# ==================== VIEW: GALLERY ====================
+def view_gallery() -> None:
+    gallery = get_gallery_store()
+    export_dpi = st.session_state["export_dpi"]
     st.markdown("## Gallery")
 
-    if not st.session_state["gallery"]:
+    saved = len(st.session_state["gallery"])
+    refs = gallery_refs()
+    if len(refs) < saved:
+        st.caption(
+            f"{saved - len(refs)} older image(s) were evicted to stay within the gallery budget."
+        )
+
+    if not refs:
         st.info("Gallery is empty. Build a plot in any tab and save it here.")
         st.markdown(
             """
@@ -1587,57 +1815,97 @@ with tab_gallery:
 """
         )
     else:
-        st.success(f"{len(st.session_state['gallery'])} visualizations stored.")
+        st.success(f"{len(refs)} visualizations stored.")
+        st.caption(f"Downloads are rendered at {export_dpi} DPI when requested.")
 
         col_zip, col_clear, _ = st.columns([2, 2, 1])
 
         with col_zip:
-            if st.button("Prepare ZIP archive", key="gal_zip_btn", width="stretch"):
-                zip_buf = io.BytesIO()
-                with zipfile.ZipFile(zip_buf, "w", zipfile.ZIP_DEFLATED) as zf:
-                    for idx, item in enumerate(st.session_state["gallery"]):
-                        filename = f"{idx + 1:02d}_{item['name'].replace(' ', '_')}.png"
-                        zf.writestr(filename, item["image"])
-
-                st.download_button(
-                    "Download ZIP",
-                    data=zip_buf.getvalue(),
-                    file_name=f"visual_lab_gallery_{datetime.now():%Y%m%d_%H%M%S}.zip",
-                    mime="application/zip",
-                    width="stretch",
-                    key="gal_zip_dl",
-                )
+            job = st.session_state.get("gallery_zip")
+            include_manifest = st.checkbox(
+                "Include manifest.json (plot settings)", value=True, key="gal_zip_manifest"
+            )
+            if st.button(
+                "Prepare ZIP archive",
+                key="gal_zip_btn",
+                width="stretch",
+                disabled=job is not None and not job.finished,
+            ):
+                start_gallery_zip(refs, export_dpi, include_manifest)
+            show_gallery_zip()
 
         with col_clear:
             if st.button("Clear gallery", key="gal_clear_btn", width="stretch"):
-                st.session_state["gallery"] = []
+                clear_gallery()
                 st.rerun()
 
         st.markdown("---")
 
+        # Only the current page's thumbnails are read and sent to the browser.
+        n_pages = -(-len(refs) // GALLERY_PAGE_SIZE)
+        page = 1
+        if n_pages > 1:
+            page = st.selectbox(
+                "Page",
+                range(1, n_pages + 1),
+                format_func=lambda p: f"Page {p} of {n_pages}",
+                key="gal_page",
+            )
+        page_refs = refs[(page - 1) * GALLERY_PAGE_SIZE : page * GALLERY_PAGE_SIZE]
+
         cols_per_row = 2
-        for i in range(0, len(st.session_state["gallery"]), cols_per_row):
+        for i in range(0, len(page_refs), cols_per_row):
             cols = st.columns(cols_per_row)
             for j, c in enumerate(cols):
                 item_idx = i + j
-                if item_idx < len(st.session_state["gallery"]):
-                    item = st.session_state["gallery"][item_idx]
+                if item_idx < len(page_refs):
+                    ref = page_refs[item_idx]
+                    image = gallery.read(ref)
+                    if image is None:
+                        continue
                     with c:
                         st.markdown('<div class="plot-container">', unsafe_allow_html=True)
-                        st.image(item["image"], width="stretch")
-                        st.markdown(f"**{item['name']}**")
-                        st.caption(item["description"])
-                        st.caption(f"Saved at {item['timestamp'].strftime('%Y-%m-%d %H:%M')}")
+                        st.image(image, width="stretch")
+                        st.markdown(f"**{ref.name}**")
+                        st.caption(ref.description)
+                        saved_at = datetime.fromtimestamp(ref.created)
+                        st.caption(f"Saved at {saved_at:%Y-%m-%d %H:%M}")
                         st.download_button(
                             "Download PNG",
-                            data=item["image"],
-                            file_name=f"{item['name'].replace(' ', '_')}.png",
+                            data=functools.partial(
+                                gallery_png, ref, export_dpi, st.session_state["gallery_session"]
+                            ),
+                            file_name=f"{ref.name.replace(' ', '_')}.png",
                             mime="image/png",
-                            key=f"gal_dl_{item_idx}",
+                            key=f"gal_dl_{ref.id}",
                             width="stretch",
                         )
                         st.markdown("</div>", unsafe_allow_html=True)
 
+
+# ==================== NAVIGATION ====================
+VIEWS = {
+    "Overview": view_overview,
+    "Seaborn builder": view_seaborn_builder,
+    "Matplotlib builder": view_matplotlib_builder,
+    "Compare": view_compare,
+    "Gallery": view_gallery,
+}
+
+if render_mode == RENDER_ACTIVE_VIEW:
+    active_view = st.radio(
+        "View",
+        list(VIEWS),
+        horizontal=True,
+        key="nav_view",
+        label_visibility="collapsed",
+    )
+    VIEWS[active_view]()
+else:
+    for tab, view in zip(st.tabs(list(VIEWS)), VIEWS.values(), strict=True):
+        with tab:
+            view()
+
 # ==================== FOOTER ====================
 st.markdown("---")
 st.markdown("### Quick reference")
@@ -1667,3 +1935,118 @@ with col_f3:
 - Pairplot grids
 """
     )
+
+# ==================== DIAGNOSTICS ====================
+rerun_timings = st.session_state["rerun_timings"]
+rerun_timings.append(
+    {
+        "mode": render_mode,
+        "view": active_view if render_mode == RENDER_ACTIVE_VIEW else "all",
+        "seconds": time.perf_counter() - RERUN_STARTED,
+        "renders": sum(RERUN_RENDERS.values()) - RERUN_RENDERS["resized by st.image"],
+        "resized": RERUN_RENDERS["resized by st.image"],
+    }
+)
+del rerun_timings[:-RERUN_HISTORY]
+
+with diagnostics:
+    with st.expander("Rerun timings", expanded=False):
+        st.caption(f"Last rerun: {rerun_timings[-1]['seconds'] * 1000:,.0f} ms")
+        breakdown = ", ".join(f"{n} {purpose}" for purpose, n in sorted(RERUN_RENDERS.items()))
+        st.caption(f"Rasterizations in the last rerun: {breakdown or 'none (all cached)'}")
+        timings_df = pd.DataFrame(rerun_timings)
+        groups = [timings_df["mode"], timings_df["view"]]
+        ms = (timings_df["seconds"] * 1000).groupby(groups)
+        summary = pd.DataFrame(
+            {
+                "runs": ms.count(),
+                "median ms": ms.median().round(0),
+                "p90 ms": ms.quantile(0.9).round(0),
+                "renders/run": timings_df["renders"].groupby(groups).mean().round(2),
+                "st.image resizes/run": timings_df["resized"].groupby(groups).mean().round(2),
+            }
+        )
+        st.dataframe(summary, width="stretch")
+    with st.expander("Figures", expanded=False):
+        fig_stats = figures.stats()
+        if fig_stats.live + fig_stats.pyplot_open > FIGURE_LEAK_THRESHOLD:
+            st.warning("Figures are accumulating; some renders are not being released.")
+        st.caption(
+            f"{fig_stats.live} live · {fig_stats.pooled} pooled · "
+            f"{fig_stats.pyplot_open} in pyplot registry · "
+            f"~{fig_stats.live_bytes / 1024**2:.1f} MB canvas"
+        )
+        st.caption(
+            f"{fig_stats.created:,} created · {fig_stats.reused:,} reused · "
+            f"{fig_stats.released:,} released · {fig_stats.encoded:,} encoded"
+        )
+    with st.expander("Datasets", expanded=False):
+        memory = datasets.memory_report()
+        st.caption(
+            f"{len(memory)} of {len(datasets.names())} loaded · "
+            f"{memory['MB'].sum():.2f} MB resident, shared by all sessions "
+            f"({memory['MB saved'].sum():.2f} MB saved by compact dtypes)"
+        )
+        st.caption(
+            f"Vendored store: {len(store.available())}/{len(store.CATALOG_NAMES)} "
+            f"datasets in `{store.STORE_DIR}`"
+        )
+        st.dataframe(memory, width="stretch")
+    with st.expander("Gallery store", expanded=False):
+        gal_stats = get_gallery_store().stats()
+        session_bytes = get_gallery_store().session_bytes(st.session_state["gallery_session"])
+        st.caption(
+            f"{gal_stats.items:,} entries · {gal_stats.blobs:,} files · "
+            f"{gal_stats.bytes / 1024**2:.1f} / {gal_stats.max_bytes / 1024**2:.0f} MB "
+            f"in `{GALLERY_DIR}`"
+        )
+        st.caption(
+            f"This session: {session_bytes / 1024**2:.1f} / "
+            f"{gal_stats.session_max_bytes / 1024**2:.0f} MB"
+        )
+        st.caption(
+            f"{gal_stats.dedup_hits:,} dedup hits ({gal_stats.dedup_bytes / 1024**2:.1f} MB saved)"
+            f" · {gal_stats.evictions:,} evictions"
+        )
+    with st.expander("Render cache", expanded=False):
+        cache_stats = get_render_cache().stats()
+        st.caption(
+            f"{cache_stats.hits:,} hits · {cache_stats.misses:,} misses "
+            f"({cache_stats.hit_rate:.0%} hit rate)"
+        )
+        st.caption(
+            f"{cache_stats.entries:,} figures · "
+            f"{cache_stats.bytes / 1024**2:.1f} / {cache_stats.max_bytes / 1024**2:.0f} MB · "
+            f"{cache_stats.evictions:,} evictions"
+        )
+        sample_stats = profile.samples.stats()
+        st.caption(
+            f"Pairplot samples ({dataset_label}): {sample_stats.entries:,} cached · "
+            f"{sample_stats.hits:,} hits · {sample_stats.misses:,} misses"
+        )
+        cell_stats = pairplot.CELL_CACHE.stats()
+        st.caption(
+            f"Pairplot cells: {cell_stats.entries:,} cached · "
+            f"{cell_stats.hits:,} hits · {cell_stats.misses:,} misses"
+        )
+    with st.expander("Render workers", expanded=False):
+        render_pool = get_render_pool()
+        if render_pool is None:
+            st.caption("Rendering on the script thread (`VISUAL_LAB_RENDER_WORKERS=0`).")
+        else:
+            pool_stats = render_pool.stats()
+            st.caption(
+                f"{pool_stats.running} / {pool_stats.workers} workers busy · "
+                f"{pool_stats.queued} queued (limit {render_pool.max_queue}) · "
+                f"{render_pool.per_session} per session"
+            )
+            st.caption(
+                f"Queue wait: {pool_stats.wait_mean_ms:,.0f} ms mean · "
+                f"{pool_stats.wait_max_ms:,.0f} ms max (last {WAIT_WINDOW} renders)"
+            )
+            st.caption(
+                f"{pool_stats.completed:,} done · {pool_stats.failed:,} failed · "
+                f"{pool_stats.cancelled:,} cancelled · {pool_stats.superseded:,} superseded · "
+                f"{pool_stats.rejected:,} turned away"
+            )
+            st.caption("Pairplot sample and cell caches above are per process.")
@@ -0,0 +1,389 @@
+# scripts/bench.py
+"""Micro-benchmarks for the Visual Lab helpers.
+
+python scripts/bench.py datasets     # vendored Arrow store vs seaborn catalog
+python scripts/bench.py kde          # binned FFT KDE vs scipy.stats.gaussian_kde
+python scripts/bench.py lines        # line render time vs series length, LTTB vs raw
+python scripts/bench.py theme        # dark figures: compiled rcParams vs recolouring walk
+python scripts/bench.py workers      # small-render latency next to busy sessions, threads vs pool
+python scripts/bench.py corr         # pairwise-complete Spearman with scattered NaNs vs pandas
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def banner(title: str) -> None:
+    print("\n" + "=" * 72)
+    print(title)
+    print("=" * 72)
+
+
+def best_ms(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+COLD_START = """
+import time
+t = time.perf_counter()
+from visual_lab.datasets import BUILTIN_LOADERS, DatasetRegistry
+r = DatasetRegistry(BUILTIN_LOADERS)
+loaded = 0
+for name in r.names():
+    try:
+        r.get(name)
+        loaded += 1
+    except (OSError, ValueError):
+        pass
+print(f"{time.perf_counter() - t:.3f} {loaded}")
+"""
+
+
+def cold_start(env: dict[str, str]) -> str:
+    """Loading every dataset (imports included) in a fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-c", COLD_START],
+        cwd=str(ROOT),
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+    )
+    if out.returncode != 0:
+        return "failed"
+    seconds, loaded = out.stdout.split()
+    return f"{float(seconds) * 1000:8.1f} ms  ({loaded} datasets)"
+
+
+def bench_datasets(args: argparse.Namespace) -> int:
+    from visual_lab import store
+
+    banner(f"Per-dataset load, best of {args.repeat}")
+    print(f"{'dataset':<12} {'arrow (mmap)':>14} {'seaborn catalog':>16}")
+    for name in store.CATALOG_NAMES:
+        path = store.store_path(name)
+        arrow = "not vendored"
+        if path.exists():
+            arrow = f"{best_ms(lambda p=path: store.read_arrow(p), args.repeat):11.2f} ms"
+        try:
+            catalog = f"{best_ms(lambda n=name: store.catalog_dataset(n), args.repeat):13.2f} ms"
+        except (OSError, ValueError):
+            catalog = "unavailable"
+        print(f"{name:<12} {arrow:>14} {catalog:>16}")
+
+    banner("Cold start: every dataset loaded in a fresh interpreter")
+    with tempfile.TemporaryDirectory() as empty:
+        print(f"{'vendored store':<18} {cold_start({})}")
+        print(f"{'seaborn catalog':<18} {cold_start({'VISUAL_LAB_DATA_DIR': empty})}")
+    return 0
+
+
+def bench_kde(args: argparse.Namespace) -> int:
+    import numpy as np
+    from scipy import stats
+
+    from visual_lab.kde import BinnedKDE
+
+    rng = np.random.default_rng(0)
+    banner(f"KDE on 200 points, bimodal data, best of {args.repeat}")
+    print(f"{'rows':>12} {'binned FFT':>12} {'scipy':>12} {'max rel. error':>15}")
+    for n in args.sizes:
+        data = np.concatenate([rng.normal(0, 1, n - n // 3), rng.normal(4, 0.5, n // 3)])
+        support = np.linspace(data.min(), data.max(), 200)
+        binned = best_ms(lambda d=data, s=support: BinnedKDE(d)(s), args.repeat)
+        scipy_ms, error = "skipped", ""
+        if n <= args.scipy_max:
+            scipy_ms = f"{best_ms(lambda d=data, s=support: stats.gaussian_kde(d)(s), 1):9.1f} ms"
+            exact = stats.gaussian_kde(data)(support)
+            error = f"{np.max(np.abs(BinnedKDE(data)(support) - exact)) / exact.max():.2e}"
+        print(f"{n:>12,} {binned:9.1f} ms {scipy_ms:>12} {error:>15}")
+    return 0
+
+
+def bench_lines(args: argparse.Namespace) -> int:
+    import numpy as np
+    import pandas as pd
+
+    from visual_lab import engine
+    from visual_lab.specs import MatplotlibLine
+
+    rng = np.random.default_rng(0)
+
+    def raw(frame: pd.DataFrame) -> bytes:
+        """The same render with a budget no series reaches."""
+        with mock.patch.object(engine, "line_budget", lambda ax, dpi: sys.maxsize):
+            return engine.render(spec, frame, dpi=args.dpi)
+
+    spec = MatplotlibLine(x="index", y="y", marker=args.marker)
+    banner(
+        f"Line render at {args.dpi} DPI, marker {args.marker!r} (random walk), "
+        f"best of {args.repeat}"
+    )
+    print(f"{'points':>12} {'downsampled':>14} {'all points':>14}")
+    for n in args.sizes:
+        frame = pd.DataFrame({"y": rng.normal(size=n).cumsum()})
+        fast = best_ms(lambda f=frame: engine.render(spec, f, dpi=args.dpi), args.repeat)
+        slow = "skipped"
+        if n <= args.raw_max:
+            slow = f"{best_ms(lambda f=frame: raw(f), 1):11.1f} ms"
+        print(f"{n:>12,} {fast:11.1f} ms {slow:>14}")
+    return 0
+
+
+def walk_dark(fig: object) -> None:
+    """The per-artist recolouring dark mode used before it became an rcParams style."""
+    fig.patch.set_facecolor("#020617")
+    for ax in fig.get_axes():
+        ax.set_facecolor("#020617")
+        ax.tick_params(colors="#e5e7eb")
+        for spine in ax.spines.values():
+            spine.set_color("#4b5563")
+        for item in [ax.title, ax.xaxis.label, ax.yaxis.label]:
+            item.set_color("#e5e7eb")
+        for t in ax.get_xticklabels() + ax.get_yticklabels():
+            t.set_color("#e5e7eb")
+        legend = ax.get_legend()
+        if legend:
+            legend.get_frame().set_facecolor("#020617")
+            for text in legend.get_texts():
+                text.set_color("#e5e7eb")
+
+
+def bench_theme(args: argparse.Namespace) -> int:
+    import numpy as np
+    import pandas as pd
+
+    from visual_lab import engine
+    from visual_lab.figures import FigureManager
+    from visual_lab.specs import MatplotlibSubplots, SeabornPairplot
+    from visual_lab.theme import DEFAULT_THEME, use_theme
+
+    rng = np.random.default_rng(0)
+    columns = [f"c{i}" for i in range(args.columns)]
+    df = pd.DataFrame(rng.normal(size=(args.rows, args.columns)), columns=columns)
+    df["group"] = rng.choice(list("ABCD"), size=args.rows)
+    figures = FigureManager()
+    light = {**DEFAULT_THEME, "dark": False}
+    walked: list[float] = []
+
+    def walk(spec: object) -> bytes:
+        with use_theme(light):
+            fig = engine.draw(spec, df, figures, dpi=args.dpi)
+            start = time.perf_counter()
+            walk_dark(fig)
+            walked.append(time.perf_counter() - start)
+            return figures.render(fig, args.dpi)
+
+    def styled(spec: object) -> bytes:
+        return engine.render(spec, df, DEFAULT_THEME, dpi=args.dpi, figures=figures)
+
+    specs = {
+        "Pairplot": SeabornPairplot(columns=columns, hue="group", sample=args.rows),
+        "Subplots overview": MatplotlibSubplots(columns=tuple(columns)),
+    }
+    banner(
+        f"Dark render, {args.columns} columns x {args.rows:,} rows at {args.dpi} DPI, "
+        f"best of {args.repeat}"
+    )
+    print(f"{'plot':<20} {'dark style':>12} {'walk + render':>14} {'walk alone':>12}")
+    for name, spec in specs.items():
+        styled(spec)  # warm the pairplot cell cache for both runs
+        fast = best_ms(lambda s=spec: styled(s), args.repeat)
+        walked.clear()
+        slow = best_ms(lambda s=spec: walk(s), args.repeat)
+        print(f"{name:<20} {fast:9.1f} ms {slow:11.1f} ms {min(walked) * 1000:9.1f} ms")
+    return 0
+
+
+def bench_workers(args: argparse.Namespace) -> int:
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    import numpy as np
+
+    from visual_lab.datasets import BUILTIN_LOADERS, FALLBACK_LOADERS, DatasetRegistry
+    from visual_lab.specs import MatplotlibHistogram, SeabornPairplot, spec_to_dict
+    from visual_lab.workers import RenderJob, RenderPool, init_worker, render_job
+
+    entry = DatasetRegistry(BUILTIN_LOADERS, fallback=FALLBACK_LOADERS).entry(args.dataset)
+    numeric = entry.frame.select_dtypes("number").columns[:5].tolist()
+
+    def job(spec: object) -> RenderJob:
+        return RenderJob(args.dataset, entry.fingerprint, spec_to_dict(spec), {}, 100)
+
+    def heavy(i: int) -> RenderJob:
+        # A new sample size each time, so no cached pairplot cells are reused.
+        return job(SeabornPairplot(columns=numeric, sample=args.sample + i))
+
+    light = job(MatplotlibHistogram(x=numeric[0]))
+
+    def rerun() -> None:
+        """Pure-Python stand-in for a rerun served from caches (about 5 ms idle)."""
+        sum(i * i for i in range(150_000))
+
+    idle = best_ms(rerun, 5)
+    pools = {
+        "script threads": lambda: RenderPool(
+            args.sessions + 1, executor=lambda: ThreadPoolExecutor(args.sessions + 1)
+        ),
+        f"{args.workers} worker processes": lambda: RenderPool(
+            args.workers, initializer=init_worker
+        ),
+    }
+    banner(
+        f"{args.sessions} sessions rendering {len(numeric)}-column pairplots of "
+        f"{args.dataset} for {args.seconds:.0f} s; a histogram every {args.interval} s"
+    )
+    print(f"Cached rerun alone: {idle:.1f} ms\n")
+    print(
+        f"{'renders on':<20} {'rerun p95':>10} {'hist median':>12} {'hist p95':>10} "
+        f"{'pairplots':>10} {'queue wait':>11}"
+    )
+    for name, make in pools.items():
+        pool = make()
+        pool.submit("warm-up", "light", render_job, light).result()
+        stop = threading.Event()
+        done = [0] * args.sessions
+
+        def session(
+            k: int, pool: RenderPool = pool, stop: threading.Event = stop, done: list = done
+        ) -> None:
+            i = 0
+            while not stop.is_set():
+                pool.submit(f"s{k}", "display", render_job, heavy(k * 1000 + i)).result()
+                done[k] += 1
+                i += 1
+
+        threads = [threading.Thread(target=session, args=(k,)) for k in range(args.sessions)]
+        for thread in threads:
+            thread.start()
+        latencies, reruns = [], []
+        end = time.perf_counter() + args.seconds
+        while time.perf_counter() < end:
+            start = time.perf_counter()
+            rerun()
+            reruns.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            pool.submit("light", "display", render_job, light).result()
+            latencies.append(time.perf_counter() - start)
+            time.sleep(args.interval)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        stats = pool.stats()
+        pool.shutdown()
+        median, p95 = np.percentile(latencies, [50, 95]) * 1000
+        rerun_p95 = np.percentile(reruns, 95) * 1000
+        print(
+            f"{name:<20} {rerun_p95:7.1f} ms {median:9.0f} ms {p95:7.0f} ms {sum(done):>10} "
+            f"{stats.wait_mean_ms:8.0f} ms"
+        )
+    return 0
+
+
+def bench_corr(args: argparse.Namespace) -> int:
+    import numpy as np
+    import pandas as pd
+
+    from visual_lab.correlation import CorrelationEngine
+
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(size=(args.rows, args.columns)))
+    frame.iloc[:, ::4] = rng.integers(0, 20, (args.rows, len(frame.columns[::4])))
+    frame = frame.mask(rng.random(frame.shape) < args.missing)
+    banner(
+        f"Spearman on {args.rows:,} rows x {args.columns} columns, "
+        f"{args.missing:.0%} NaNs scattered, best of {args.repeat}"
+    )
+    engine_ms = best_ms(lambda: CorrelationEngine(frame).matrix("spearman"), args.repeat)
+    pandas_ms = best_ms(lambda: frame.corr("spearman"), 1)
+    error = np.nanmax(
+        np.abs(CorrelationEngine(frame).matrix("spearman") - frame.corr("spearman")).to_numpy()
+    )
+    print(f"{'engine':<8} {engine_ms:9.1f} ms")
+    print(f"{'pandas':<8} {pandas_ms:9.1f} ms")
+    print(f"max abs. difference {error:.2e}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Visual Lab micro-benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    datasets = sub.add_parser("datasets", help="vendored store vs seaborn catalog load time")
+    datasets.add_argument("--repeat", type=int, default=5)
+    datasets.set_defaults(run=bench_datasets)
+
+    kde = sub.add_parser("kde", help="binned FFT KDE vs scipy.stats.gaussian_kde")
+    kde.add_argument("--repeat", type=int, default=3)
+    kde.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000, 1_000_000, 10_000_000],
+    )
+    kde.add_argument(
+        "--scipy-max", type=int, default=100_000, help="largest size run through scipy"
+    )
+    kde.set_defaults(run=bench_kde)
+
+    lines = sub.add_parser("lines", help="line render time vs series length, LTTB vs raw")
+    lines.add_argument("--repeat", type=int, default=3)
+    lines.add_argument("--dpi", type=int, default=100)
+    lines.add_argument("--marker", default="o", help='matplotlib marker, or "None"')
+    lines.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000, 1_000_000, 10_000_000],
+    )
+    lines.add_argument("--raw-max", type=int, default=1_000_000, help="largest size drawn raw")
+    lines.set_defaults(run=bench_lines)
+
+    theme = sub.add_parser("theme", help="dark figures: compiled rcParams vs recolouring walk")
+    theme.add_argument("--repeat", type=int, default=5)
+    theme.add_argument("--columns", type=int, default=8)
+    theme.add_argument("--rows", type=int, default=500)
+    theme.add_argument("--dpi", type=int, default=100)
+    theme.set_defaults(run=bench_theme)
+
+    workers = sub.add_parser(
+        "workers", help="small-render latency next to busy sessions, threads vs pool"
+    )
+    workers.add_argument("--dataset", default="Diamonds")
+    workers.add_argument("--sessions", type=int, default=3)
+    workers.add_argument("--workers", type=int, default=2)
+    workers.add_argument("--sample", type=int, default=2_000)
+    workers.add_argument("--seconds", type=float, default=20)
+    workers.add_argument("--interval", type=float, default=0.5)
+    workers.set_defaults(run=bench_workers)
+
+    corr = sub.add_parser("corr", help="pairwise-complete Spearman with scattered NaNs vs pandas")
+    corr.add_argument("--repeat", type=int, default=1)
+    corr.add_argument("--rows", type=int, default=5_000)
+    corr.add_argument("--columns", type=int, default=200)
+    corr.add_argument("--missing", type=float, default=0.01)
+    corr.set_defaults(run=bench_corr)
+
+    args = parser.parse_args()
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
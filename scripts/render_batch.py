@@ -0,0 +1,55 @@
+# scripts/render_batch.py
+"""Render a batch of plot specs to PNGs plus a manifest, without the UI.
+
+python scripts/render_batch.py plots.yaml --out exports/ --workers 8
+
+See ``visual_lab.batch`` for the batch file format. Plots are drawn by the
+same engine as the Seaborn / Matplotlib builders.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from visual_lab import batch  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Render a JSON/YAML batch of plot specs")
+    parser.add_argument("batch_file", type=Path)
+    parser.add_argument("--out", type=Path, default=ROOT / "exports")
+    parser.add_argument("--workers", type=int, default=None, help="default: one per CPU")
+    parser.add_argument("--dpi", type=int, default=None, help="override the batch file DPI")
+    args = parser.parse_args()
+
+    try:
+        jobs = batch.parse_jobs(batch.read_batch_file(args.batch_file), dpi=args.dpi)
+    except (OSError, ValueError) as exc:
+        print(f"[FAIL] {args.batch_file}: {exc}")
+        return 2
+
+    def report(job: batch.Job, record: dict) -> None:
+        if "error" in record:
+            print(f"[FAIL] {job.filename}: {record['error']}")
+        else:
+            print(f"[OK]   {record['file']:<48} {record['bytes'] / 1024:>8.1f} KB")
+
+    manifest = batch.run_batch(jobs, args.out, args.workers, progress=report)
+    print(
+        f"\n{manifest['rendered']} rendered, {manifest['failed']} failed "
+        f"in {manifest['seconds']:.1f}s on {manifest['workers']} worker(s) -> {args.out}"
+    )
+    return 1 if manifest["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,42 @@
+# scripts/vendor_datasets.py
+"""Refresh the vendored Arrow copies of the seaborn demo datasets.
+
+Fetches each dataset through ``store.catalog_dataset`` (online catalog with a
+timeout, or the local seaborn cache / ``SEABORN_DATA``) and writes it to the
+store directory. Run it once after installing (``make install`` does), so the
+app starts without the network.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from visual_lab import store  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("names", nargs="*", default=list(store.CATALOG_NAMES))
+    parser.add_argument("--out", type=Path, default=store.STORE_DIR)
+    args = parser.parse_args()
+
+    rc = 0
+    for name in args.names:
+        try:
+            frame = store.catalog_dataset(name)
+        except (OSError, ValueError) as exc:
+            print(f"[FAIL] {name}: {exc}")
+            rc = 1
+            continue
+        size = store.write_arrow(frame, store.store_path(name, args.out))
+        print(f"[OK]   {name:<12} {len(frame):>7,} rows  {size / 1024:>8.1f} KB")
+    return rc
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
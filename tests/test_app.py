@@ -0,0 +1,37 @@
+from unittest import mock
+
+import pytest
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.testing.v1 import AppTest
+
+from visual_lab.figures import png_size
+
+
+@pytest.fixture
+def app_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("VISUAL_LAB_GALLERY_DIR", str(tmp_path / "gallery"))
+    monkeypatch.setenv("VISUAL_LAB_ONLINE_CATALOG", "0")
+    monkeypatch.setenv("VISUAL_LAB_RENDER_WORKERS", "0")
+
+
+def test_gallery_download_payload_renders_the_saved_plot(app_env):
+    deferred = {}
+    add_deferred = MediaFileManager.add_deferred
+
+    def record(self, data, *args, **kwargs):
+        file_id = add_deferred(self, data, *args, **kwargs)
+        deferred[file_id] = data
+        return file_id
+
+    with mock.patch.object(MediaFileManager, "add_deferred", record):
+        at = AppTest.from_file("../app.py", default_timeout=120)
+        at.run()
+        at.radio("nav_view").set_value("Seaborn builder").run()
+        at.button("sb_save_gallery").click().run()
+        at.radio("nav_view").set_value("Gallery").run()
+    assert not at.exception
+
+    buttons = [el for el in at.get("download_button") if el.proto.deferred_file_id]
+    assert buttons
+    png = deferred[buttons[0].proto.deferred_file_id]()
+    assert png_size(png)[0] > 0
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from visual_lab import batch
+from visual_lab.specs import MatplotlibHistogram, SeabornHeatmap
+
+DEMO = "Demo (offline)"
+
+
+def test_plots_expand_across_datasets():
+    jobs = batch.parse_jobs(
+        {
+            "dpi": 120,
+            "datasets": [DEMO, "Tips"],
+            "plots": [
+                {"type": "MatplotlibHistogram", "x": "x", "name": "x hist"},
+                {"type": "SeabornHeatmap", "columns": ["x", "y"], "dataset": DEMO, "dpi": 60},
+            ],
+        }
+    )
+    assert [(j.dataset, type(j.spec), j.dpi) for j in jobs] == [
+        (DEMO, MatplotlibHistogram, 120),
+        ("Tips", MatplotlibHistogram, 120),
+        (DEMO, SeabornHeatmap, 60),
+    ]
+    assert jobs[0].filename == "001_Demo_offline_x_hist.png"
+    assert {
+        j.dpi
+        for j in batch.parse_jobs(
+            [{"type": "MatplotlibBox", "columns": ["x"], "dataset": DEMO}], dpi=90
+        )
+    } == {90}
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"plots": [{"type": "MatplotlibHistogram", "x": "x"}]},
+        [{"type": "MatplotlibHistogram", "x": "x", "dataset": "Nope"}],
+        [{"type": "Pie", "dataset": DEMO}],
+    ],
+)
+def test_invalid_batches_are_rejected(data):
+    with pytest.raises(ValueError):
+        batch.parse_jobs(data)
+
+
+def test_batch_writes_pngs_and_manifest(tmp_path):
+    jobs = batch.parse_jobs(
+        [
+            {"type": "MatplotlibHistogram", "x": "score", "dataset": DEMO, "dpi": 40},
+            {"type": "MatplotlibHistogram", "x": "missing", "dataset": DEMO, "dpi": 40},
+        ]
+    )
+    manifest = batch.run_batch(jobs, tmp_path, workers=1)
+
+    assert (manifest["rendered"], manifest["failed"]) == (1, 1)
+    ok, failed = json.loads((tmp_path / "manifest.json").read_text())["plots"]
+    assert (tmp_path / ok["file"]).read_bytes().startswith(b"\x89PNG")
+    assert ok["spec"]["x"] == "score"
+    assert "missing" in failed["error"]
@@ -0,0 +1,13 @@
+import pandas as pd
+
+from visual_lab.categories import CategoryCodes
+
+
+def test_codes_follow_first_appearance_and_are_cached():
+    df = pd.DataFrame({"c": pd.Categorical(["b", "a", None, "b"], categories=["c", "a", "b"])})
+    codes = CategoryCodes(df)
+    levels, values = codes.get("c")
+    assert levels == ["b", "a"]
+    assert values.tolist() == [0, 1, -1, 0]
+    assert codes.get("c")[1] is values
+    assert not values.flags.writeable
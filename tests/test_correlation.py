@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from visual_lab.correlation import METHODS, CorrelationEngine
+
+
+def _frame(rows: int = 200, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(rows, 5)), columns=list("abcde"))
+    df["c"] = df["c"] * 1e3 + 1e6  # large offset: needs a well-conditioned kernel
+    df["ties"] = rng.integers(0, 4, rows)
+    df["const"] = 2.0
+    for col in "abc":
+        df.loc[rng.random(rows) < 0.2, col] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_engine_matches_pandas_pairwise_complete(method):
+    df = _frame()
+    expected = df.corr(method=method)
+    result = CorrelationEngine(df).matrix(method)
+    pd.testing.assert_frame_equal(result, expected, atol=1e-12, rtol=0)
+
+
+def test_spearman_reranks_every_pair_with_scattered_nans():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.normal(size=(300, 12)))
+    df.iloc[:, ::3] = rng.integers(0, 5, (300, 4))
+    df = df.mask(rng.random(df.shape) < 0.05)
+    df[12] = np.nan
+    df.loc[:1, 12] = 1.0  # one row in common with anything: undefined
+    expected = df.corr("spearman")
+    result = CorrelationEngine(df).matrix("spearman")
+    pd.testing.assert_frame_equal(result, expected, atol=1e-12, rtol=0)
+
+
+def test_subsets_are_sliced_from_one_cached_matrix():
+    df = _frame()
+    engine = CorrelationEngine(df)
+    full = engine.matrix("spearman")
+    subset = engine.subset(["e", "a"], "spearman")
+    assert engine.matrix("spearman") is full
+    pd.testing.assert_frame_equal(subset, df[["e", "a"]].corr("spearman"), atol=1e-12, rtol=0)
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        CorrelationEngine(_frame()).matrix("cosine")
@@ -0,0 +1,99 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from visual_lab.datasets import DatasetRegistry, enable_copy_on_write
+
+
+def _registry() -> DatasetRegistry:
+    return DatasetRegistry(
+        {
+            "Numbers": lambda: pd.DataFrame({"x": np.arange(100.0), "y": np.ones(100)}),
+            "Letters": lambda: pd.DataFrame({"c": list("abcde") * 4}),
+        }
+    )
+
+
+def test_registry_shares_data_without_copying():
+    registry = _registry()
+    first, second = registry.get("Numbers"), registry.get("Numbers")
+    assert np.shares_memory(first["x"].to_numpy(), second["x"].to_numpy())
+    assert registry.fingerprint("Numbers") != registry.fingerprint("Letters")
+
+
+def test_registry_frames_cannot_be_mutated_by_callers(monkeypatch):
+    monkeypatch.setattr(pd.options.mode, "copy_on_write", False)
+    enable_copy_on_write()
+    registry = _registry()
+    frame = registry.get("Numbers")
+    frame.loc[0, "x"] = -1.0
+    frame["z"] = 1
+    fresh = registry.get("Numbers")
+    assert fresh.loc[0, "x"] == 0.0
+    assert list(fresh.columns) == ["x", "y"]
+
+
+def test_datasets_load_on_first_use_only():
+    calls = []
+    registry = DatasetRegistry(
+        {
+            "A": lambda: calls.append("A") or pd.DataFrame({"x": [1]}),
+            "B": lambda: pytest.fail("loaded eagerly"),
+        }
+    )
+    assert registry.names() == ["A", "B"]
+    registry.get("A")
+    registry.get("A")
+    assert calls == ["A"]
+    assert not registry.is_loaded("B")
+
+
+def test_memory_report_lists_loaded_datasets():
+    registry = _registry()
+    assert registry.memory_report().empty
+    registry.get("Letters")
+    registry.get("Numbers")
+    report = registry.memory_report()
+    assert list(report.index) == ["Letters", "Numbers"]
+    assert report.loc["Numbers", "rows"] == 100
+    assert (report["MB"] > 0).all()
+    assert "MB saved" in report.columns
+    letters = registry.entry("Letters")
+    assert letters.frame["c"].dtype == "category"
+    assert letters.nbytes < letters.loaded_nbytes
+
+
+def test_registry_offers_fallback_when_a_dataset_fails():
+    def offline() -> pd.DataFrame:
+        raise OSError("catalog unreachable")
+
+    registry = DatasetRegistry(
+        {"Tips": offline}, fallback={"Demo": lambda: pd.DataFrame({"x": [1.0]})}
+    )
+    with pytest.raises(OSError):
+        registry.get("Tips")
+    assert registry.names() == ["Demo"]
+    assert "Tips" in registry.errors
+
+
+def test_failed_datasets_are_retried_after_a_while(monkeypatch):
+    attempts = []
+
+    def flaky() -> pd.DataFrame:
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("timed out")
+        return pd.DataFrame({"x": [1.0]})
+
+    clock = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    registry = DatasetRegistry({"Tips": flaky}, fallback={"Demo": lambda: pd.DataFrame()})
+    with pytest.raises(OSError):
+        registry.get("Tips")
+    clock[0] += registry.retry_after / 2
+    assert registry.names() == ["Demo"]
+    clock[0] += registry.retry_after
+    assert registry.names() == ["Tips"] and not registry.errors
+    assert registry.get("Tips")["x"].tolist() == [1.0]
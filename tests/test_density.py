@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from visual_lab.density import bin_counts, grid_extent, hue_codes
+
+
+def test_bin_counts_match_histogram2d():
+    rng = np.random.default_rng(0)
+    x, y = rng.normal(size=5_000), rng.gamma(2.0, size=5_000)
+    x[:10] = np.nan
+    extent = grid_extent(x, y)
+    counts = bin_counts(x, y, extent, (40, 20))
+
+    ok = np.isfinite(x)
+    expected, _, _ = np.histogram2d(y[ok], x[ok], bins=(20, 40), range=[extent[2:], extent[:2]])
+    assert counts.shape == (20, 40)
+    np.testing.assert_array_equal(counts, expected)
+
+
+def test_hue_layers_sum_to_the_single_layer_grid():
+    rng = np.random.default_rng(1)
+    hue = pd.Series(rng.choice(list("abcdefghijkl"), size=2_000, p=[0.3] + [0.7 / 11] * 11))
+    hue[:5] = None
+    x, y = rng.random(2_000), rng.random(2_000)
+    labels, codes = hue_codes(hue, max_layers=4)
+
+    assert labels[-1] == "other" and len(labels) == 4 and "a" in labels
+    layers = bin_counts(x, y, (0, 1, 0, 1), (8, 8), codes, len(labels))
+    assert layers.shape == (4, 8, 8)
+    assert layers.sum() == 1_995
+    np.testing.assert_array_equal(
+        layers.sum(axis=0), bin_counts(x[codes >= 0], y[codes >= 0], (0, 1, 0, 1), (8, 8))
+    )
+
+
+def test_categorical_hue_keeps_category_order():
+    hue = pd.Series(pd.Categorical(["b", "a", "b"], categories=["b", "a", "c"]))
+    labels, codes = hue_codes(hue)
+    assert labels == ["b", "a", "c"]
+    assert codes.tolist() == [0, 1, 0]
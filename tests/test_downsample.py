@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from visual_lab import engine
+from visual_lab.downsample import downsample_frame, lttb
+from visual_lab.specs import MatplotlibLine, SeabornRelationship
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    rng = np.random.default_rng(0)
+    y = rng.normal(0, 0.1, 100_000)
+    y[[12_345, 67_890]] = [10.0, -10.0]
+    x = np.arange(len(y))
+    keep = lttb(x, y, 500)
+    assert len(keep) == 500
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert {12_345, 67_890} <= set(keep.tolist())
+
+
+def test_lttb_leaves_short_series_whole_and_skips_missing_points_when_reducing():
+    y = np.array([1.0, np.nan, 3.0, 4.0])
+    assert lttb(np.arange(4), y, 10).tolist() == [0, 1, 2, 3]
+    y = np.r_[y, np.arange(6.0)]
+    keep = lttb(np.arange(10), y, 4)
+    assert len(keep) == 4 and 1 not in keep
+    dates = pd.date_range("2024-01-01", periods=10_000, freq="min").to_numpy()
+    assert len(lttb(dates, np.sin(np.arange(10_000)), 100)) == 100
+
+
+def test_downsample_frame_sorts_and_keeps_each_group():
+    df = pd.DataFrame({"x": np.arange(20_000)[::-1], "y": np.arange(20_000) % 7})
+    df["g"] = np.where(df["x"] % 2 == 0, "even", "odd")
+    out = downsample_frame(df, "x", "y", 300, by="g")
+    assert out.groupby("g").size().tolist() == [300, 300]
+    assert out[out["g"] == "even"]["x"].is_monotonic_increasing
+
+
+def test_long_lines_are_downsampled_with_a_note():
+    df = pd.DataFrame({"y": np.random.default_rng(1).normal(size=50_000).cumsum()})
+    fig = engine.draw(MatplotlibLine(x="index", y="y", marker="None"), df, dpi=50)
+    ax = fig.axes[0]
+    assert len(ax.lines[0].get_xdata()) < 2_000
+    assert any("downsampled from 50,000 points" in t.get_text() for t in ax.texts)
+
+
+def test_short_lines_with_gaps_are_drawn_whole_without_a_note():
+    y = np.sin(np.arange(200.0))
+    y[50:60] = np.nan
+    df = pd.DataFrame({"y": y, "g": np.where(np.arange(200) % 3 == 0, None, "a")})
+    fig = engine.draw(MatplotlibLine(x="index", y="y", marker="None"), df, dpi=50)
+    line = fig.axes[0].lines[0]
+    assert len(line.get_xdata()) == 200 and np.isnan(line.get_ydata()[55])
+    assert not fig.axes[0].texts
+
+    rel = SeabornRelationship(kind="Line", x="t", y="y", hue="g")
+    fig = engine.draw(rel, df.assign(t=np.arange(200)), dpi=50)
+    assert not fig.axes[0].texts
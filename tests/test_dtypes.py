@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from visual_lab.dtypes import compact_frame
+
+
+def test_compaction_is_lossless_and_keeps_level_order():
+    df = pd.DataFrame(
+        {
+            "sex": ["Male", "Female", None, "Male"] * 50,
+            "name": [f"passenger {i}" for i in range(200)],
+            "count": np.arange(200, dtype=np.int64),
+            "whole": np.arange(200, dtype=np.float64),
+            "fare": np.linspace(0, 1, 200),
+            "flag": [True, False] * 100,
+        }
+    )
+    out, report = compact_frame(df)
+    assert list(out["sex"].cat.categories) == ["Male", "Female"]
+    assert out["sex"].isna().sum() == 50
+    assert out["name"].dtype == object
+    assert (out["count"].dtype, out["whole"].dtype) == (np.int16, np.float32)
+    assert (out["fare"].dtype, out["flag"].dtype) == (np.float64, bool)
+    pd.testing.assert_frame_equal(out.astype(df.dtypes.to_dict()), df)
+    assert set(report.changes) == {"sex", "count", "whole"}
+    assert 0 < report.bytes_after < report.bytes_before
+
+
+def test_arrow_strings_are_optional():
+    df = pd.DataFrame({"name": [f"row {i}" for i in range(20)]})
+    out, _ = compact_frame(df, arrow_strings=True)
+    assert out["name"].dtype == "string[pyarrow]"
+    assert out["name"].tolist() == df["name"].tolist()
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from visual_lab import engine
+from visual_lab.datasets import demo_frame
+from visual_lab.figures import png_size
+from visual_lab.profile import DatasetProfile
+from visual_lab.specs import (
+    CompareDistribution,
+    CompareRelationship,
+    MatplotlibBar,
+    MatplotlibBox,
+    MatplotlibHistogram,
+    MatplotlibLine,
+    MatplotlibScatter,
+    MatplotlibSubplots,
+    OverviewCorrelation,
+    OverviewDistribution,
+    SeabornCategory,
+    SeabornDistribution,
+    SeabornHeatmap,
+    SeabornPairplot,
+    SeabornRelationship,
+    spec_from_dict,
+    spec_to_dict,
+)
+
+SPECS = [
+    OverviewDistribution(x="x"),
+    OverviewCorrelation(columns=["x", "y", "score"]),
+    SeabornDistribution(kind="Histogram + KDE", x="x", hue="group"),
+    SeabornDistribution(kind="Violin", x="y"),
+    SeabornRelationship(kind="Scatter", x="x", y="y", hue="group", rows=100),
+    SeabornRelationship(kind="Regression", x="x", y="score"),
+    SeabornRelationship(kind="Scatter", x="x", y="y", hue="group", density=True),
+    SeabornCategory(kind="Bar (mean)", category="day", value="score", rows=100),
+    SeabornCategory(kind="Count", category="group"),
+    SeabornHeatmap(columns=["x", "y", "score"], method="Spearman"),
+    SeabornPairplot(columns=["x", "y"], hue="group", sample=60),
+    MatplotlibLine(x="x", y="y", rows=50),
+    MatplotlibScatter(x="x", y="y", color_by="score"),
+    MatplotlibScatter(x="x", y="y", color_by="group", density=True),
+    MatplotlibBar(category="group", value="score", agg="median"),
+    MatplotlibHistogram(x="score", density=True),
+    MatplotlibBox(columns=["x", "y"]),
+    MatplotlibSubplots(columns=["x", "y", "score"]),
+    CompareDistribution(library="seaborn", x="x", hue="group"),
+    CompareRelationship(library="matplotlib", x="x", y="y"),
+    CompareRelationship(library="seaborn", x="x", y="y", density=True),
+]
+
+
+@pytest.mark.parametrize("spec", SPECS, ids=lambda s: type(s).__name__)
+def test_every_spec_renders_headless(spec):
+    df = demo_frame()
+    png = engine.render(spec, df, dpi=40, profile=DatasetProfile.from_frame(df))
+    assert png.startswith(b"\x89PNG")
+    assert spec_from_dict(spec_to_dict(spec)) == spec
+
+
+def test_inapplicable_fields_are_normalized():
+    assert SeabornDistribution(kind="Box", x="x", hue="group", bins=10) == SeabornDistribution(
+        kind="Box", x="x"
+    )
+    assert CompareDistribution(library="matplotlib", x="x", hue="group").hue is None
+    dense = MatplotlibScatter(x="x", y="y", rows=100, density=True)
+    assert (dense.rows, dense.alpha, dense.size) == (None, None, None)
+    assert not SeabornRelationship(kind="Line", x="x", y="y", density=True).density
+    assert SeabornHeatmap(columns=["x", "y"]).columns == ("x", "y")
+
+
+def test_invalid_spec_dicts_are_rejected():
+    with pytest.raises(ValueError, match="Unknown plot spec"):
+        spec_from_dict({"type": "Pie", "x": "x"})
+    with pytest.raises(ValueError, match="no field"):
+        spec_from_dict({"type": "MatplotlibHistogram", "x": "x", "colour": "red"})
+    with pytest.raises(ValueError, match="Invalid"):
+        spec_from_dict({"type": "MatplotlibHistogram"})
+
+
+def test_max_width_caps_the_encoded_image():
+    df = demo_frame()
+    spec = MatplotlibSubplots(columns=["x", "y", "score"])
+    full = engine.render(spec, df, dpi=200)
+    capped = engine.render(spec, df, dpi=200, max_width=800)
+    assert png_size(full)[0] > 800 >= png_size(capped)[0] > 700
+
+
+def test_high_cardinality_colour_scatter_is_one_collection():
+    df = demo_frame(rows=400)
+    df["id"] = np.arange(len(df)) % 50
+    profile = DatasetProfile.from_frame(df)
+    fig = engine.draw(MatplotlibScatter(x="x", y="y", color_by="id"), df, profile=profile)
+    ax = fig.axes[0]
+    assert len(ax.collections) == 1
+    labels = [t.get_text() for t in ax.get_legend().get_texts()]
+    assert labels[0] == "0" and labels[-1] == "+30 more"
+    few = engine.draw(MatplotlibScatter(x="x", y="y", color_by="group"), df, profile=profile)
+    assert len(few.axes[0].collections) == df["group"].nunique()
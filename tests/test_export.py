@@ -0,0 +1,63 @@
+import io
+import json
+import threading
+import time
+import zipfile
+from concurrent.futures import CancelledError
+
+import pytest
+
+from visual_lab.export import ZipEntry, ZipExport
+
+
+def entries(n: int) -> list[ZipEntry]:
+    return [ZipEntry(f"{i:02d}.png", lambda i=i: b"\x89PNG" + bytes([i]) * 100) for i in range(n)]
+
+
+def test_zip_export_stores_pngs_and_manifest_in_background():
+    job = ZipExport(entries(3), {"plots": [{"file": "00.png"}]}, spool_bytes=64).start()
+    assert job.wait(10)
+
+    assert job.ok and (job.done, job.total) == (3, 3)
+    with zipfile.ZipFile(io.BytesIO(job.read())) as zf:
+        infos = {info.filename: info for info in zf.infolist()}
+        assert infos["01.png"].compress_type == zipfile.ZIP_STORED
+        assert infos["manifest.json"].compress_type == zipfile.ZIP_DEFLATED
+        assert json.loads(zf.read("manifest.json")) == {"plots": [{"file": "00.png"}]}
+        assert zf.read("02.png") == b"\x89PNG" + b"\x02" * 100
+    assert job.size() == len(job.read())
+
+
+def test_zip_export_reports_render_errors():
+    def boom() -> bytes:
+        raise ValueError("column missing")
+
+    job = ZipExport([*entries(1), ZipEntry("bad.png", boom)]).start()
+    job.wait(10)
+    assert not job.ok
+    assert job.error == "ValueError: column missing"
+    with pytest.raises(RuntimeError):
+        job.read()
+
+
+def test_zip_export_reports_cancelled_renders_and_shares_its_stop_event():
+    def dropped() -> bytes:
+        raise CancelledError
+
+    job = ZipExport([ZipEntry("dropped.png", dropped)]).start()
+    assert job.wait(10)
+    assert job.error == "CancelledError: a render was cancelled"
+
+    stop = threading.Event()
+    started = threading.Event()
+
+    def waiting() -> bytes:
+        started.set()
+        while not stop.is_set():
+            time.sleep(0.01)
+        raise CancelledError
+
+    job = ZipExport([ZipEntry("slow.png", waiting)], stop=stop).start()
+    assert started.wait(10)
+    job.cancel()
+    assert stop.is_set() and job.finished and job.error is None
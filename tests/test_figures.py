@@ -0,0 +1,41 @@
+import matplotlib.pyplot as plt
+
+from visual_lab.figures import FigureManager
+
+
+def test_figures_bypass_pyplot_and_are_released():
+    manager = FigureManager()
+    open_before = len(plt.get_fignums())
+
+    fig, ax = manager.subplots(figsize=(4, 3))
+    ax.plot([0, 1], [1, 0])
+    assert manager.stats().live == 1
+    assert len(plt.get_fignums()) == open_before
+
+    png = manager.render(fig, dpi=50)
+    assert png.startswith(b"\x89PNG")
+    stats = manager.stats()
+    assert (stats.live, stats.released, stats.encoded) == (0, 1, 1)
+
+
+def test_adopted_pyplot_figures_are_closed():
+    manager = FigureManager()
+    fig = manager.adopt(plt.figure(figsize=(3, 3)))
+    assert plt.fignum_exists(fig.number)
+    manager.render(fig, dpi=50)
+    assert not plt.fignum_exists(fig.number)
+
+
+def test_recycled_figures_are_reused_per_size():
+    manager = FigureManager(recycle=True)
+    fig, ax = manager.subplots(figsize=(4, 3))
+    fig.set_facecolor("black")
+    manager.render(fig, dpi=50)
+
+    again, _ = manager.subplots(figsize=(4, 3))
+    other, _ = manager.subplots(figsize=(5, 3))
+    assert again is fig
+    assert other is not fig
+    assert again.get_facecolor() != (0.0, 0.0, 0.0, 1.0)
+    assert len(again.axes) == 1
+    assert manager.stats().reused == 1
@@ -0,0 +1,64 @@
+from visual_lab.gallery import GalleryStore
+
+
+def test_identical_images_are_stored_once(tmp_path):
+    store = GalleryStore(tmp_path, max_bytes=1000, session_max_bytes=1000)
+    a = store.put("s1", b"png-1", "A", "", {"spec": {"type": "MatplotlibBox"}})
+    b = store.put("s2", b"png-1", "B", "")
+
+    assert a.hash == b.hash and a.id != b.id
+    assert a.settings == {"spec": {"type": "MatplotlibBox"}} and b.settings == {}
+    assert store.read(b) == b"png-1"
+    stats = store.stats()
+    assert (stats.items, stats.blobs, stats.bytes, stats.dedup_hits) == (2, 1, 5, 1)
+    assert len(list(tmp_path.glob("*/*.png"))) == 1
+
+
+def test_session_budget_evicts_that_sessions_least_recently_used(tmp_path):
+    store = GalleryStore(tmp_path, max_bytes=1000, session_max_bytes=10)
+    other = store.put("s2", b"x" * 8, "other", "")
+    first = store.put("s1", b"1111", "1", "")
+    second = store.put("s1", b"2222", "2", "")
+    store.read(first)
+    third = store.put("s1", b"3333", "3", "")
+
+    assert store.live([first, second, third, other]) == [first, third, other]
+    assert store.read(second) is None
+    assert store.session_bytes("s1") == 8
+    assert store.stats().evictions == 1
+    assert store.put("s1", b"x" * 11, "huge", "") is None
+
+
+def test_global_budget_evicts_across_sessions_and_deletes_files(tmp_path):
+    store = GalleryStore(tmp_path, max_bytes=10, session_max_bytes=10)
+    old = store.put("s1", b"1111", "1", "")
+    store.put("s2", b"2222", "2", "")
+    store.put("s3", b"3333", "3", "")
+
+    assert store.live([old]) == []
+    assert not store.path(old.hash).exists()
+    assert store.stats().bytes == 8
+
+    store.remove_session("s2")
+    assert store.stats().items == 1
+
+
+def test_thumbnails_are_downscaled_pngs():
+    import io
+
+    import matplotlib.pyplot as plt
+    from PIL import Image
+
+    from visual_lab.gallery import make_thumbnail
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.plot([0, 1], [1, 0])
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=200)
+    plt.close(fig)
+
+    thumb = make_thumbnail(buf.getvalue(), max_width=400)
+    with Image.open(io.BytesIO(thumb)) as img:
+        assert (img.format, img.size) == ("PNG", (400, 200))
+    assert len(thumb) < len(buf.getvalue())
+    assert make_thumbnail(thumb, max_width=400) is thumb
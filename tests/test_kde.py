@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+import seaborn as sns
+from scipy import stats
+
+from visual_lab import engine, kde
+from visual_lab.kde import BinnedKDE, gaussian_kde, seaborn_kde
+from visual_lab.specs import SeabornDistribution
+
+
+def _bimodal(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.concatenate([rng.normal(0, 1, n - n // 3), rng.normal(4, 0.5, n // 3)])
+
+
+@pytest.mark.parametrize("bw_method", [None, "scott", "silverman", 0.3])
+def test_matches_scipy(bw_method):
+    data = _bimodal()
+    support = np.linspace(data.min() - 1, data.max() + 1, 300)
+    exact = stats.gaussian_kde(data, bw_method=bw_method)
+    binned = BinnedKDE(data, bw_method=bw_method)
+    assert binned.factor == pytest.approx(exact.factor)
+    assert binned.covariance == pytest.approx(exact.covariance)
+    np.testing.assert_allclose(binned(support), exact(support), atol=1e-3 * exact(support).max())
+
+
+def test_weights_and_bandwidth_changes_match_scipy():
+    data = _bimodal(2000, seed=1)
+    weights = np.random.default_rng(2).uniform(0.1, 2.0, data.size)
+    exact = stats.gaussian_kde(data, weights=weights)
+    binned = BinnedKDE(data, weights=weights)
+    assert binned.neff == pytest.approx(exact.neff)
+    exact.set_bandwidth(exact.factor * 0.5)
+    binned.set_bandwidth(binned.factor * 0.5)
+    support = np.linspace(-4, 7, 200)
+    np.testing.assert_allclose(binned(support), exact(support), atol=1e-3 * exact(support).max())
+    assert binned.integrate_box_1d(-1, 2) == pytest.approx(exact.integrate_box_1d(-1, 2))
+
+
+def test_factory_falls_back_to_scipy_for_multivariate_data():
+    rng = np.random.default_rng(3)
+    assert isinstance(gaussian_kde(rng.normal(size=100)), BinnedKDE)
+    assert isinstance(gaussian_kde(rng.normal(size=(2, 100))), stats.gaussian_kde)
+    with pytest.raises(np.linalg.LinAlgError):
+        BinnedKDE(np.ones(10))
+
+
+def test_seaborn_kdeplot_uses_binned_kde_only_inside_the_block():
+    from seaborn import _statistics
+
+    original = _statistics.gaussian_kde
+    with seaborn_kde():
+        with seaborn_kde():
+            assert _statistics.gaussian_kde is gaussian_kde
+        ax = sns.kdeplot(x=_bimodal(500))
+        assert _statistics.gaussian_kde is gaussian_kde and len(ax.lines) == 1
+    assert _statistics.gaussian_kde is original
+    ax.figure.clf()
+
+
+def test_seaborn_kde_falls_back_without_the_private_name(monkeypatch):
+    from seaborn import _statistics
+
+    monkeypatch.delattr(_statistics, "gaussian_kde")
+    with seaborn_kde():
+        assert not hasattr(_statistics, "gaussian_kde")
+
+
+def test_engine_uses_binned_kde_while_drawing_only(monkeypatch):
+    from seaborn import _statistics
+
+    fits = []
+
+    class Counting(BinnedKDE):
+        def __init__(self, *args, **kwargs):
+            fits.append(1)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(kde, "BinnedKDE", Counting)
+    assert _statistics.gaussian_kde is not gaussian_kde
+    fig = engine.draw(SeabornDistribution(kind="KDE", x="x"), pd.DataFrame({"x": _bimodal(500)}))
+    assert fits and _statistics.gaussian_kde is not gaussian_kde
+    fig.clf()
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from visual_lab.figures import FigureManager, png_size
+from visual_lab.pairplot import CellCache, compute_cells, diag_cell, draw_pairplot
+
+
+def _frame(n=500):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({c: rng.normal(size=n) for c in "abcd"})
+    df["g"] = rng.choice(["x", "y", "rare"], p=[0.5, 0.45, 0.05], size=n)
+    return df
+
+
+def test_adding_a_variable_only_computes_the_new_row():
+    df = _frame()
+    cache = CellCache()
+    values = [df[c].to_numpy() for c in "abcd"]
+    compute_cells(values[:3], None, 1, cache)
+    assert cache.stats().misses == 6  # 3 diagonal + 3 lower cells
+    diagonal, lower = compute_cells(values, None, 1, cache)
+    stats = cache.stats()
+    assert (stats.hits, stats.misses - 6) == (6, 4)
+    assert len(diagonal) == 4 and sorted(lower) == [(1, 0), (2, 0), (2, 1), (3, 0), (3, 1), (3, 2)]
+
+
+def test_diagonal_curves_share_one_normalization():
+    df = _frame(2000)
+    codes = pd.factorize(df["g"])[0]
+    cell = diag_cell(df["a"].to_numpy(), codes, 3)
+    shares = df["g"].value_counts(normalize=True, sort=False)
+    for layer, support, density in cell.curves:
+        area = np.sum(density) * (support[1] - support[0])
+        assert abs(area - shares.iloc[layer]) < 0.01
+
+
+def test_draw_pairplot_creates_only_the_lower_triangle():
+    df = _frame()
+    figures = FigureManager()
+    fig = draw_pairplot(figures, df, ["a", "b", "c"], hue="g", cache=CellCache())
+    assert len(fig.axes) == 6
+    assert fig.axes[1].collections[0].get_rasterized()
+    assert [t.get_text() for t in fig.legends[0].get_texts()] == list(df["g"].unique())
+    assert png_size(figures.render(fig, dpi=30))[0] > 0
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from visual_lab.profile import DatasetProfile
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "a": [1.0, 2.0, np.nan, 4.0, 5.0],
+            "b": [5, 3, 4, 1, 2],
+            "day": pd.Categorical(["x", "y", "x", "x", None], categories=["x", "y", "z"]),
+            "name": ["p", "q", "p", "r", "p"],
+        }
+    )
+
+
+def test_profile_matches_direct_pandas_results():
+    df = _frame()
+    profile = DatasetProfile.from_frame(df)
+
+    assert profile.numeric_columns == ("a", "b")
+    assert profile.categorical_columns == ("day", "name")
+    assert profile.missing_ratio == float(df.isna().mean().mean() * 100)
+    pd.testing.assert_frame_equal(profile.corr_subset(["b", "a"]), df[["b", "a"]].corr())
+    assert profile.quantiles.loc["a", "max"] == 5.0
+    assert profile.quantiles.loc["b", "50%"] == 3.0
+
+
+def test_profile_top_categories_skip_unused_levels():
+    profile = DatasetProfile.from_frame(_frame())
+    assert profile.n_unique == {"day": 2, "name": 3}
+    assert list(profile.top("name", 1)) == ["p"]
+    assert "z" not in profile.top_categories["day"].index
@@ -0,0 +1,52 @@
+import pandas as pd
+
+from visual_lab.render_cache import RenderCache, dataset_fingerprint, make_key
+
+
+def test_render_cache_hits_and_misses():
+    cache = RenderCache(max_bytes=1024)
+    calls = []
+
+    def render() -> bytes:
+        calls.append(1)
+        return b"png"
+
+    assert cache.get_or_render("k", render) == b"png"
+    assert cache.get_or_render("k", render) == b"png"
+    stats = cache.stats()
+    assert len(calls) == 1
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+
+def test_render_cache_evicts_least_recently_used_within_budget():
+    cache = RenderCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.get("a")
+    cache.put("c", b"1234")
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.stats().bytes <= 10
+    assert cache.stats().evictions == 1
+
+    cache.put("huge", b"x" * 11)
+    assert "huge" not in cache
+
+
+def test_make_key_ignores_dict_order_but_not_values():
+    theme = {"context": "notebook", "style": "whitegrid", "palette": "deep", "dark": True}
+    k1 = make_key("fp", {"kind": "Histogram", "bins": 30}, theme, 200)
+    k2 = make_key("fp", {"bins": 30, "kind": "Histogram"}, dict(reversed(theme.items())), 200)
+    assert k1 == k2
+    assert k1 != make_key("fp", {"kind": "Histogram", "bins": 31}, theme, 200)
+    assert k1 != make_key("fp", {"kind": "Histogram", "bins": 30}, {**theme, "dark": False}, 200)
+    assert k1 != make_key("fp", {"kind": "Histogram", "bins": 30}, theme, 300)
+
+
+def test_dataset_fingerprint_tracks_content():
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    assert dataset_fingerprint(df) == dataset_fingerprint(df.copy())
+    changed = df.copy()
+    changed.loc[0, "a"] = 10
+    assert dataset_fingerprint(df) != dataset_fingerprint(changed)
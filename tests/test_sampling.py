@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from visual_lab import store
+from visual_lab.sampling import (
+    SampleCache,
+    cap_rows,
+    reservoir_sample,
+    stratified_sample,
+    stratum_sizes,
+)
+
+
+def test_cap_rows_is_seeded_and_keeps_row_order():
+    df = pd.DataFrame({"x": range(1000)})
+    assert cap_rows(df, 2000) is df
+
+    sample = cap_rows(df, 100)
+    assert len(sample) == 100
+    assert sample["x"].is_monotonic_increasing
+    assert sample.equals(cap_rows(df, 100))
+
+
+def test_stratified_sample_keeps_rare_levels():
+    df = pd.DataFrame({"x": range(10_000), "g": ["common"] * 9_950 + ["rare"] * 50})
+    sample = stratified_sample(df, 200, by="g")
+    counts = sample["g"].value_counts()
+    assert len(sample) == 200
+    assert counts["rare"] == 50  # a plain random sample would expect 1
+    assert sample["x"].is_monotonic_increasing
+    assert sample.equals(stratified_sample(df, 200, by="g"))
+
+
+def test_sample_cache_reuses_positions_of_complete_rows():
+    df = pd.DataFrame(
+        {
+            "x": np.arange(3000, dtype=float),
+            "y": np.where(np.arange(3000) % 10 == 0, np.nan, 1.0),
+            "g": np.repeat(["a", "b", "c"], 1000),
+        }
+    )
+    cache = SampleCache(df)
+    first = cache.sample(["x", "y"], 300, by="g")
+    again = cache.sample(["x", "y"], 300, by="g")
+    assert again.equals(first)
+    assert list(first.columns) == ["x", "y", "g"]
+    assert first.notna().all().all() and len(first) == 300
+    assert first["g"].value_counts().to_dict() == {"a": 100, "b": 100, "c": 100}
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+
+def test_reservoir_sample_is_uniform_over_the_stream():
+    chunks = (pd.DataFrame({"x": np.arange(i, i + 1000)}) for i in range(0, 100_000, 1000))
+    sample = reservoir_sample(chunks, 2000)
+    assert len(sample) == 2000
+    assert sample["x"].is_unique and sample["x"].is_monotonic_increasing
+    # Each tenth of the stream should hold about a tenth of the sample.
+    per_decile = np.bincount(sample["x"] // 10_000, minlength=10)
+    assert per_decile.min() > 150 and per_decile.max() < 250
+    assert reservoir_sample(iter([]), 10).empty
+
+
+def test_stratified_reservoir_allocates_like_stratified_sample():
+    df = pd.DataFrame({"x": range(10_000), "g": ["common"] * 9_950 + ["rare"] * 50})
+    chunks = (df.iloc[i : i + 700] for i in range(0, len(df), 700))
+    sample = reservoir_sample(chunks, 200, by="g")
+    counts = sample["g"].value_counts()
+    assert [counts["common"], counts["rare"]] == stratum_sizes([9_950, 50], 200).tolist()
+    assert counts["rare"] == 50
+    assert sample["x"].is_unique and sample["x"].is_monotonic_increasing
+
+
+def test_sample_cache_streams_large_sources(tmp_path):
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(
+        {
+            "x": np.where(rng.random(20_000) < 0.1, np.nan, rng.normal(size=20_000)),
+            "g": rng.choice(["a", "b", "c"], 20_000, p=[0.9, 0.09, 0.01]),
+        }
+    )
+    path = tmp_path / "big.arrow"
+    store.write_arrow(df, path, batch_rows=3_000)
+    assert len(list(store.iter_arrow(path))) == 7
+
+    streamed = SampleCache(df, source=lambda: store.iter_arrow(path)).sample(["x"], 500, by="g")
+    sliced = SampleCache(df).sample(["x"], 500, by="g")
+    assert streamed.equals(sliced)
+    assert len(streamed) == 500 and streamed["x"].notna().all()
+    assert streamed.index.is_monotonic_increasing
+    assert (streamed["g"] == "c").sum() > 80  # a plain random sample would expect 5
+
+
+def test_more_levels_than_rows_keeps_the_sample_size():
+    counts = np.array([500, 3, 40, 1, 7, 2, 60])
+    take = stratum_sizes(counts, 4)
+    assert take.tolist() == [0, 1, 0, 1, 1, 1, 0]  # the four rarest levels
+
+    df = pd.DataFrame({"x": range(1_000), "g": np.arange(1_000) % 50})
+    assert len(stratified_sample(df, 20, by="g")) == 20
+    assert len(SampleCache(df).sample(["x"], 20, by="g")) == 20
@@ -0,0 +1,57 @@
+import io
+
+import pandas as pd
+import pytest
+
+from visual_lab import store
+
+
+def test_arrow_round_trip_keeps_dtypes_and_categories(tmp_path):
+    frame = pd.DataFrame(
+        {
+            "value": [1.5, 2.5, None],
+            "count": [1, 2, 3],
+            "day": pd.Categorical(["Sun", "Thur", "Sun"], categories=["Thur", "Sun"]),
+        }
+    )
+    path = store.store_path("sample", tmp_path)
+    assert store.write_arrow(frame, path) > 0
+
+    back = store.read_arrow(path)
+    pd.testing.assert_frame_equal(back, frame)
+    assert list(back["day"].cat.categories) == ["Thur", "Sun"]
+
+
+def test_missing_file_never_touches_the_network_when_offline(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        store.load_dataset("tips", root=tmp_path, online=False)
+
+
+def test_catalog_download_is_bounded_and_cached(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEABORN_DATA", str(tmp_path))
+    timeouts = []
+
+    class Response(io.BytesIO):
+        def __enter__(self):
+            return self
+
+    def fake_urlopen(url, timeout):
+        timeouts.append(timeout)
+        return Response(b"a,b\n1,2\n3,4\n")
+
+    monkeypatch.setattr(store, "urlopen", fake_urlopen)
+    frame = store.catalog_dataset("mini", timeout=2.5)
+    assert frame.shape == (2, 2) and timeouts == [2.5]
+    store.catalog_dataset("mini")
+    assert timeouts == [2.5]  # served from seaborn's cache
+
+
+def test_unreachable_catalog_raises_oserror(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEABORN_DATA", str(tmp_path))
+
+    def unreachable(url, timeout):
+        raise TimeoutError("timed out")
+
+    monkeypatch.setattr(store, "urlopen", unreachable)
+    with pytest.raises(OSError):
+        store.load_dataset("tips", root=tmp_path, online=True)
@@ -0,0 +1,62 @@
+import threading
+
+import matplotlib as mpl
+import pytest
+from matplotlib.colors import to_hex
+
+from visual_lab import engine
+from visual_lab.datasets import demo_frame
+from visual_lab.figures import FigureManager
+from visual_lab.specs import MatplotlibHistogram, SeabornPairplot
+from visual_lab.theme import DARK_BACKGROUND, DARK_FOREGROUND, compile_theme, use_theme
+
+LIGHT = {"context": "paper", "style": "ticks", "palette": "bright", "dark": False}
+
+
+def test_compiled_themes_are_cached_and_read_only():
+    theme = compile_theme(LIGHT)
+    assert compile_theme(dict(reversed(LIGHT.items()))) is theme
+    assert compile_theme({}) is compile_theme(engine.DEFAULT_THEME)
+    with pytest.raises(TypeError):
+        theme.rc["font.size"] = 20
+
+
+def test_use_theme_restores_global_rcparams():
+    before = dict(mpl.rcParams)
+    with use_theme(LIGHT) as theme:
+        assert mpl.rcParams["axes.prop_cycle"] == theme.rc["axes.prop_cycle"]
+        assert mpl.rcParams["xtick.major.size"] == theme.rc["xtick.major.size"]
+    assert dict(mpl.rcParams) == before
+
+
+def test_dark_figures_are_coloured_while_drawing():
+    figures = FigureManager()
+    spec = SeabornPairplot(columns=["x", "y"], hue="group", sample=60)
+    with use_theme(engine.DEFAULT_THEME):
+        fig = engine.draw(spec, demo_frame(120), figures)
+    texts = [fig._suptitle, *fig.legends[0].get_texts()]
+    for ax in fig.get_axes():
+        assert to_hex(ax.get_facecolor()) == DARK_BACKGROUND
+        texts += [ax.xaxis.label, ax.yaxis.label, *ax.get_yticklabels()]
+    assert to_hex(fig.get_facecolor()) == DARK_BACKGROUND
+    assert {to_hex(text.get_color()) for text in texts} == {DARK_FOREGROUND}
+    figures.release(fig)
+
+
+def test_concurrent_renders_keep_their_own_theme():
+    df = demo_frame(200)
+    spec = MatplotlibHistogram(x="x", bins=20)
+    themes = [LIGHT, {**LIGHT, "style": "darkgrid", "palette": "Set2"}, engine.DEFAULT_THEME]
+    expected = [engine.render(spec, df, theme, dpi=60) for theme in themes]
+    results: dict[int, bytes] = {}
+
+    def run(i: int) -> None:
+        results[i] = engine.render(spec, df, themes[i % 3], dpi=60)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(expected)) == 3
+    assert all(results[i] == expected[i % 3] for i in range(9))
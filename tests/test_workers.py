@@ -0,0 +1,97 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from visual_lab import engine
+from visual_lab.datasets import FALLBACK_LOADERS, DatasetRegistry
+from visual_lab.figures import png_size
+from visual_lab.specs import MatplotlibHistogram, spec_to_dict
+from visual_lab.workers import QueueFull, RenderJob, RenderPool, render_job
+
+
+@pytest.fixture
+def gate():
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def thread_pool(workers=1, **kwargs):
+    return RenderPool(workers=workers, executor=lambda: ThreadPoolExecutor(workers), **kwargs)
+
+
+def test_queue_limit_rejects_and_stats_count_waits(gate):
+    pool = thread_pool(max_queue=2, per_session=5)
+    running = pool.submit("a", "s0", gate.wait)
+    queued = [pool.submit("a", f"s{i}", lambda i=i: i) for i in (1, 2)]
+    with pytest.raises(QueueFull):
+        pool.submit("a", "s3", lambda: 3)
+    assert [t.position() for t in queued] == [0, 1]
+    stats = pool.stats()
+    assert (stats.running, stats.queued, stats.rejected) == (1, 2, 1)
+
+    gate.set()
+    assert [t.result(5) for t in queued] == [1, 2]
+    assert running.wait(5)
+    stats = pool.stats()
+    assert (stats.running, stats.queued, stats.completed) == (0, 0, 3)
+    assert stats.wait_max_ms >= stats.wait_mean_ms > 0
+
+
+def test_per_session_cap_lets_other_sessions_through(gate):
+    pool = thread_pool(workers=2, per_session=1)
+    busy = pool.submit("a", "one", gate.wait)
+    blocked = pool.submit("a", "two", lambda: "a2")
+    other = pool.submit("b", "one", lambda: "b1")
+    assert other.result(5) == "b1"
+    assert blocked.position() == 0 and busy.running
+    gate.set()
+    assert blocked.result(5) == "a2"
+
+
+def test_newer_submission_supersedes_queued_render_in_its_slot(gate):
+    pool = thread_pool()
+    pool.submit("a", "display", gate.wait)
+    first = pool.submit("a", "display", lambda: "old")
+    second = pool.submit("a", "display", lambda: "new")
+    assert first.future.cancelled() and not second.future.cancelled()
+    assert second.cancel() and second.future.cancelled()
+
+    third = pool.submit("a", "display", lambda: "newest")
+    gate.set()
+    assert third.result(5) == "newest"
+    stats = pool.stats()
+    assert (stats.superseded, stats.cancelled, stats.submitted) == (1, 1, 4)
+
+
+def test_failures_reach_the_waiter_and_free_the_worker():
+    pool = thread_pool()
+    failing = pool.submit("a", "x", lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        failing.result(5)
+    assert pool.submit("a", "x", lambda: "ok").result(5) == "ok"
+    assert pool.stats().failed == 1
+
+
+def test_worker_processes_render_datasets_by_name():
+    name = next(iter(FALLBACK_LOADERS))
+    entry = DatasetRegistry({}, fallback=FALLBACK_LOADERS).entry(name)
+    job = RenderJob(
+        name,
+        entry.fingerprint,
+        spec_to_dict(MatplotlibHistogram(x="x", bins=10)),
+        engine.DEFAULT_THEME,
+        dpi=50,
+    )
+    pool = RenderPool(workers=1)
+    try:
+        png = pool.submit("a", "display", render_job, job).result(120)
+    finally:
+        pool.shutdown()
+    assert png == render_job(job)
+    assert png_size(png)[0] > 0
+
+    stale = RenderJob(name, "0" * 32, job.spec, job.theme, dpi=50)
+    with pytest.raises(ValueError):
+        render_job(stale)
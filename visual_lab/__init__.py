@@ -0,0 +1 @@
+"""Rendering and data helpers behind the Seaborn & Matplotlib Visual Lab app."""
@@ -0,0 +1,169 @@
+"""Batch rendering of plot specs across datasets, outside Streamlit.
+
+A batch file (JSON, or YAML when PyYAML is installed) lists plot specs in the
+``spec_to_dict`` form, plus the datasets to render them on::
+
+    dpi: 300
+    theme: {style: ticks, dark: false}   # merged over engine.DEFAULT_THEME
+    datasets: [Tips, Diamonds]           # default for every plot
+    plots:
+      - {type: SeabornDistribution, kind: KDE, x: carat}
+      - {type: SeabornHeatmap, columns: [tip, total_bill, size], datasets: [Tips]}
+
+A bare list of plots is accepted too, each with its own ``dataset``. Every
+(plot, dataset) pair becomes one job; jobs are rendered by ``engine.render``
+in a process pool with the Agg backend, and each worker loads a dataset (and
+its profile) once through ``workers.worker_dataset``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from visual_lab import engine
+from visual_lab.datasets import BUILTIN_LOADERS, FALLBACK_LOADERS
+from visual_lab.specs import PlotSpec, spec_from_dict, spec_to_dict
+from visual_lab.workers import init_worker, worker_dataset
+
+DEFAULT_DPI = 300
+
+
+@dataclass(frozen=True)
+class Job:
+    index: int
+    dataset: str
+    spec: PlotSpec
+    dpi: int
+    theme: dict[str, Any] = field(hash=False)
+    name: str | None = None
+
+    @property
+    def filename(self) -> str:
+        label = self.name or type(self.spec).__name__
+        stem = re.sub(r"[^A-Za-z0-9]+", "_", f"{self.dataset}_{label}").strip("_")
+        return f"{self.index:03d}_{stem}.png"
+
+
+def read_batch_file(path: Path) -> Any:
+    text = Path(path).read_text(encoding="utf-8")
+    if Path(path).suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as exc:
+            raise ValueError("YAML batch files need PyYAML (pip install pyyaml)") from exc
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+def parse_jobs(data: Any, dpi: int | None = None) -> list[Job]:
+    """Expand a batch document into one job per (plot, dataset) pair.
+
+    ``dpi``, when given, overrides every DPI set in the document.
+    """
+    if isinstance(data, list):
+        data = {"plots": data}
+    if not isinstance(data, dict) or not isinstance(data.get("plots"), list):
+        raise ValueError("A batch needs a list of plots (or a mapping with a 'plots' list)")
+    default_dpi = int(data.get("dpi", DEFAULT_DPI))
+    theme = {**engine.DEFAULT_THEME, **data.get("theme", {})}
+    default_datasets = data.get("datasets", [])
+    known = {**BUILTIN_LOADERS, **FALLBACK_LOADERS}
+
+    jobs: list[Job] = []
+    for position, plot in enumerate(data["plots"], start=1):
+        plot = dict(plot)
+        datasets = plot.pop("datasets", None) or default_datasets
+        if "dataset" in plot:
+            datasets = [plot.pop("dataset")]
+        if isinstance(datasets, str):
+            datasets = [datasets]
+        name = plot.pop("name", None)
+        plot_dpi = dpi or int(plot.pop("dpi", default_dpi))
+        plot.pop("dpi", None)
+        try:
+            spec = spec_from_dict(plot)
+        except ValueError as exc:
+            raise ValueError(f"plot #{position}: {exc}") from exc
+        if not datasets:
+            raise ValueError(f"plot #{position}: no dataset given")
+        for dataset in datasets:
+            if dataset not in known:
+                raise ValueError(f"plot #{position}: unknown dataset {dataset!r}")
+            jobs.append(Job(len(jobs) + 1, dataset, spec, plot_dpi, theme, name))
+    return jobs
+
+
+# ----- Worker side -----
+def render_job(job: Job, out_dir: Path) -> dict[str, Any]:
+    """Render one job to ``out_dir`` and return its manifest record."""
+    record: dict[str, Any] = {
+        "dataset": job.dataset,
+        "spec": spec_to_dict(job.spec),
+        "dpi": job.dpi,
+    }
+    if job.name:
+        record["name"] = job.name
+    start = time.perf_counter()
+    try:
+        df, profile = worker_dataset(job.dataset)
+        png = engine.render(job.spec, df, job.theme, job.dpi, profile=profile)
+    except Exception as exc:  # a bad column or kind fails its own job, not the batch
+        record["error"] = f"{type(exc).__name__}: {exc}"
+        return record
+    (out_dir / job.filename).write_bytes(png)
+    record.update(
+        file=job.filename,
+        bytes=len(png),
+        sha256=hashlib.sha256(png).hexdigest(),
+        ms=round((time.perf_counter() - start) * 1000, 1),
+    )
+    return record
+
+
+def _records(jobs: list[Job], out_dir: Path, workers: int) -> Iterator[tuple[Job, dict]]:
+    if workers <= 1:
+        for job in jobs:
+            yield job, render_job(job, out_dir)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        futures = {pool.submit(render_job, job, out_dir): job for job in jobs}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def run_batch(
+    jobs: list[Job],
+    out_dir: Path,
+    workers: int | None = None,
+    progress: Callable[[Job, dict], None] | None = None,
+) -> dict[str, Any]:
+    """Render ``jobs`` into ``out_dir`` and write ``manifest.json`` next to the PNGs."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, max(len(jobs), 1))
+    start = time.perf_counter()
+    results: dict[int, dict] = {}
+    for job, record in _records(jobs, out_dir, workers):
+        results[job.index] = record
+        if progress is not None:
+            progress(job, record)
+    records = [results[job.index] for job in jobs]
+    manifest = {
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "workers": workers,
+        "seconds": round(time.perf_counter() - start, 2),
+        "rendered": sum("file" in r for r in records),
+        "failed": sum("error" in r for r in records),
+        "plots": records,
+    }
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
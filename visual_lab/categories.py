@@ -0,0 +1,37 @@
+"""Integer codes of a frame's columns, computed once per column.
+
+Colouring points by a column needs, for every row, the index of its value
+among the column's levels. ``CategoryCodes`` factorizes each column on first
+use (levels in order of first appearance, missing values coded -1) and keeps
+the result, so redrawing with the same colour column costs an array lookup
+instead of one comparison pass over the rows per level.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class CategoryCodes:
+    """Lazily computed, cached ``(levels, codes)`` of a frame's columns."""
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        self._df = df
+        self._codes: dict[str, tuple[list[str], np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, column: str) -> tuple[list[str], np.ndarray]:
+        """Level labels and a read-only level index per row (-1 for missing)."""
+        with self._lock:
+            result = self._codes.get(column)
+        if result is None:
+            codes, levels = pd.factorize(self._df[column], sort=False)
+            codes = codes.astype(np.intp)
+            codes.flags.writeable = False
+            result = ([str(level) for level in levels], codes)
+            with self._lock:
+                self._codes[column] = result
+        return result
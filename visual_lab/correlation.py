@@ -0,0 +1,172 @@
+"""Correlation matrices computed once per dataset and method.
+
+Any subset the UI asks for is a slice of the full numeric matrix. Results
+match ``DataFrame.corr`` (pairwise-complete observations, ``min_periods=1``):
+
+- Pearson is computed for all pairs at once from masked matrix products, so
+  missing values cost nothing extra and hundreds of columns stay fast.
+- Spearman runs the same Pearson kernel on cached column ranks. Pairs whose
+  complete rows differ from either column's own non-missing rows need ranks
+  over their common rows instead, as pandas computes them. Those come from
+  ``pairwise_spearman``: one sort per column, then every column's ranks within
+  every other column's mask from cumulative counts, in blocks of columns.
+- Kendall has no matrix form; it is computed pair by pair with
+  ``scipy.stats.kendalltau`` (tau-b), only when requested.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+METHODS = ("pearson", "spearman", "kendall")
+# Working memory of one block of pairwise-complete rank arrays.
+SPEARMAN_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def pairwise_pearson(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Pearson correlation of every column pair over their common non-NaN rows."""
+    m = mask.astype(float)
+    counts = mask.sum(axis=0)
+    # Centering on each column's own mean keeps the sums below well conditioned.
+    means = np.where(mask, values, 0.0).sum(axis=0) / np.maximum(counts, 1)
+    z = np.where(mask, values - means, 0.0)
+
+    n = m.T @ m
+    s = z.T @ m  # s[i, j]: sum of column i over rows where i and j are both present
+    q = (z * z).T @ m
+    p = z.T @ z
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = p - s * s.T / n
+        var = q - s * s / n
+        r = cov / np.sqrt(var * var.T)
+    r[(n < 1) | ~(var > 0) | ~(var.T > 0)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def _rank_columns(values: np.ndarray) -> np.ndarray:
+    return stats.rankdata(values, axis=0, nan_policy="omit")
+
+
+def _subset_ranks(
+    values: np.ndarray, order: np.ndarray, masks: np.ndarray, out: np.ndarray
+) -> None:
+    """Twice the average ranks of ``values`` among the rows of each mask column.
+
+    ``order`` lists the non-missing rows of ``values`` in sorted order. Column
+    ``c`` of ``out`` receives, for every row present in both ``values`` and
+    ``masks[:, c]``, twice its rank among those rows (an integer even for
+    ties); all other entries are 0.
+    """
+    ordered = values[order]
+    inside = masks[order]
+    seen = np.zeros((len(order) + 1, masks.shape[1]), dtype=np.int32)
+    np.cumsum(inside, axis=0, out=seen[1:])
+    first = np.empty(len(order), dtype=bool)
+    first[:1] = True
+    np.not_equal(ordered[1:], ordered[:-1], out=first[1:])
+    if first.all():
+        ranks = seen[1:] * 2
+    else:
+        # Tied values share the mean of the ranks their group spans.
+        starts = np.flatnonzero(first)
+        ends = np.append(starts[1:], len(order))
+        group = np.cumsum(first) - 1
+        ranks = seen[starts[group]] + seen[ends[group]] + 1
+    ranks *= inside
+    out[:] = 0
+    out[order] = ranks
+
+
+def pairwise_spearman(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Spearman correlation of every column pair, ranked over their common rows."""
+    n, k = values.shape
+    orders = []
+    for i in range(k):
+        present = np.flatnonzero(mask[:, i])
+        orders.append(present[np.argsort(values[present, i], kind="stable")])
+    common = mask.T.astype(float) @ mask.astype(float)
+    cross = np.empty((k, k))
+    squares = np.empty((k, k))
+    block = max(1, SPEARMAN_BLOCK_BYTES // (4 * max(n, 1) * max(k, 1)))
+    own = np.empty((n, k), dtype=np.int32)
+    other = np.empty((k, n, min(block, k)), dtype=np.int32)
+    for start in range(0, k, block):
+        cols = slice(start, min(start + block, k))
+        # other[j][:, b]: ranks of column j over its rows shared with start + b.
+        for j in range(k):
+            _subset_ranks(values[:, j], orders[j], mask[:, cols], other[j, :, : cols.stop - start])
+        for b, i in enumerate(range(cols.start, cols.stop)):
+            # own[:, j]: ranks of column i over its rows shared with j.
+            _subset_ranks(values[:, i], orders[i], mask, own)
+            wide = own.astype(float)
+            cross[i] = np.einsum("rj,jr->j", wide, other[:, :, b], dtype=float)
+            squares[i] = np.einsum("rj,rj->j", wide, wide)
+    cross /= 4
+    squares /= 4
+    # Average ranks over m rows always sum to m (m + 1) / 2.
+    centre = common * ((common + 1) / 2) ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = squares - centre
+        r = (cross - centre) / np.sqrt(var * var.T)
+    r[(common < 1) | ~(var > 0) | ~(var.T > 0)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+class CorrelationEngine:
+    """Lazily computed, cached correlation matrices of a frame's numeric columns."""
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        numeric = df.select_dtypes(include=[np.number])
+        self.columns = numeric.columns
+        self._values = numeric.to_numpy(dtype=float, na_value=np.nan)
+        self._mask = ~np.isnan(self._values)
+        self._ranks: np.ndarray | None = None
+        self._matrices: dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def matrix(self, method: str = "pearson") -> pd.DataFrame:
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+        with self._lock:
+            result = self._matrices.get(method)
+            if result is None:
+                values = getattr(self, f"_{method}")()
+                result = pd.DataFrame(values, index=self.columns, columns=self.columns)
+                self._matrices[method] = result
+        return result
+
+    def subset(self, columns: list[str], method: str = "pearson") -> pd.DataFrame:
+        """Same as ``df[columns].corr(method)``, sliced from the cached matrix."""
+        return self.matrix(method).loc[columns, columns]
+
+    def _pearson(self) -> np.ndarray:
+        return pairwise_pearson(self._values, self._mask)
+
+    def _spearman(self) -> np.ndarray:
+        if self._ranks is None:
+            self._ranks = _rank_columns(self._values)
+        result = pairwise_pearson(self._ranks, self._mask)
+
+        counts = self._mask.sum(axis=0)
+        common = self._mask.T.astype(int) @ self._mask.astype(int)
+        exact = (common == counts[:, None]) & (common == counts[None, :])
+        if not exact.all():
+            result = np.where(exact, result, pairwise_spearman(self._values, self._mask))
+        return result
+
+    def _kendall(self) -> np.ndarray:
+        k = len(self.columns)
+        result = np.full((k, k), np.nan)
+        for i in range(k):
+            if self._mask[:, i].any():
+                result[i, i] = 1.0
+            for j in range(i + 1, k):
+                rows = self._mask[:, i] & self._mask[:, j]
+                if rows.sum() > 1:
+                    tau = stats.kendalltau(self._values[rows, i], self._values[rows, j])[0]
+                    result[i, j] = result[j, i] = tau
+        return result
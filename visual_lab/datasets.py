@@ -0,0 +1,195 @@
+"""Process-wide registry of the built-in datasets.
+
+Every session reads the same frames, each loaded the first time it is
+requested. ``get`` hands out a shallow copy, which
+under pandas Copy-on-Write shares the underlying arrays (no data is copied)
+while any mutation by a caller copies first, so the shared frame can never be
+changed through it. Copy-on-Write is a process-wide pandas option (the default
+from pandas 3); the app and the render workers turn it on at startup with
+``enable_copy_on_write`` rather than this module doing so on import.
+
+Frames are converted to compact dtypes as they are loaded (see
+``visual_lab.dtypes``); ``memory_report`` shows what that saved.
+
+Datasets come from the vendored Arrow store (see ``visual_lab.store``). When
+one cannot be loaded it is dropped from the list and a small deterministic
+demo frame becomes available so the UI stays usable. Failures expire after
+``ERROR_RETRY_SECONDS``, so a dataset hidden by a transient network error is
+listed (and loaded) again later.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from visual_lab.dtypes import compact_frame
+from visual_lab.render_cache import dataset_fingerprint
+from visual_lab.store import load_dataset
+
+
+def enable_copy_on_write() -> None:
+    """Turn on pandas Copy-on-Write, which ``DatasetRegistry.get`` relies on."""
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+# How long a dataset that failed to load stays hidden before it is retried.
+ERROR_RETRY_SECONDS = 300.0
+
+
+def _penguins() -> pd.DataFrame:
+    return load_dataset("penguins").dropna()
+
+
+def demo_frame(rows: int = 240, seed: int = 7) -> pd.DataFrame:
+    """Small synthetic dataset with the column mix every view expects."""
+    rng = np.random.default_rng(seed)
+    group = rng.choice(["A", "B", "C", "D"], size=rows)
+    x = rng.normal(50, 12, rows).round(2)
+    y = (
+        0.6 * x + rng.normal(0, 6, rows) + np.select([group == "A", group == "B"], [5, -5], 0)
+    ).round(2)
+    return pd.DataFrame(
+        {
+            "x": x,
+            "y": y,
+            "size": rng.integers(1, 7, rows),
+            "score": rng.gamma(2.0, 1.5, rows).round(3),
+            "group": pd.Categorical(group, categories=["A", "B", "C", "D"]),
+            "day": pd.Categorical(
+                rng.choice(["Mon", "Tue", "Wed", "Thu", "Fri"], size=rows),
+                categories=["Mon", "Tue", "Wed", "Thu", "Fri"],
+            ),
+        }
+    )
+
+
+BUILTIN_LOADERS: dict[str, Callable[[], pd.DataFrame]] = {
+    "Tips": lambda: load_dataset("tips"),
+    "Penguins": _penguins,
+    "Flights": lambda: load_dataset("flights"),
+    "Iris": lambda: load_dataset("iris"),
+    "Diamonds": lambda: load_dataset("diamonds"),
+    "Titanic": lambda: load_dataset("titanic"),
+    "Car Crashes": lambda: load_dataset("car_crashes"),
+}
+
+FALLBACK_LOADERS: dict[str, Callable[[], pd.DataFrame]] = {"Demo (offline)": demo_frame}
+
+
+@dataclass(frozen=True)
+class DatasetEntry:
+    name: str
+    frame: pd.DataFrame
+    fingerprint: str
+    nbytes: int
+    loaded_nbytes: int
+
+
+class DatasetRegistry:
+    """Named, shared, read-only DataFrames, loaded on first use."""
+
+    def __init__(
+        self,
+        loaders: Mapping[str, Callable[[], pd.DataFrame]],
+        fallback: Mapping[str, Callable[[], pd.DataFrame]] | None = None,
+        compact: bool = True,
+        arrow_strings: bool = False,
+        retry_after: float = ERROR_RETRY_SECONDS,
+    ) -> None:
+        self._loaders = dict(loaders)
+        self.retry_after = retry_after
+        self.compact = compact
+        self.arrow_strings = arrow_strings
+        self._fallback = dict(fallback or {})
+        self._entries: dict[str, DatasetEntry] = {}
+        self._locks = {name: threading.Lock() for name in {**self._loaders, **self._fallback}}
+        self.errors: dict[str, str] = {}
+        self._failed_at: dict[str, float] = {}
+        self._errors_lock = threading.Lock()
+
+    def _register(self, name: str, frame: pd.DataFrame) -> DatasetEntry:
+        if self.compact:
+            frame, report = compact_frame(frame, self.arrow_strings)
+            nbytes, loaded_nbytes = report.bytes_after, report.bytes_before
+        else:
+            nbytes = loaded_nbytes = int(frame.memory_usage(deep=True).sum())
+        return DatasetEntry(
+            name=name,
+            frame=frame,
+            fingerprint=dataset_fingerprint(frame),
+            nbytes=nbytes,
+            loaded_nbytes=loaded_nbytes,
+        )
+
+    def _expire_errors(self) -> None:
+        cutoff = time.monotonic() - self.retry_after
+        with self._errors_lock:
+            for name, failed_at in list(self._failed_at.items()):
+                if failed_at <= cutoff:
+                    del self._failed_at[name]
+                    self.errors.pop(name, None)
+
+    def names(self) -> list[str]:
+        """Selectable datasets; the fallback is offered while a loader's failure is recent."""
+        self._expire_errors()
+        names = [name for name in self._loaders if name not in self.errors]
+        if self.errors or not names:
+            names += list(self._fallback)
+        return names
+
+    @property
+    def fallback_name(self) -> str | None:
+        return next(iter(self._fallback), None)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._entries
+
+    def entry(self, name: str) -> DatasetEntry:
+        """Load ``name`` once (concurrent callers wait for the same load)."""
+        entry = self._entries.get(name)
+        if entry is not None:
+            return entry
+        with self._locks[name]:
+            entry = self._entries.get(name)
+            if entry is None:
+                load = self._loaders.get(name) or self._fallback[name]
+                try:
+                    frame = load()
+                except (OSError, ValueError) as exc:
+                    with self._errors_lock:
+                        self.errors[name] = str(exc)
+                        self._failed_at[name] = time.monotonic()
+                    raise
+                entry = self._entries[name] = self._register(name, frame)
+                with self._errors_lock:
+                    self.errors.pop(name, None)
+                    self._failed_at.pop(name, None)
+        return entry
+
+    def get(self, name: str) -> pd.DataFrame:
+        return self.entry(name).frame.copy(deep=False)
+
+    def fingerprint(self, name: str) -> str:
+        return self.entry(name).fingerprint
+
+    def memory_report(self) -> pd.DataFrame:
+        """Rows, columns, resident MB and MB saved by compaction, per loaded dataset."""
+        rows = [
+            {
+                "dataset": entry.name,
+                "rows": len(entry.frame),
+                "columns": entry.frame.shape[1],
+                "MB": round(entry.nbytes / 1024**2, 3),
+                "MB saved": round((entry.loaded_nbytes - entry.nbytes) / 1024**2, 3),
+            }
+            for entry in list(self._entries.values())
+        ]
+        columns = ["dataset", "rows", "columns", "MB", "MB saved"]
+        return pd.DataFrame(rows, columns=columns).set_index("dataset")
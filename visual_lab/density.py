@@ -0,0 +1,139 @@
+"""Density-aggregated scatter plots for large frames.
+
+Instead of one marker per row, points are counted into a fixed grid of bins
+(one vectorized ``np.bincount`` pass) and the grid is drawn as an image, so
+drawing and encoding cost depends on the grid size rather than the row count.
+With a hue column each level becomes its own translucent single-colour layer.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+from matplotlib.axes import Axes
+from matplotlib.colors import LinearSegmentedColormap, LogNorm, to_rgb
+from matplotlib.patches import Patch
+
+# Plots with more rows than this switch to the density view by default.
+DEFAULT_DENSITY_ROWS = 50_000
+DENSITY_ROW_OPTIONS = (10_000, 20_000, 50_000, 100_000, 250_000, 1_000_000)
+# Horizontal bins; the vertical count follows the axes' aspect ratio.
+DENSITY_BINS = 200
+# Hue levels beyond the most frequent ones are merged into one "other" layer.
+MAX_LAYERS = 10
+
+
+def grid_extent(x: np.ndarray, y: np.ndarray) -> tuple[float, float, float, float]:
+    """(xmin, xmax, ymin, ymax) of the finite points, widened if degenerate."""
+    bounds = []
+    for values in (x, y):
+        finite = values[np.isfinite(values)]
+        lo, hi = (float(finite.min()), float(finite.max())) if finite.size else (0.0, 1.0)
+        if hi <= lo:
+            lo, hi = lo - 0.5, hi + 0.5
+        bounds += [lo, hi]
+    return tuple(bounds)
+
+
+def bin_counts(
+    x: np.ndarray,
+    y: np.ndarray,
+    extent: tuple[float, float, float, float],
+    bins: tuple[int, int],
+    codes: np.ndarray | None = None,
+    n_layers: int = 1,
+) -> np.ndarray:
+    """Point counts on a ``(ny, nx)`` grid over ``extent``.
+
+    With ``codes`` (a layer number per point, -1 to skip the point) the result
+    is ``(n_layers, ny, nx)``, still from a single ``bincount``. Non-finite
+    points are skipped.
+    """
+    nx, ny = bins
+    xmin, xmax, ymin, ymax = extent
+    ok = np.isfinite(x) & np.isfinite(y)
+    if codes is not None:
+        ok &= codes >= 0
+    ix = ((x[ok] - xmin) * (nx / (xmax - xmin))).astype(np.intp)
+    iy = ((y[ok] - ymin) * (ny / (ymax - ymin))).astype(np.intp)
+    np.clip(ix, 0, nx - 1, out=ix)
+    np.clip(iy, 0, ny - 1, out=iy)
+    cells = iy * nx + ix
+    if codes is None:
+        return np.bincount(cells, minlength=nx * ny).reshape(ny, nx)
+    cells += codes[ok].astype(np.intp) * (nx * ny)
+    return np.bincount(cells, minlength=n_layers * nx * ny).reshape(n_layers, ny, nx)
+
+
+def _grid_shape(ax: Axes, bins: int) -> tuple[int, int]:
+    pos = ax.get_position()
+    width, height = ax.figure.get_size_inches()
+    aspect = (pos.height * height) / max(pos.width * width, 1e-9)
+    return bins, max(1, round(bins * aspect))
+
+
+def hue_codes(values: pd.Series, max_layers: int = MAX_LAYERS) -> tuple[list[str], np.ndarray]:
+    """Layer labels and a layer number per row (-1 for missing), in plotting order.
+
+    Categoricals keep their category order, other columns order of appearance
+    (as seaborn does). Past ``max_layers`` the least frequent levels share an
+    "other" layer.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, levels = values.cat.codes.to_numpy(), list(values.cat.categories)
+    else:
+        codes, levels = pd.factorize(values, sort=False)
+        levels = list(levels)
+    codes = codes.astype(np.intp)
+    if len(levels) <= max_layers:
+        return [str(level) for level in levels], codes
+    counts = np.bincount(codes[codes >= 0], minlength=len(levels))
+    keep = np.sort(np.argsort(-counts, kind="stable")[: max_layers - 1])
+    remap = np.full(len(levels), max_layers - 1, dtype=np.intp)
+    remap[keep] = np.arange(len(keep))
+    codes = np.where(codes >= 0, remap[np.maximum(codes, 0)], -1)
+    return [str(levels[i]) for i in keep] + ["other"], codes
+
+
+def draw_density(
+    ax: Axes,
+    data: pd.DataFrame,
+    x: str,
+    y: str,
+    hue: str | None = None,
+    colors: Sequence | None = None,
+    bins: int = DENSITY_BINS,
+) -> None:
+    """Draw ``data[x]`` vs ``data[y]`` as binned counts (log colour scale) on ``ax``."""
+    xv = data[x].to_numpy(dtype=float, na_value=np.nan)
+    yv = data[y].to_numpy(dtype=float, na_value=np.nan)
+    extent = grid_extent(xv, yv)
+    shape = _grid_shape(ax, bins)
+    image_kw = {"extent": extent, "origin": "lower", "aspect": "auto", "interpolation": "nearest"}
+
+    if hue is None:
+        counts = bin_counts(xv, yv, extent, shape)
+        masked = np.ma.masked_equal(counts, 0)
+        im = ax.imshow(masked, norm=LogNorm(vmin=1, vmax=max(counts.max(), 1)), **image_kw)
+        ax.figure.colorbar(im, ax=ax, label="points per bin")
+    else:
+        labels, codes = hue_codes(data[hue])
+        layers = bin_counts(xv, yv, extent, shape, codes, len(labels))
+        colors = list(colors) if colors is not None else [f"C{i}" for i in range(len(labels))]
+        handles = []
+        for label, counts, color in zip(labels, layers, colors, strict=False):
+            if not counts.any():
+                continue
+            rgb = to_rgb(color)
+            cmap = LinearSegmentedColormap.from_list(label, [(*rgb, 0.15), (*rgb, 0.9)])
+            norm = LogNorm(vmin=1, vmax=max(counts.max(), 1))
+            ax.imshow(np.ma.masked_equal(counts, 0), cmap=cmap, norm=norm, **image_kw)
+            handles.append(Patch(color=rgb, label=label))
+        ax.legend(handles=handles, title=hue)
+
+    ax.set_xlim(extent[0], extent[1])
+    ax.set_ylim(extent[2], extent[3])
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
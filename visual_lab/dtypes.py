@@ -0,0 +1,89 @@
+"""Compact column dtypes for loaded datasets.
+
+Datasets arrive with Python-object string columns and 64-bit numerics. At load
+time ``compact_frame`` converts:
+
+- string columns with few distinct values to ``Categorical`` (categories in
+  order of first appearance, which is the order seaborn would use anyway), so
+  hue masks, ``groupby`` and ``value_counts`` work on small integer codes;
+- other string columns, optionally, to Arrow-backed ``string[pyarrow]``;
+- integers to the smallest integer type that holds them, and floats to
+  ``float32`` only when every value survives the round trip.
+
+Columns that are already categorical, boolean or datetime are left alone.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# A string column becomes categorical when its distinct values are at most
+# this share of its non-missing values (and at most MAX_CATEGORIES).
+CATEGORY_RATIO = 0.5
+MAX_CATEGORIES = 1_000
+
+
+@dataclass(frozen=True)
+class CompactReport:
+    """Memory before and after compaction, and the dtype change of each column."""
+
+    bytes_before: int
+    bytes_after: int
+    changes: dict[str, tuple[str, str]] = field(default_factory=dict)
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    @property
+    def saved_ratio(self) -> float:
+        return self.bytes_saved / self.bytes_before if self.bytes_before else 0.0
+
+
+def _is_string(col: pd.Series) -> bool:
+    if isinstance(col.dtype, pd.StringDtype):
+        return True
+    return col.dtype == object and pd.api.types.infer_dtype(col, skipna=True) == "string"
+
+
+def compact_column(col: pd.Series, arrow_strings: bool = False) -> pd.Series:
+    """``col`` in its most compact lossless dtype (or ``col`` itself)."""
+    if _is_string(col):
+        values = col.dropna()
+        levels = values.unique()
+        if len(levels) <= min(MAX_CATEGORIES, CATEGORY_RATIO * max(len(values), 1)):
+            return pd.Series(pd.Categorical(col, categories=levels), index=col.index, name=col.name)
+        if arrow_strings:
+            return col.astype("string[pyarrow]")
+        return col
+    if pd.api.types.is_bool_dtype(col) or not pd.api.types.is_numeric_dtype(col):
+        return col
+    if pd.api.types.is_integer_dtype(col):
+        return pd.to_numeric(col, downcast="integer")
+    if col.dtype == np.float64:
+        narrow = col.astype(np.float32)
+        same = (narrow.astype(np.float64) == col) | col.isna()
+        return narrow if bool(same.all()) else col
+    return col
+
+
+def compact_frame(
+    df: pd.DataFrame, arrow_strings: bool = False
+) -> tuple[pd.DataFrame, CompactReport]:
+    """``df`` with every column compacted, and a report of what changed."""
+    columns = {name: compact_column(df[name], arrow_strings) for name in df.columns}
+    out = pd.DataFrame(columns, index=df.index)
+    changes = {
+        name: (str(df[name].dtype), str(out[name].dtype))
+        for name in df.columns
+        if out[name].dtype != df[name].dtype
+    }
+    report = CompactReport(
+        bytes_before=int(df.memory_usage(deep=True).sum()),
+        bytes_after=int(out.memory_usage(deep=True).sum()),
+        changes=changes,
+    )
+    return out, report
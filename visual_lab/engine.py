@@ -0,0 +1,607 @@
+"""Headless plot rendering: spec + DataFrame + theme -> encoded image.
+
+This is the only code path that draws figures. The Streamlit app builds specs
+from widgets and caches the bytes; scripts and tests call ``render`` directly
+with no Streamlit session involved.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from contextvars import ContextVar
+from typing import Any
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.ticker import FuncFormatter
+
+from visual_lab.categories import CategoryCodes
+from visual_lab.density import MAX_LAYERS, draw_density
+from visual_lab.downsample import downsample_frame, finite_count, line_budget, lttb
+from visual_lab.figures import FigureManager
+from visual_lab.kde import gaussian_kde, seaborn_kde
+from visual_lab.pairplot import draw_pairplot
+from visual_lab.profile import DatasetProfile
+from visual_lab.sampling import SampleCache, cap_rows, row_positions
+from visual_lab.specs import (
+    CompareDistribution,
+    CompareRelationship,
+    MatplotlibBar,
+    MatplotlibBox,
+    MatplotlibHistogram,
+    MatplotlibLine,
+    MatplotlibScatter,
+    MatplotlibSubplots,
+    OverviewCorrelation,
+    OverviewDistribution,
+    PlotSpec,
+    SeabornCategory,
+    SeabornDistribution,
+    SeabornHeatmap,
+    SeabornPairplot,
+    SeabornRelationship,
+)
+from visual_lab.theme import DEFAULT_THEME, CompiledTheme, use_theme
+
+# Colour legends list at most this many levels.
+LEGEND_MAX = 20
+# Category scatters with more levels are drawn as one collection with a colour
+# array; fewer get one single-colour collection per level, which Agg draws faster.
+SCATTER_LAYER_LEVELS = 10
+
+# DPI the figure being drawn will be encoded at; line drawers size their
+# downsampling from it.
+_draw_dpi: ContextVar[float] = ContextVar("draw_dpi", default=200)
+
+Profile = DatasetProfile | None
+Drawer = Callable[[Any, pd.DataFrame, FigureManager, Profile], Figure]
+_DRAWERS: dict[type, Drawer] = {}
+_default_figures = FigureManager()
+
+
+def _drawer(spec_type: type) -> Callable[[Drawer], Drawer]:
+    def register(fn: Drawer) -> Drawer:
+        _DRAWERS[spec_type] = fn
+        return fn
+
+    return register
+
+
+# ==================== ENTRY POINTS ====================
+def draw(
+    spec: PlotSpec,
+    df: pd.DataFrame,
+    figures: FigureManager | None = None,
+    profile: Profile = None,
+    dpi: float | None = None,
+) -> Figure:
+    """Draw ``spec`` with the current rcParams and return the (unreleased) figure.
+
+    ``dpi`` is the resolution the figure is meant for; long lines are
+    downsampled to what the axes can show at it. Seaborn's KDEs use the binned
+    estimator while drawing (see ``kde.seaborn_kde``).
+    """
+    drawer = _DRAWERS.get(type(spec))
+    if drawer is None:
+        raise TypeError(f"No renderer for {type(spec).__name__}")
+    token = _draw_dpi.set(dpi) if dpi is not None else None
+    try:
+        with seaborn_kde():
+            return drawer(spec, df, figures or _default_figures, profile)
+    finally:
+        if token is not None:
+            _draw_dpi.reset(token)
+
+
+def render(
+    spec: PlotSpec,
+    df: pd.DataFrame,
+    theme: Mapping[str, Any] | CompiledTheme = DEFAULT_THEME,
+    dpi: int = 200,
+    *,
+    figures: FigureManager | None = None,
+    profile: Profile = None,
+    max_width: int | None = None,
+) -> bytes:
+    """Draw under ``theme``, encode as PNG and release one figure.
+
+    ``profile`` is optional; when given, correlations and category rankings
+    come from its caches instead of being recomputed from ``df``.
+    ``max_width`` (pixels) lowers the DPI so the image is encoded at most that
+    wide instead of being downscaled by whoever displays it.
+    """
+    figures = figures or _default_figures
+    with use_theme(theme):
+        fig = draw(spec, df, figures, profile, dpi=dpi)
+        if max_width is not None:
+            # bbox_inches="tight" pads the saved image by 0.1 inch on each side.
+            dpi = min(dpi, max_width / (fig.get_figwidth() + 0.2))
+        return figures.render(fig, dpi)
+
+
+def _corr(
+    df: pd.DataFrame, columns: tuple[str, ...], method: str, profile: Profile
+) -> pd.DataFrame:
+    if profile is not None:
+        return profile.corr_subset(list(columns), method)
+    return df[list(columns)].corr(method=method)
+
+
+def _sample(
+    df: pd.DataFrame, columns: list[str], size: int, hue: str | None, profile: Profile
+) -> pd.DataFrame:
+    samples = profile.samples if profile is not None else SampleCache(df)
+    return samples.sample(columns, size, hue)
+
+
+def _category_codes(
+    df: pd.DataFrame, column: str, profile: Profile
+) -> tuple[list[str], np.ndarray]:
+    codes = profile.codes if profile is not None else CategoryCodes(df)
+    return codes.get(column)
+
+
+def _downsample_note(ax: Any, shown: int, total: int) -> None:
+    """Note ``total`` drawable points when only ``shown`` of them were kept."""
+    if shown < total:
+        ax.text(
+            1.0,
+            1.01,
+            f"downsampled from {total:,} points",
+            transform=ax.transAxes,
+            ha="right",
+            va="bottom",
+            fontsize=8,
+            alpha=0.7,
+        )
+
+
+def _top_categories(df: pd.DataFrame, column: str, k: int, profile: Profile) -> pd.Index:
+    if profile is not None:
+        return profile.top(column, k)
+    counts = df[column].value_counts()
+    return counts[counts > 0].head(k).index
+
+
+# ==================== OVERVIEW ====================
+@_drawer(OverviewDistribution)
+def _overview_distribution(
+    spec: OverviewDistribution, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    fig, ax = figures.subplots(figsize=(10, 4))
+    sns.histplot(df, x=spec.x, bins=30, kde=True, ax=ax)
+    ax.set_title(f"{spec.x} distribution", fontsize=13, fontweight="bold")
+    return fig
+
+
+@_drawer(OverviewCorrelation)
+def _overview_correlation(
+    spec: OverviewCorrelation, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    corr = _corr(df, spec.columns, "pearson", profile)
+    fig, ax = figures.subplots(figsize=(4, 4))
+    sns.heatmap(
+        corr,
+        annot=True,
+        fmt=".2f",
+        cmap="vlag",
+        center=0,
+        square=True,
+        cbar=False,
+        ax=ax,
+    )
+    ax.set_title("Correlation (subset)", fontsize=11, fontweight="bold")
+    return fig
+
+
+# ==================== SEABORN BUILDER ====================
+@_drawer(SeabornDistribution)
+def _seaborn_distribution(
+    spec: SeabornDistribution, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    fig, ax = figures.subplots(figsize=(10, 5))
+
+    if spec.kind == "Histogram":
+        sns.histplot(
+            data=df,
+            x=spec.x,
+            bins=spec.bins,
+            hue=spec.hue,
+            kde=False,
+            ax=ax,
+            log_scale=spec.log_scale,
+        )
+    elif spec.kind == "KDE":
+        sns.kdeplot(
+            data=df,
+            x=spec.x,
+            hue=spec.hue,
+            fill=True,
+            ax=ax,
+            log_scale=spec.log_scale,
+        )
+    elif spec.kind == "Histogram + KDE":
+        sns.histplot(
+            data=df,
+            x=spec.x,
+            bins=spec.bins,
+            hue=spec.hue,
+            kde=True,
+            ax=ax,
+            log_scale=spec.log_scale,
+        )
+    elif spec.kind == "Box":
+        sns.boxplot(
+            data=df,
+            x=spec.x,
+            ax=ax,
+        )
+    elif spec.kind == "Violin":
+        sns.violinplot(
+            data=df,
+            x=spec.x,
+            ax=ax,
+        )
+    else:  # ECDF
+        sns.ecdfplot(
+            data=df,
+            x=spec.x,
+            hue=spec.hue,
+            ax=ax,
+        )
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda y, _: f"{y:.0%}"))
+
+    ax.set_title(f"{spec.kind} for {spec.x}", fontsize=13, fontweight="bold")
+    return fig
+
+
+@_drawer(SeabornRelationship)
+def _seaborn_relationship(
+    spec: SeabornRelationship, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    fig, ax = figures.subplots(figsize=(10, 5))
+    data = cap_rows(df, spec.rows) if spec.rows else df
+
+    if spec.density:
+        colors = sns.color_palette(n_colors=MAX_LAYERS) if spec.hue else None
+        draw_density(ax, data, spec.x, spec.y, hue=spec.hue, colors=colors)
+    elif spec.kind == "Scatter":
+        sns.scatterplot(
+            data=data,
+            x=spec.x,
+            y=spec.y,
+            hue=spec.hue,
+            alpha=spec.alpha,
+            s=70,
+            ax=ax,
+        )
+    elif spec.kind == "Line":
+        data = downsample_frame(df, spec.x, spec.y, line_budget(ax, _draw_dpi.get()), spec.hue)
+        _downsample_note(ax, len(data), finite_count(df[spec.x], df[spec.y]))
+        sns.lineplot(
+            data=data,
+            x=spec.x,
+            y=spec.y,
+            hue=spec.hue,
+            ax=ax,
+        )
+    else:  # Regression
+        sns.regplot(
+            data=data,
+            x=spec.x,
+            y=spec.y,
+            ax=ax,
+            scatter_kws={"alpha": spec.alpha, "s": 60},
+            line_kws={"linewidth": 2},
+        )
+
+    ax.set_title(
+        f"{'Density' if spec.density else spec.kind}: {spec.y} vs {spec.x}",
+        fontsize=13,
+        fontweight="bold",
+    )
+    return fig
+
+
+@_drawer(SeabornCategory)
+def _seaborn_category(
+    spec: SeabornCategory, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    fig, ax = figures.subplots(figsize=(10, 5))
+
+    top_cats = _top_categories(df, spec.category, spec.top, profile)
+    df_tmp = df[df[spec.category].isin(top_cats)]
+
+    if spec.kind == "Count":
+        sns.countplot(
+            data=df_tmp,
+            y=spec.category,
+            order=top_cats,
+            ax=ax,
+        )
+        for container in ax.containers:
+            ax.bar_label(container, padding=3)
+    elif spec.kind == "Bar (mean)":
+        sampled = cap_rows(df, spec.rows) if spec.rows else df
+        sns.barplot(
+            data=sampled[sampled[spec.category].isin(top_cats)],
+            y=spec.category,
+            x=spec.value,
+            order=top_cats,
+            ax=ax,
+            errorbar=("ci", 95),
+        )
+    elif spec.kind == "Box":
+        sns.boxplot(
+            data=df_tmp,
+            y=spec.category,
+            x=spec.value,
+            order=top_cats,
+            ax=ax,
+        )
+    else:  # Violin
+        sns.violinplot(
+            data=df_tmp,
+            y=spec.category,
+            x=spec.value,
+            order=top_cats,
+            ax=ax,
+        )
+
+    ax.set_title(
+        f"{spec.kind} for {spec.category}",
+        fontsize=13,
+        fontweight="bold",
+    )
+    return fig
+
+
+@_drawer(SeabornHeatmap)
+def _seaborn_heatmap(
+    spec: SeabornHeatmap, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    corr = _corr(df, spec.columns, spec.method.lower(), profile)
+    fig, ax = figures.subplots(figsize=(7, 6))
+    sns.heatmap(
+        corr,
+        annot=spec.annot,
+        fmt=".2f",
+        cmap="vlag",
+        center=0 if spec.center_zero else None,
+        square=True,
+        linewidths=1,
+        cbar_kws={"shrink": 0.8},
+        ax=ax,
+    )
+    ax.set_title(f"Correlation heatmap ({spec.method})", fontsize=13, fontweight="bold")
+    return fig
+
+
+@_drawer(SeabornPairplot)
+def _seaborn_pairplot(
+    spec: SeabornPairplot, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    columns = list(spec.columns)
+    df_sample = _sample(df, columns, spec.sample, spec.hue, profile)
+    fig = draw_pairplot(figures, df_sample, columns, spec.hue)
+    fig.suptitle("Pairplot", y=1.01, fontweight="bold")
+    return fig
+
+
+# ==================== MATPLOTLIB BUILDER ====================
+@_drawer(MatplotlibLine)
+def _matplotlib_line(
+    spec: MatplotlibLine, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    x_label = "Index" if spec.x == "index" else spec.x
+    y_vals = df[spec.y].to_numpy()
+    x_vals = np.arange(len(df)) if spec.x == "index" else df[spec.x].to_numpy()
+    fig, ax = figures.subplots(figsize=(10, 5))
+    keep = lttb(x_vals, y_vals, line_budget(ax, _draw_dpi.get()))
+    line_marker = None if spec.marker == "None" else spec.marker
+    ax.plot(x_vals[keep], y_vals[keep], marker=line_marker, lw=2)
+    _downsample_note(ax, len(keep), finite_count(x_vals, y_vals))
+    ax.set_title(f"Line: {spec.y} over {x_label}", fontsize=13, fontweight="bold")
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(spec.y)
+    if spec.grid:
+        ax.grid(alpha=0.3)
+    return fig
+
+
+@_drawer(MatplotlibScatter)
+def _matplotlib_scatter(
+    spec: MatplotlibScatter, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    fig, ax = figures.subplots(figsize=(10, 5))
+    positions = row_positions(len(df), spec.rows) if spec.rows else None
+    data = df if positions is None else df.iloc[positions]
+    if spec.density:
+        cmap = plt.get_cmap("tab10")
+        colors = [cmap(idx % 10) for idx in range(MAX_LAYERS)] if spec.color_by else None
+        draw_density(ax, data, spec.x, spec.y, hue=spec.color_by, colors=colors)
+    elif spec.color_by:
+        # Level codes are cached per column (levels as in the full frame).
+        levels, codes = _category_codes(df, spec.color_by, profile)
+        if positions is not None:
+            codes = codes[positions]
+        palette = plt.get_cmap("tab10")(np.arange(len(levels)) % 10)
+        x, y = data[spec.x].to_numpy(), data[spec.y].to_numpy()
+        if len(levels) <= SCATTER_LAYER_LEVELS:
+            # Single-colour collections keep Agg's fast marker path.
+            for idx, color in enumerate(palette):
+                mask = codes == idx
+                ax.scatter(x[mask], y[mask], color=color, alpha=spec.alpha, s=spec.size)
+        else:
+            keep = codes >= 0
+            ax.scatter(x[keep], y[keep], c=palette[codes[keep]], alpha=spec.alpha, s=spec.size)
+        handles = [
+            Line2D([], [], marker="o", linestyle="", color=color, alpha=spec.alpha, label=level)
+            for level, color in zip(levels[:LEGEND_MAX], palette, strict=False)
+        ]
+        if len(levels) > LEGEND_MAX:
+            handles.append(Line2D([], [], linestyle="", label=f"+{len(levels) - LEGEND_MAX} more"))
+        ax.legend(handles=handles, title=spec.color_by)
+    else:
+        ax.scatter(
+            data[spec.x],
+            data[spec.y],
+            alpha=spec.alpha,
+            s=spec.size,
+        )
+    title = "Density" if spec.density else "Scatter"
+    ax.set_title(f"{title}: {spec.y} vs {spec.x}", fontsize=13, fontweight="bold")
+    ax.set_xlabel(spec.x)
+    ax.set_ylabel(spec.y)
+    ax.grid(alpha=0.3)
+    return fig
+
+
+@_drawer(MatplotlibBar)
+def _matplotlib_bar(
+    spec: MatplotlibBar, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    grouped = getattr(df.groupby(spec.category, observed=True)[spec.value], spec.agg)()
+    grouped = grouped.sort_values(ascending=True)
+    fig, ax = figures.subplots(figsize=(9, 5))
+    if spec.horizontal:
+        ax.barh(grouped.index, grouped.values)
+        ax.set_xlabel(spec.value)
+        ax.set_ylabel(spec.category)
+    else:
+        ax.bar(grouped.index, grouped.values)
+        ax.set_ylabel(spec.value)
+        ax.set_xlabel(spec.category)
+        plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
+    ax.set_title(
+        f"{spec.agg} of {spec.value} by {spec.category}",
+        fontsize=13,
+        fontweight="bold",
+    )
+    ax.grid(axis="x" if spec.horizontal else "y", alpha=0.3)
+    return fig
+
+
+@_drawer(MatplotlibHistogram)
+def _matplotlib_histogram(
+    spec: MatplotlibHistogram, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    fig, ax = figures.subplots(figsize=(9, 5))
+    ax.hist(
+        df[spec.x].dropna().values,
+        bins=spec.bins,
+        density=spec.density,
+        alpha=0.85,
+    )
+    ax.set_title(f"Histogram of {spec.x}", fontsize=13, fontweight="bold")
+    ax.set_xlabel(spec.x)
+    ax.set_ylabel("Density" if spec.density else "Count")
+    ax.grid(alpha=0.3)
+    return fig
+
+
+@_drawer(MatplotlibBox)
+def _matplotlib_box(
+    spec: MatplotlibBox, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    fig, ax = figures.subplots(figsize=(10, 5))
+    ax.boxplot(
+        [df[c].dropna().values for c in spec.columns],
+        tick_labels=list(spec.columns),
+    )
+    ax.set_title("Box plots", fontsize=13, fontweight="bold")
+    ax.grid(alpha=0.3)
+    return fig
+
+
+@_drawer(MatplotlibSubplots)
+def _matplotlib_subplots(
+    spec: MatplotlibSubplots, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    k = len(spec.columns)
+    fig, axes = figures.subplots(
+        1,
+        k,
+        figsize=(4 * k, 4),
+        squeeze=False,
+    )
+    for idx, col_name in enumerate(spec.columns):
+        ax = axes[0, idx]
+        data = df[col_name].dropna().values
+        ax.hist(data, bins=30, alpha=0.8, density=True)
+        if spec.kde and len(data) > 10:
+            x_vals = np.linspace(data.min(), data.max(), 200)
+            kde = gaussian_kde(data)
+            ax.plot(x_vals, kde(x_vals), lw=2)
+        ax.set_title(col_name)
+        ax.grid(alpha=0.3)
+    fig.suptitle("Numeric overview", fontsize=13, fontweight="bold")
+    fig.tight_layout()
+    return fig
+
+
+# ==================== COMPARE ====================
+@_drawer(CompareDistribution)
+def _compare_distribution(
+    spec: CompareDistribution, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    fig, ax = figures.subplots(figsize=(7, 4))
+    if spec.library == "seaborn":
+        sns.histplot(
+            data=df,
+            x=spec.x,
+            hue=spec.hue,
+            kde=True,
+            bins=30,
+            ax=ax,
+        )
+        ax.set_title("Seaborn: histogram + KDE", fontsize=12, fontweight="bold")
+        return fig
+
+    values = df[spec.x].dropna().values
+    ax.hist(values, bins=30, alpha=0.85, density=True)
+    x_vals = np.linspace(values.min(), values.max(), 200)
+    kde = gaussian_kde(values)
+    ax.plot(x_vals, kde(x_vals), lw=2)
+    ax.set_title("Matplotlib: histogram + KDE", fontsize=12, fontweight="bold")
+    ax.set_xlabel(spec.x)
+    ax.set_ylabel("Density")
+    ax.grid(alpha=0.3)
+    return fig
+
+
+@_drawer(CompareRelationship)
+def _compare_relationship(
+    spec: CompareRelationship, df: pd.DataFrame, figures: FigureManager, profile: Profile
+) -> Figure:
+    fig, ax = figures.subplots(figsize=(7, 4))
+    data = cap_rows(df, spec.rows) if spec.rows else df
+    if spec.density:
+        colors = sns.color_palette(n_colors=MAX_LAYERS) if spec.hue else None
+        draw_density(ax, data, spec.x, spec.y, hue=spec.hue, colors=colors)
+        library = "Seaborn" if spec.library == "seaborn" else "Matplotlib"
+        ax.set_title(f"{library}: density", fontsize=12, fontweight="bold")
+        return fig
+    if spec.library == "seaborn":
+        sns.scatterplot(
+            data=data,
+            x=spec.x,
+            y=spec.y,
+            hue=spec.hue,
+            alpha=0.7,
+            s=70,
+            ax=ax,
+        )
+        ax.set_title("Seaborn: scatterplot", fontsize=12, fontweight="bold")
+        return fig
+
+    ax.scatter(data[spec.x], data[spec.y], alpha=0.7)
+    ax.set_title("Matplotlib: scatter", fontsize=12, fontweight="bold")
+    ax.set_xlabel(spec.x)
+    ax.set_ylabel(spec.y)
+    ax.grid(alpha=0.3)
+    return fig
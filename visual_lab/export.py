@@ -0,0 +1,140 @@
+"""Background ZIP export of rendered figures.
+
+The archive is written one entry at a time into a spooled temporary file, so
+it stays in memory only while small and moves to disk as it grows. PNGs are
+already deflate-compressed and are stored as-is (``ZIP_STORED``); only the
+optional JSON manifest is compressed. Each image is rendered when its turn
+comes and dropped once written, so at most one image is held at a time.
+"""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import threading
+import zipfile
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import CancelledError
+from dataclasses import dataclass
+from typing import Any
+
+SPOOL_BYTES = 16 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ZipEntry:
+    filename: str
+    render: Callable[[], bytes]
+
+
+def write_zip(
+    fileobj: Any,
+    entries: Sequence[ZipEntry],
+    manifest: Mapping[str, Any] | None = None,
+    on_entry: Callable[[int], None] | None = None,
+    cancelled: Callable[[], bool] = lambda: False,
+) -> int:
+    """Write ``entries`` (and ``manifest.json``) to ``fileobj``; return entries written."""
+    written = 0
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_STORED) as zf:
+        for entry in entries:
+            if cancelled():
+                break
+            zf.writestr(entry.filename, entry.render())
+            written += 1
+            if on_entry is not None:
+                on_entry(written)
+        if manifest is not None:
+            zf.writestr(
+                "manifest.json",
+                json.dumps(manifest, indent=2, default=str),
+                compress_type=zipfile.ZIP_DEFLATED,
+            )
+    return written
+
+
+class ZipExport:
+    """A ZIP archive built in a background thread, with progress for the UI.
+
+    ``stop``, when given, is the event ``cancel`` sets; entry renders that wait
+    (e.g. for a render queue) can poll it to give up early.
+    """
+
+    def __init__(
+        self,
+        entries: Sequence[ZipEntry],
+        manifest: Mapping[str, Any] | None = None,
+        name: str = "export.zip",
+        spool_bytes: int = SPOOL_BYTES,
+        stop: threading.Event | None = None,
+    ) -> None:
+        self.name = name
+        self.entries = list(entries)
+        self.manifest = manifest
+        self.error: str | None = None
+        self._file = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        self._done = 0
+        self._finished = threading.Event()
+        self._cancel = stop or threading.Event()
+        self._read_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="zip-export", daemon=True)
+
+    @property
+    def total(self) -> int:
+        return len(self.entries)
+
+    @property
+    def done(self) -> int:
+        return self._done
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    @property
+    def ok(self) -> bool:
+        return self.finished and self.error is None and not self._cancel.is_set()
+
+    def start(self) -> ZipExport:
+        self._thread.start()
+        return self
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def cancel(self) -> None:
+        """Stop after the current entry and release the temporary file."""
+        self._cancel.set()
+        if self._thread.is_alive():
+            self._finished.wait()
+        self._file.close()
+
+    def size(self) -> int:
+        if not self.finished or self._file.closed:
+            return 0
+        with self._read_lock:
+            return self._file.tell()
+
+    def read(self) -> bytes:
+        """The finished archive (read when the user downloads it)."""
+        if not self.ok:
+            raise RuntimeError("ZIP export has not finished successfully")
+        with self._read_lock:
+            self._file.seek(0)
+            data = self._file.read()
+            self._file.seek(0, 2)
+        return data
+
+    def _run(self) -> None:
+        def on_entry(written: int) -> None:
+            self._done = written
+
+        try:
+            write_zip(self._file, self.entries, self.manifest, on_entry, self._cancel.is_set)
+        except CancelledError:  # a BaseException: a render dropped before it started
+            if not self._cancel.is_set():
+                self.error = "CancelledError: a render was cancelled"
+        except Exception as exc:  # surfaced in the UI instead of dying with the thread
+            self.error = f"{type(exc).__name__}: {exc}"
+        finally:
+            self._finished.set()
@@ -0,0 +1,177 @@
+"""Figure lifecycle for server-side rendering.
+
+Figures are created outside the pyplot registry (a bare ``Figure`` with an Agg
+canvas), encoded once and released right after. Figures that a library creates
+through pyplot (``sns.pairplot``) are closed on release so the registry cannot
+grow across reruns. Optionally, released figures of the same size are cleared
+and reused instead of being rebuilt.
+"""
+
+from __future__ import annotations
+
+import io
+import threading
+import weakref
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+RGBA_BYTES = 4
+
+
+def _canvas_bytes(fig: Figure) -> int:
+    width, height = fig.get_size_inches()
+    return int(width * fig.dpi * height * fig.dpi * RGBA_BYTES)
+
+
+def png_size(data: bytes) -> tuple[int, int]:
+    """(width, height) in pixels, read from the PNG header without decoding."""
+    return int.from_bytes(data[16:20], "big"), int.from_bytes(data[20:24], "big")
+
+
+def _size_key(figsize: tuple[float, float]) -> tuple[float, float]:
+    return round(float(figsize[0]), 3), round(float(figsize[1]), 3)
+
+
+@dataclass(frozen=True)
+class FigureStats:
+    live: int
+    pooled: int
+    created: int
+    reused: int
+    released: int
+    encoded: int
+    live_bytes: int
+    pyplot_open: int
+
+
+class FigureManager:
+    """Create, encode and release figures, keeping count of what is alive.
+
+    With ``recycle=True`` released figures are kept per size (up to
+    ``max_pooled`` each) and handed out again after being reset to the current
+    rcParams.
+    """
+
+    def __init__(self, recycle: bool = False, max_pooled: int = 4) -> None:
+        self.recycle = recycle
+        self.max_pooled = max_pooled
+        self._live: weakref.WeakSet[Figure] = weakref.WeakSet()
+        self._pool: defaultdict[tuple[float, float], list[Figure]] = defaultdict(list)
+        self._created = 0
+        self._reused = 0
+        self._released = 0
+        self._encoded = 0
+        self._lock = threading.Lock()
+
+    def figure(self, figsize: tuple[float, float] | None = None) -> Figure:
+        figsize = tuple(figsize or mpl.rcParams["figure.figsize"])
+        fig = None
+        with self._lock:
+            pool = self._pool.get(_size_key(figsize))
+            if pool:
+                fig = pool.pop()
+                self._reused += 1
+            else:
+                self._created += 1
+        if fig is None:
+            fig = Figure(figsize=figsize)
+            FigureCanvasAgg(fig)
+        else:
+            self._reset(fig)
+        with self._lock:
+            self._live.add(fig)
+        return fig
+
+    def subplots(
+        self,
+        nrows: int = 1,
+        ncols: int = 1,
+        *,
+        figsize: tuple[float, float] | None = None,
+        **kwargs: Any,
+    ) -> tuple[Figure, Any]:
+        """Drop-in for ``plt.subplots`` that bypasses the pyplot registry."""
+        fig = self.figure(figsize)
+        return fig, fig.subplots(nrows, ncols, **kwargs)
+
+    def adopt(self, fig: Figure) -> Figure:
+        """Track a figure created elsewhere (e.g. through pyplot by seaborn)."""
+        with self._lock:
+            self._live.add(fig)
+        return fig
+
+    def encode(self, fig: Figure, dpi: int, fmt: str = "png") -> bytes:
+        buf = io.BytesIO()
+        fig.savefig(
+            buf,
+            dpi=dpi,
+            bbox_inches="tight",
+            format=fmt,
+            facecolor=fig.get_facecolor(),
+        )
+        with self._lock:
+            self._encoded += 1
+        return buf.getvalue()
+
+    def release(self, fig: Figure) -> None:
+        pyplot_managed = getattr(fig.canvas, "manager", None) is not None
+        with self._lock:
+            self._live.discard(fig)
+            self._released += 1
+        if pyplot_managed:
+            plt.close(fig)
+            return
+        if self.recycle:
+            key = _size_key(fig.get_size_inches())
+            with self._lock:
+                pool = self._pool[key]
+                if len(pool) < self.max_pooled:
+                    fig.clear()
+                    pool.append(fig)
+                    return
+        fig.clear()
+
+    def render(self, fig: Figure, dpi: int) -> bytes:
+        """Encode ``fig`` and release it, whatever happens during encoding."""
+        try:
+            return self.encode(fig, dpi)
+        finally:
+            self.release(fig)
+
+    def stats(self) -> FigureStats:
+        with self._lock:
+            live = list(self._live)
+            pooled = [fig for pool in self._pool.values() for fig in pool]
+            return FigureStats(
+                live=len(live),
+                pooled=len(pooled),
+                created=self._created,
+                reused=self._reused,
+                released=self._released,
+                encoded=self._encoded,
+                live_bytes=sum(_canvas_bytes(fig) for fig in live + pooled),
+                pyplot_open=len(plt.get_fignums()),
+            )
+
+    @staticmethod
+    def _reset(fig: Figure) -> None:
+        rc = mpl.rcParams
+        fig.clear()
+        fig.set_dpi(rc["figure.dpi"])
+        fig.set_facecolor(rc["figure.facecolor"])
+        fig.set_edgecolor(rc["figure.edgecolor"])
+        fig.subplotpars.update(
+            left=rc["figure.subplot.left"],
+            right=rc["figure.subplot.right"],
+            bottom=rc["figure.subplot.bottom"],
+            top=rc["figure.subplot.top"],
+            wspace=rc["figure.subplot.wspace"],
+            hspace=rc["figure.subplot.hspace"],
+        )
+        fig.set_layout_engine("tight" if rc["figure.autolayout"] else "none")
@@ -0,0 +1,249 @@
+"""Disk-backed, content-addressed store for gallery images.
+
+Images live on local disk as ``<root>/<hash[:2]>/<hash>.png``, keyed by their
+SHA-256, so the same figure saved by many users (or many times) is stored
+once. A SQLite index records which session saved what, the settings needed
+to re-render it (as JSON) and when it was last used. Session state only keeps
+the small ``GalleryRef`` handles.
+
+Entries are meant to hold a small preview (see ``make_thumbnail``); the full
+resolution image is re-rendered from the settings when it is downloaded.
+
+Two byte budgets bound the disk use: one per session and one for the whole
+store. When a save goes over either, the least recently used entries (of that
+session, then of any session) are evicted and unreferenced files deleted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from PIL import Image
+
+THUMB_WIDTH = 640
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES blobs(hash),
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    created REAL NOT NULL,
+    used REAL NOT NULL,
+    settings TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS items_session ON items(session, used);
+CREATE INDEX IF NOT EXISTS items_hash ON items(hash);
+"""
+
+
+def make_thumbnail(png: bytes, max_width: int = THUMB_WIDTH) -> bytes:
+    """``png`` downscaled to at most ``max_width`` pixels wide (aspect ratio kept)."""
+    with Image.open(io.BytesIO(png)) as img:
+        if img.width <= max_width:
+            return png
+        img.thumbnail((max_width, img.height), Image.Resampling.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@dataclass(frozen=True)
+class GalleryRef:
+    id: int
+    hash: str
+    name: str
+    description: str
+    created: float
+    size: int
+    settings: dict[str, Any] = field(default_factory=dict, compare=False)
+
+
+@dataclass(frozen=True)
+class GalleryStats:
+    items: int
+    blobs: int
+    bytes: int
+    max_bytes: int
+    session_max_bytes: int
+    dedup_hits: int
+    dedup_bytes: int
+    evictions: int
+
+
+class GalleryStore:
+    """Thread-safe image store with per-session and global LRU byte budgets.
+
+    An image larger than either budget is rejected (``put`` returns None).
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = 512 * 1024 * 1024,
+        session_max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self.session_max_bytes = int(session_max_bytes)
+        self._db = sqlite3.connect(self.root / "index.sqlite3", check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(items)")}
+        if "settings" not in columns:  # index created before settings were stored
+            self._db.execute("ALTER TABLE items ADD COLUMN settings TEXT NOT NULL DEFAULT '{}'")
+        self._lock = threading.Lock()
+        self._dedup_hits = 0
+        self._dedup_bytes = 0
+        self._evictions = 0
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.png"
+
+    def put(
+        self,
+        session: str,
+        image: bytes,
+        name: str,
+        description: str,
+        settings: dict[str, Any] | None = None,
+    ) -> GalleryRef | None:
+        """Store ``image`` for ``session``; ``settings`` must be JSON-serializable."""
+        settings = dict(settings or {})
+        size = len(image)
+        if size > min(self.max_bytes, self.session_max_bytes):
+            return None
+        digest = hashlib.sha256(image).hexdigest()
+        now = time.time()
+        with self._lock, self._db:
+            if self._db.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone():
+                self._dedup_hits += 1
+                self._dedup_bytes += size
+            else:
+                self._write_blob(digest, image)
+                self._db.execute("INSERT INTO blobs VALUES (?, ?)", (digest, size))
+            cur = self._db.execute(
+                "INSERT INTO items (session, hash, name, description, created, used, settings)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (session, digest, name, description, now, now, json.dumps(settings)),
+            )
+            item_id = cur.lastrowid
+            self._enforce_budgets(session, keep=item_id)
+        return GalleryRef(item_id, digest, name, description, now, size, settings)
+
+    def read(self, ref: GalleryRef) -> bytes | None:
+        """Image bytes of ``ref``, or None once it has been evicted."""
+        with self._lock, self._db:
+            cur = self._db.execute("UPDATE items SET used = ? WHERE id = ?", (time.time(), ref.id))
+            if cur.rowcount == 0:
+                return None
+        try:
+            return self.path(ref.hash).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def live(self, refs: Iterable[GalleryRef]) -> list[GalleryRef]:
+        """The subset of ``refs`` that has not been evicted, in the same order."""
+        refs = list(refs)
+        if not refs:
+            return []
+        with self._lock:
+            ids = {
+                row[0]
+                for row in self._db.execute(
+                    f"SELECT id FROM items WHERE id IN ({','.join('?' * len(refs))})",
+                    [ref.id for ref in refs],
+                )
+            }
+        return [ref for ref in refs if ref.id in ids]
+
+    def remove_session(self, session: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM items WHERE session = ?", (session,))
+            self._delete_orphans()
+
+    def session_bytes(self, session: str) -> int:
+        with self._lock:
+            return self._session_bytes(session)
+
+    def stats(self) -> GalleryStats:
+        with self._lock:
+            items = self._db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            blobs, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()
+            return GalleryStats(
+                items=items,
+                blobs=blobs,
+                bytes=total,
+                max_bytes=self.max_bytes,
+                session_max_bytes=self.session_max_bytes,
+                dedup_hits=self._dedup_hits,
+                dedup_bytes=self._dedup_bytes,
+                evictions=self._evictions,
+            )
+
+    # ----- internals (caller holds the lock) -----
+    def _write_blob(self, digest: str, image: bytes) -> None:
+        path = self.path(digest)
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(image)
+        os.replace(tmp, path)
+
+    def _session_bytes(self, session: str) -> int:
+        return self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs"
+            " WHERE hash IN (SELECT hash FROM items WHERE session = ?)",
+            (session,),
+        ).fetchone()[0]
+
+    def _total_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _evict_oldest(self, keep: int, session: str | None = None) -> bool:
+        query = "SELECT id FROM items WHERE id != ?"
+        params: list = [keep]
+        if session is not None:
+            query += " AND session = ?"
+            params.append(session)
+        row = self._db.execute(query + " ORDER BY used, id LIMIT 1", params).fetchone()
+        if row is None:
+            return False
+        self._db.execute("DELETE FROM items WHERE id = ?", row)
+        self._delete_orphans()
+        self._evictions += 1
+        return True
+
+    def _enforce_budgets(self, session: str, keep: int) -> None:
+        while self._session_bytes(session) > self.session_max_bytes:
+            if not self._evict_oldest(keep, session):
+                break
+        while self._total_bytes() > self.max_bytes:
+            if not self._evict_oldest(keep):
+                break
+
+    def _delete_orphans(self) -> None:
+        orphans = self._db.execute(
+            "SELECT hash FROM blobs WHERE hash NOT IN (SELECT hash FROM items)"
+        ).fetchall()
+        for (digest,) in orphans:
+            self.path(digest).unlink(missing_ok=True)
+        self._db.executemany("DELETE FROM blobs WHERE hash = ?", orphans)
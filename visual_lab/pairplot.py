@@ -0,0 +1,237 @@
+"""Corner pairplots assembled from cached, independently computed cells.
+
+``sns.pairplot`` draws every cell serially through the full seaborn plotting
+stack. Here each cell is reduced to a small artifact first: a diagonal cell
+holds one KDE curve per hue level, an off-diagonal cell the finite points of
+its variable pair. Artifacts are computed on a thread pool and cached by a
+digest of their input values, so adding a variable only computes the new row
+of cells while the other cells are reused. Drawing the artifacts is then one
+``fill_between`` per curve and one rasterized ``scatter`` call per cell.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+from visual_lab.density import MAX_LAYERS, hue_codes
+from visual_lab.figures import FigureManager
+from visual_lab.kde import BinnedKDE
+
+PAIRPLOT_WORKERS = min(4, os.cpu_count() or 1)
+CELL_INCHES = 2.5
+# Diagonal KDEs follow seaborn's kdeplot defaults.
+KDE_GRIDSIZE = 200
+KDE_CUT = 3.0
+
+
+@dataclass(frozen=True)
+class DiagCell:
+    """KDE curves of one variable as ``(layer, support, density)``."""
+
+    curves: tuple[tuple[int, np.ndarray, np.ndarray], ...]
+
+
+@dataclass(frozen=True)
+class ScatterCell:
+    """Finite points of one variable pair and their hue layers."""
+
+    x: np.ndarray
+    y: np.ndarray
+    codes: np.ndarray | None
+
+
+Cell = DiagCell | ScatterCell
+
+
+@dataclass(frozen=True)
+class CellStats:
+    hits: int
+    misses: int
+    entries: int
+
+
+class CellCache:
+    """Thread-safe LRU of pairplot cells keyed by a digest of their inputs."""
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self._cells: OrderedDict[str, Cell] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Cell | None:
+        with self._lock:
+            cell = self._cells.get(key)
+            if cell is None:
+                self._misses += 1
+                return None
+            self._cells.move_to_end(key)
+            self._hits += 1
+            return cell
+
+    def put(self, key: str, cell: Cell) -> None:
+        with self._lock:
+            self._cells[key] = cell
+            self._cells.move_to_end(key)
+            while len(self._cells) > self.max_entries:
+                self._cells.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cells.clear()
+
+    def stats(self) -> CellStats:
+        with self._lock:
+            return CellStats(self._hits, self._misses, len(self._cells))
+
+
+CELL_CACHE = CellCache()
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(PAIRPLOT_WORKERS, thread_name_prefix="pairplot")
+        return _executor
+
+
+def _digest(kind: str, *arrays: np.ndarray | None) -> str:
+    h = hashlib.blake2b(kind.encode(), digest_size=20)
+    for array in arrays:
+        h.update(b"-" if array is None else np.ascontiguousarray(array).tobytes())
+    return h.hexdigest()
+
+
+def diag_cell(values: np.ndarray, codes: np.ndarray | None, n_layers: int) -> DiagCell:
+    """KDEs of ``values`` per layer, scaled by layer share (seaborn's ``common_norm``)."""
+    finite = np.isfinite(values)
+    if codes is None:
+        groups = [(0, values[finite])]
+    else:
+        finite &= codes >= 0
+        groups = [(layer, values[finite & (codes == layer)]) for layer in range(n_layers)]
+    total = int(finite.sum())
+    curves = []
+    for layer, group in groups:
+        if len(group) < 2 or group.min() == group.max():
+            continue
+        kde = BinnedKDE(group)
+        pad = KDE_CUT * kde.bandwidth
+        support = np.linspace(group.min() - pad, group.max() + pad, KDE_GRIDSIZE)
+        curves.append((layer, support, kde(support) * (len(group) / total)))
+    return DiagCell(tuple(curves))
+
+
+def scatter_cell(x: np.ndarray, y: np.ndarray, codes: np.ndarray | None) -> ScatterCell:
+    keep = np.isfinite(x) & np.isfinite(y)
+    if codes is not None:
+        keep &= codes >= 0
+    return ScatterCell(
+        x[keep].astype(np.float32),
+        y[keep].astype(np.float32),
+        None if codes is None else codes[keep],
+    )
+
+
+def compute_cells(
+    values: Sequence[np.ndarray],
+    codes: np.ndarray | None,
+    n_layers: int,
+    cache: CellCache = CELL_CACHE,
+) -> tuple[list[DiagCell], dict[tuple[int, int], ScatterCell]]:
+    """Diagonal cells and lower-triangle ``(row, col)`` cells, computed in parallel."""
+    tasks: dict[tuple[int, int], tuple[str, Callable[[], Cell]]] = {}
+    for i, row in enumerate(values):
+        tasks[i, i] = (_digest("kde", row, codes), lambda v=row: diag_cell(v, codes, n_layers))
+        for j in range(i):
+            col = values[j]
+            tasks[i, j] = (
+                _digest("scatter", col, row, codes),
+                lambda x=col, y=row: scatter_cell(x, y, codes),
+            )
+
+    cells: dict[tuple[int, int], Cell] = {}
+    pending: dict[tuple[int, int], tuple[str, Future]] = {}
+    for pos, (key, compute) in tasks.items():
+        cell = cache.get(key)
+        if cell is None:
+            pending[pos] = (key, _pool().submit(compute))
+        else:
+            cells[pos] = cell
+    for pos, (key, future) in pending.items():
+        cells[pos] = future.result()
+        cache.put(key, cells[pos])
+    diagonal = [cells.pop((i, i)) for i in range(len(values))]
+    return diagonal, cells
+
+
+def draw_pairplot(
+    figures: FigureManager,
+    data: pd.DataFrame,
+    columns: Sequence[str],
+    hue: str | None = None,
+    cache: CellCache = CELL_CACHE,
+) -> Figure:
+    """Corner pairplot of ``columns`` (KDE diagonal, scatter below) on a new figure."""
+    columns = list(columns)
+    k = len(columns)
+    values = [data[col].to_numpy(dtype=float, na_value=np.nan) for col in columns]
+    labels, codes = (["_"], None) if hue is None else hue_codes(data[hue], MAX_LAYERS)
+    colors = np.asarray(sns.color_palette(n_colors=len(labels)))
+    diagonal, lower = compute_cells(values, codes, len(labels), cache)
+
+    # Only the lower triangle is created: axes are the costly part of the figure.
+    fig = figures.figure((CELL_INCHES * k, CELL_INCHES * k))
+    grid = fig.add_gridspec(k, k)
+    axes: dict[tuple[int, int], Axes] = {}
+    for i in range(k):
+        for j in range(i + 1):
+            axes[i, j] = fig.add_subplot(
+                grid[i, j],
+                sharex=axes.get((j, j)),
+                sharey=axes.get((i, 0)) if 0 < j < i else None,
+            )
+            axes[i, j].tick_params(labelbottom=i == k - 1, labelleft=j == 0 and i > 0)
+
+    for i, cell in enumerate(diagonal):
+        ax = axes[i, i]
+        for layer, support, density in cell.curves:
+            ax.fill_between(support, density, color=colors[layer], alpha=0.7, linewidth=1)
+        ax.set_ylim(bottom=0)
+        ax.tick_params(left=False)
+
+    for (i, j), cell in lower.items():
+        # A single RGB tuple passed as c= is ambiguous with 3 or 4 points.
+        color = {"color": colors[0]} if cell.codes is None else {"c": colors[cell.codes]}
+        axes[i, j].scatter(cell.x, cell.y, **color, s=16, alpha=0.6, linewidths=0, rasterized=True)
+
+    for i, col in enumerate(columns):
+        axes[k - 1, i].set_xlabel(col)
+        axes[i, 0].set_ylabel(col)
+
+    if hue is not None:
+        handles = [
+            Line2D([], [], marker="o", linestyle="", color=color, label=label)
+            for label, color in zip(labels, colors, strict=True)
+        ]
+        fig.legend(
+            handles=handles, title=hue, loc="center left", bbox_to_anchor=(1.0, 0.5), frameon=False
+        )
+    return fig
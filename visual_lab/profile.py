@@ -0,0 +1,93 @@
+"""Per-dataset summary statistics, computed once and shared.
+
+The top metrics row, the Overview view and the builders all need the same
+facts about a dataset (which columns are numeric, how much is missing, the
+correlation matrix, the most frequent categories, pairplot samples, colour codes).
+``DatasetProfile`` computes them in one pass over the frame (correlations and
+samples lazily); the app caches it per dataset fingerprint.
+Its pandas members are shared between sessions and must be treated as
+read-only.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from visual_lab.categories import CategoryCodes
+from visual_lab.correlation import CorrelationEngine
+from visual_lab.sampling import SampleCache
+
+TOP_K = 15
+QUANTILES = (0.0, 0.05, 0.25, 0.5, 0.75, 0.95, 1.0)
+QUANTILE_LABELS = ("min", "5%", "25%", "50%", "75%", "95%", "max")
+
+
+@dataclass(frozen=True)
+class DatasetProfile:
+    n_rows: int
+    n_columns: int
+    numeric_columns: tuple[str, ...]
+    categorical_columns: tuple[str, ...]
+    dtypes: pd.Series
+    missing_pct: pd.Series
+    quantiles: pd.DataFrame
+    n_unique: dict[str, int]
+    top_categories: dict[str, pd.Series]
+    correlation: CorrelationEngine
+    samples: SampleCache
+    codes: CategoryCodes
+
+    @property
+    def missing_ratio(self) -> float:
+        """Mean missing percentage over all columns."""
+        return float(self.missing_pct.mean()) if len(self.missing_pct) else 0.0
+
+    def schema(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "column": self.dtypes.index,
+                "dtype": self.dtypes.astype(str),
+                "missing_%": self.missing_pct.round(1),
+            }
+        )
+
+    @property
+    def corr(self) -> pd.DataFrame:
+        """Full Pearson correlation matrix of the numeric columns."""
+        return self.correlation.matrix("pearson")
+
+    def corr_subset(self, columns: list[str], method: str = "pearson") -> pd.DataFrame:
+        """Same as ``df[columns].corr(method)``, sliced from the cached matrix."""
+        return self.correlation.subset(columns, method)
+
+    def top(self, column: str, k: int = TOP_K) -> pd.Index:
+        """The ``k`` most frequent values of a categorical column."""
+        return self.top_categories[column].head(k).index
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> DatasetProfile:
+        numeric = df.select_dtypes(include=[np.number]).columns.tolist()
+        categorical = df.select_dtypes(include=["object", "string", "category"]).columns.tolist()
+        quantiles = df[numeric].quantile(list(QUANTILES)).T.set_axis(list(QUANTILE_LABELS), axis=1)
+        counts = {}
+        for col in categorical:
+            vc = df[col].value_counts()
+            # Categorical value_counts also lists unused categories (count 0).
+            counts[col] = vc[vc > 0]
+        return cls(
+            n_rows=len(df),
+            n_columns=df.shape[1],
+            numeric_columns=tuple(numeric),
+            categorical_columns=tuple(categorical),
+            dtypes=df.dtypes,
+            missing_pct=df.isna().mean() * 100,
+            quantiles=quantiles,
+            n_unique={col: len(vc) for col, vc in counts.items()},
+            top_categories={col: vc.head(TOP_K) for col, vc in counts.items()},
+            correlation=CorrelationEngine(df[numeric]),
+            samples=SampleCache(df),
+            codes=CategoryCodes(df),
+        )
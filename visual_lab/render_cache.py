@@ -0,0 +1,148 @@
+"""Byte-bounded LRU cache for encoded figure output.
+
+A figure is identified by everything that can change its pixels: the dataset
+content, the normalized plot spec, the theme and the output DPI. Anything else
+(expanders, unrelated widgets, the export DPI slider for display renders) hits
+the cache and costs a dictionary lookup instead of a matplotlib render.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame: values, index, column names and dtypes."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    return h.hexdigest()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+def normalize_spec(spec: Mapping[str, Any]) -> str:
+    """Canonical JSON for a plot spec (key order independent, numpy-safe)."""
+    return json.dumps(spec, sort_keys=True, separators=(",", ":"), default=_json_default)
+
+
+def make_key(
+    dataset_fp: str,
+    spec: Mapping[str, Any],
+    theme: Mapping[str, Any],
+    dpi: int,
+    max_width: int | None = None,
+) -> str:
+    """Cache key for one encoded figure."""
+    payload = {
+        "dataset": dataset_fp,
+        "spec": json.loads(normalize_spec(spec)),
+        "theme": json.loads(normalize_spec(theme)),
+        "dpi": int(dpi),
+    }
+    if max_width is not None:
+        payload["max_width"] = int(max_width)
+    return hashlib.blake2b(normalize_spec(payload).encode(), digest_size=20).hexdigest()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class RenderCache:
+    """Thread-safe LRU mapping of render keys to encoded image bytes.
+
+    The budget is expressed in bytes of stored payload. Entries larger than the
+    whole budget are returned to the caller but never stored.
+    """
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024) -> None:
+        self.max_bytes = int(max_bytes)
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        size = len(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            if size > self.max_bytes:
+                return
+            self._data[key] = value
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._evictions += 1
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        value = self.get(key)
+        if value is None:
+            value = render()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._data),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+            )
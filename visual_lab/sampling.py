@@ -0,0 +1,240 @@
+"""Row budgets for point-level plots.
+
+Aggregating plots (histograms, box plots, counts, correlations) always see the
+full dataset. Plots that draw or bootstrap every row (scatter, regression,
+mean bars with a CI) are capped at a per-plot row budget instead, so datasets
+are kept at full size and sampling is decided where it matters. (Line plots
+are downsampled by shape instead, see ``visual_lab.downsample``.)
+
+Pairplots draw a hue-stratified sample instead: every hue level keeps a floor
+of rows, so rare classes stay visible, and the rest of the budget is shared in
+proportion to level size. ``SampleCache`` remembers the chosen row positions
+per (columns, hue, size), so interactions that keep those settings reuse them.
+``reservoir_sample`` draws a uniform (or stratified) sample from a stream of
+frames without holding the whole source in memory; ``SampleCache`` uses it for
+frames larger than the requested sample.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ROW_BUDGET = 5_000
+ROW_BUDGET_OPTIONS = (1_000, 2_000, 5_000, 10_000, 20_000, 50_000, 100_000)
+
+# Rows per slice when a SampleCache streams its frame through reservoir_sample.
+SAMPLE_CHUNK_ROWS = 65_536
+
+DEFAULT_PAIRPLOT_SAMPLE = 400
+MAX_PAIRPLOT_SAMPLE = 5_000
+# Share of a stratified sample split evenly between strata before the
+# proportional allocation.
+STRATUM_FLOOR_SHARE = 0.5
+
+
+def row_positions(n: int, max_rows: int, seed: int = 42) -> np.ndarray | None:
+    """Sorted positions of a seeded ``max_rows`` sample of ``n`` rows (None if n fits)."""
+    if n <= max_rows:
+        return None
+    return np.sort(np.random.default_rng(seed).choice(n, size=max_rows, replace=False))
+
+
+def cap_rows(df: pd.DataFrame, max_rows: int, seed: int = 42) -> pd.DataFrame:
+    """``df`` itself, or a seeded sample of ``max_rows`` rows in original order."""
+    positions = row_positions(len(df), max_rows, seed)
+    return df if positions is None else df.iloc[positions]
+
+
+def stratum_sizes(counts: np.ndarray, size: int) -> np.ndarray:
+    """Rows to take from strata of ``counts`` rows for a ``size``-row sample.
+
+    The total never exceeds ``size``. Each stratum first gets an equal share of ``STRATUM_FLOOR_SHARE`` of the
+    budget (or all its rows, if fewer); the remainder is allocated in
+    proportion to the rows each stratum has left, by largest remainder. With
+    more strata than ``size``, the ``size`` rarest get one row each.
+    """
+    counts = np.asarray(counts, dtype=np.intp)
+    if size >= counts.sum():
+        return counts.copy()
+    if len(counts) > size:
+        # Not every stratum fits: one row each, dropping the most common first.
+        take = np.zeros_like(counts)
+        take[np.argsort(counts, kind="stable")[: max(size, 0)]] = 1
+        return take
+    floor = np.minimum(counts, int(np.ceil(size * STRATUM_FLOOR_SHARE / len(counts))))
+    take = floor.copy()
+    left = size - int(take.sum())
+    if left > 0:
+        spare = counts - floor
+        quota = spare * (left / spare.sum())
+        extra = np.floor(quota).astype(np.intp)
+        short = left - int(extra.sum())
+        extra[np.argsort(extra - quota, kind="stable")[:short]] += 1
+        take += np.minimum(extra, spare)
+    return take
+
+
+def stratified_positions(
+    codes: np.ndarray, size: int, rng: np.random.Generator | None = None
+) -> np.ndarray:
+    """Sorted positions of a ``size``-row sample stratified by ``codes`` (see ``stratum_sizes``)."""
+    rng = rng or np.random.default_rng(42)
+    n = len(codes)
+    if size >= n:
+        return np.arange(n)
+    _, inverse, counts = np.unique(codes, return_inverse=True, return_counts=True)
+    take = stratum_sizes(counts, size)
+    order = np.argsort(inverse, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    picked = [
+        rng.choice(order[start : start + count], size=k, replace=False)
+        for start, count, k in zip(starts, counts, take, strict=True)
+    ]
+    return np.sort(np.concatenate(picked))
+
+
+def stratified_sample(
+    df: pd.DataFrame, size: int, by: str | None = None, seed: int = 42
+) -> pd.DataFrame:
+    """``size`` rows of ``df`` in original order, stratified by column ``by``."""
+    if len(df) <= size:
+        return df
+    if by is None:
+        return cap_rows(df, size, seed)
+    codes, _ = pd.factorize(df[by], use_na_sentinel=False)
+    return df.iloc[stratified_positions(codes, size, np.random.default_rng(seed))]
+
+
+def _smallest_keys(codes: np.ndarray, keys: np.ndarray, limits: np.ndarray) -> np.ndarray:
+    """Sorted positions of the ``limits[c]`` smallest ``keys`` within each code ``c``."""
+    order = np.lexsort((keys, codes))
+    grouped = codes[order]
+    starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+    rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    return np.sort(order[rank < limits[grouped]])
+
+
+def reservoir_sample(
+    chunks: Iterable[pd.DataFrame], size: int, seed: int = 42, by: str | None = None
+) -> pd.DataFrame:
+    """Uniform sample of ``size`` rows from a stream of frames, in stream order.
+
+    Each row gets a random key and the ``size`` smallest keys are kept, so at
+    most ``size`` rows plus one chunk are held at a time. With ``by``, the
+    ``size`` smallest keys of every level are kept and the levels are counted;
+    once the stream ends each level gives up its ``stratum_sizes`` share, as
+    ``stratified_sample`` would allocate it.
+    """
+    rng = np.random.default_rng(seed)
+    kept: pd.DataFrame | None = None
+    keys = np.empty(0)
+    totals = pd.Series(dtype="int64")
+    for chunk in chunks:
+        if kept is None:
+            kept = chunk.iloc[:0]
+        kept = pd.concat([kept, chunk])
+        keys = np.concatenate([keys, rng.random(len(chunk))])
+        if by is not None:
+            totals = totals.add(chunk[by].value_counts(dropna=False), fill_value=0)
+            codes, levels = pd.factorize(kept[by], use_na_sentinel=False)
+            keep = _smallest_keys(codes, keys, np.full(len(levels), size))
+            kept, keys = kept.iloc[keep], keys[keep]
+        elif len(keys) > size:
+            keep = np.sort(np.argpartition(keys, size)[:size])
+            kept, keys = kept.iloc[keep], keys[keep]
+    if kept is None:
+        return pd.DataFrame()
+    if by is not None and len(kept):
+        codes, levels = pd.factorize(kept[by], use_na_sentinel=False)
+        take = stratum_sizes(totals.reindex(levels).to_numpy(), size)
+        kept = kept.iloc[_smallest_keys(codes, keys, take)]
+    return kept.reset_index(drop=True)
+
+
+@dataclass(frozen=True)
+class SampleStats:
+    hits: int
+    misses: int
+    entries: int
+
+
+class SampleCache:
+    """Per-frame LRU cache of stratified sample row positions.
+
+    Samples are drawn from the rows complete in ``columns`` (and ``by``), as
+    ``df[columns].dropna()`` would be, and stored as positions so an entry
+    costs a few kilobytes whatever the row width.
+
+    A frame with more rows than the requested size is sampled in one pass
+    with ``reservoir_sample`` over ``source``: a callable returning the same
+    rows as a stream of frames, in order (e.g. ``store.iter_arrow`` on the
+    file ``df`` was memory-mapped from). By default ``df`` is streamed in
+    slices of ``SAMPLE_CHUNK_ROWS``, so only one slice's missing-value mask
+    is materialized at a time.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        max_entries: int = 32,
+        seed: int = 42,
+        source: Callable[[], Iterable[pd.DataFrame]] | None = None,
+    ) -> None:
+        self._df = df
+        self._source = source or self._slices
+        self.max_entries = max_entries
+        self.seed = seed
+        self._positions: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def sample(self, columns: Sequence[str], size: int, by: str | None = None) -> pd.DataFrame:
+        """``df[columns + [by]]`` without missing rows, stratified down to ``size`` rows."""
+        cols = list(dict.fromkeys([*columns, *([by] if by else [])]))
+        key = (tuple(cols), by, int(size))
+        with self._lock:
+            positions = self._positions.get(key)
+            if positions is not None:
+                self._positions.move_to_end(key)
+                self._hits += 1
+        if positions is None:
+            if len(self._df) > size:
+                positions = self._reservoir(cols, size, by)
+            else:
+                positions = np.flatnonzero(self._df[cols].notna().all(axis=1).to_numpy())
+            with self._lock:
+                self._misses += 1
+                self._positions[key] = positions
+                while len(self._positions) > self.max_entries:
+                    self._positions.popitem(last=False)
+        return self._df[cols].iloc[positions]
+
+    def _slices(self) -> Iterator[pd.DataFrame]:
+        for start in range(0, len(self._df), SAMPLE_CHUNK_ROWS):
+            yield self._df.iloc[start : start + SAMPLE_CHUNK_ROWS]
+
+    def _reservoir(self, cols: list[str], size: int, by: str | None) -> np.ndarray:
+        def complete_rows() -> Iterator[pd.DataFrame]:
+            offset = 0
+            for chunk in self._source():
+                part = chunk[cols]
+                complete = part.notna().all(axis=1).to_numpy()
+                found = pd.DataFrame({"_position": offset + np.flatnonzero(complete)})
+                if by is not None:
+                    found[by] = part[by].to_numpy()[complete]
+                offset += len(chunk)
+                yield found
+
+        sample = reservoir_sample(complete_rows(), size, self.seed, by)
+        return sample["_position"].to_numpy(np.intp) if len(sample) else np.empty(0, np.intp)
+
+    def stats(self) -> SampleStats:
+        with self._lock:
+            return SampleStats(self._hits, self._misses, len(self._positions))
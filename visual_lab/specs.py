@@ -0,0 +1,255 @@
+"""Typed plot specifications.
+
+A spec holds everything that decides what a plot looks like, apart from the
+dataset and the theme. Fields that do not apply to the chosen kind are
+normalized to ``None`` so equivalent plots share a render cache entry, and
+column lists are stored as tuples so specs are hashable.
+
+Scatter specs with ``density=True`` bin every row into a grid (see
+``visual_lab.density``) instead of drawing sampled points, so their row budget
+and marker settings are dropped.
+
+``spec_to_dict`` / ``spec_from_dict`` give the JSON form used for cache keys
+and batch files: ``{"type": "SeabornDistribution", "kind": "KDE", ...}``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+from typing import Any, get_args
+
+HUE_DISTRIBUTION_KINDS = ("Histogram", "KDE", "Histogram + KDE", "ECDF")
+BIN_DISTRIBUTION_KINDS = ("Histogram", "Histogram + KDE")
+LOG_DISTRIBUTION_KINDS = ("Histogram", "KDE", "Histogram + KDE")
+
+
+def _set(spec: Any, name: str, value: Any) -> None:
+    object.__setattr__(spec, name, value)
+
+
+def _columns(spec: Any, name: str = "columns") -> None:
+    _set(spec, name, tuple(getattr(spec, name)))
+
+
+# ----- Overview -----
+@dataclass(frozen=True)
+class OverviewDistribution:
+    x: str
+
+
+@dataclass(frozen=True)
+class OverviewCorrelation:
+    columns: tuple[str, ...]
+
+    def __post_init__(self) -> None:
+        _columns(self)
+
+
+# ----- Seaborn builder -----
+@dataclass(frozen=True)
+class SeabornDistribution:
+    kind: str
+    x: str
+    hue: str | None = None
+    bins: int | None = 30
+    log_scale: bool | None = False
+
+    def __post_init__(self) -> None:
+        if self.kind not in HUE_DISTRIBUTION_KINDS:
+            _set(self, "hue", None)
+        if self.kind not in BIN_DISTRIBUTION_KINDS:
+            _set(self, "bins", None)
+        if self.kind not in LOG_DISTRIBUTION_KINDS:
+            _set(self, "log_scale", None)
+
+
+@dataclass(frozen=True)
+class SeabornRelationship:
+    kind: str
+    x: str
+    y: str
+    hue: str | None = None
+    alpha: float | None = 0.7
+    rows: int | None = None
+    density: bool = False
+
+    def __post_init__(self) -> None:
+        if self.kind not in ("Scatter", "Line"):
+            _set(self, "hue", None)
+        if self.kind not in ("Scatter", "Regression"):
+            _set(self, "alpha", None)
+        if self.kind != "Scatter":
+            _set(self, "density", False)
+        if self.kind == "Line":  # lines are downsampled by shape instead
+            _set(self, "rows", None)
+        if self.density:
+            _set(self, "alpha", None)
+            _set(self, "rows", None)
+
+
+@dataclass(frozen=True)
+class SeabornCategory:
+    kind: str
+    category: str
+    value: str | None = None
+    top: int = 8
+    rows: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.kind == "Count":
+            _set(self, "value", None)
+        if self.kind != "Bar (mean)":
+            _set(self, "rows", None)
+
+
+@dataclass(frozen=True)
+class SeabornHeatmap:
+    columns: tuple[str, ...]
+    method: str = "Pearson"
+    annot: bool = True
+    center_zero: bool = True
+
+    def __post_init__(self) -> None:
+        _columns(self)
+
+
+@dataclass(frozen=True)
+class SeabornPairplot:
+    columns: tuple[str, ...]
+    hue: str | None = None
+    sample: int = 400
+
+    def __post_init__(self) -> None:
+        _columns(self)
+
+
+# ----- Matplotlib builder -----
+@dataclass(frozen=True)
+class MatplotlibLine:
+    x: str
+    y: str
+    marker: str = "o"
+    grid: bool = True
+    # Lines are downsampled by shape, not row-sampled; kept so saved specs load.
+    rows: int | None = None
+
+    def __post_init__(self) -> None:
+        _set(self, "rows", None)
+
+
+@dataclass(frozen=True)
+class MatplotlibScatter:
+    x: str
+    y: str
+    color_by: str | None = None
+    alpha: float | None = 0.7
+    size: int | None = 70
+    rows: int | None = None
+    density: bool = False
+
+    def __post_init__(self) -> None:
+        if self.density:
+            _set(self, "alpha", None)
+            _set(self, "size", None)
+            _set(self, "rows", None)
+
+
+@dataclass(frozen=True)
+class MatplotlibBar:
+    category: str
+    value: str
+    agg: str = "mean"
+    horizontal: bool = True
+
+
+@dataclass(frozen=True)
+class MatplotlibHistogram:
+    x: str
+    bins: int = 30
+    density: bool = False
+
+
+@dataclass(frozen=True)
+class MatplotlibBox:
+    columns: tuple[str, ...]
+
+    def __post_init__(self) -> None:
+        _columns(self)
+
+
+@dataclass(frozen=True)
+class MatplotlibSubplots:
+    columns: tuple[str, ...]
+    kde: bool = True
+
+    def __post_init__(self) -> None:
+        _columns(self)
+
+
+# ----- Compare -----
+@dataclass(frozen=True)
+class CompareDistribution:
+    library: str
+    x: str
+    hue: str | None = None
+
+    def __post_init__(self) -> None:
+        if self.library != "seaborn":
+            _set(self, "hue", None)
+
+
+@dataclass(frozen=True)
+class CompareRelationship:
+    library: str
+    x: str
+    y: str
+    hue: str | None = None
+    rows: int | None = None
+    density: bool = False
+
+    def __post_init__(self) -> None:
+        if self.library != "seaborn":
+            _set(self, "hue", None)
+        if self.density:
+            _set(self, "rows", None)
+
+
+PlotSpec = (
+    OverviewDistribution
+    | OverviewCorrelation
+    | SeabornDistribution
+    | SeabornRelationship
+    | SeabornCategory
+    | SeabornHeatmap
+    | SeabornPairplot
+    | MatplotlibLine
+    | MatplotlibScatter
+    | MatplotlibBar
+    | MatplotlibHistogram
+    | MatplotlibBox
+    | MatplotlibSubplots
+    | CompareDistribution
+    | CompareRelationship
+)
+
+SPEC_TYPES: dict[str, type] = {cls.__name__: cls for cls in get_args(PlotSpec)}
+
+
+def spec_to_dict(spec: PlotSpec) -> dict[str, Any]:
+    return {"type": type(spec).__name__, **asdict(spec)}
+
+
+def spec_from_dict(data: dict[str, Any]) -> PlotSpec:
+    """Build a spec from its JSON form; unknown types or fields raise ValueError."""
+    payload = dict(data)
+    name = payload.pop("type", None)
+    cls = SPEC_TYPES.get(name)
+    if cls is None:
+        raise ValueError(f"Unknown plot spec type {name!r}; expected one of {sorted(SPEC_TYPES)}")
+    unknown = set(payload) - {f.name for f in fields(cls)}
+    if unknown:
+        raise ValueError(f"{name} has no field(s) {sorted(unknown)}")
+    try:
+        return cls(**payload)
+    except TypeError as exc:
+        raise ValueError(f"Invalid {name} spec: {exc}") from exc
@@ -0,0 +1,106 @@
+"""Vendored Arrow IPC copies of the seaborn demo datasets.
+
+Files are written uncompressed so they can be memory-mapped: numeric columns
+come back without any parsing and the pages are shared through the OS page
+cache. The online seaborn catalog is only consulted for a dataset that has no
+vendored file (and never with ``VISUAL_LAB_ONLINE_CATALOG=0``);
+``scripts/vendor_datasets.py`` creates and refreshes the files from it.
+
+``seaborn.load_dataset`` downloads with no timeout, so an unreachable catalog
+would hang a cold start. ``catalog_dataset`` downloads the CSV into seaborn's
+cache itself, bounded by ``CATALOG_TIMEOUT`` seconds, and leaves only the
+parsing to seaborn.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+from pathlib import Path
+from urllib.request import urlopen
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+STORE_DIR = Path(os.getenv("VISUAL_LAB_DATA_DIR") or Path(__file__).parent / "data")
+ONLINE_CATALOG = os.getenv("VISUAL_LAB_ONLINE_CATALOG", "1") == "1"
+CATALOG_TIMEOUT = float(os.getenv("VISUAL_LAB_CATALOG_TIMEOUT", "10"))
+CATALOG_URL = "https://raw.githubusercontent.com/mwaskom/seaborn-data/master/{name}.csv"
+
+# Rows per record batch in the files this module writes.
+BATCH_ROWS = 65_536
+
+CATALOG_NAMES = ("tips", "penguins", "flights", "iris", "diamonds", "titanic", "car_crashes")
+
+
+def store_path(name: str, root: Path | None = None) -> Path:
+    return (root or STORE_DIR) / f"{name}.arrow"
+
+
+def available(root: Path | None = None) -> list[str]:
+    """Catalog names that have a vendored file."""
+    return [name for name in CATALOG_NAMES if store_path(name, root).exists()]
+
+
+def write_arrow(frame: pd.DataFrame, path: Path, batch_rows: int = BATCH_ROWS) -> int:
+    """Write ``frame`` as an uncompressed Arrow IPC file and return its size.
+
+    Rows are split into record batches of ``batch_rows``, the unit ``iter_arrow``
+    streams.
+    """
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with pa.OSFile(str(path), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=batch_rows)
+    return path.stat().st_size
+
+
+def read_arrow(path: Path) -> pd.DataFrame:
+    """Memory-map an Arrow IPC file into a DataFrame (categoricals preserved)."""
+    with pa.memory_map(str(path), "r") as source:
+        table = ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def iter_arrow(path: Path) -> Iterator[pd.DataFrame]:
+    """The record batches of an Arrow IPC file as DataFrames, one at a time.
+
+    Feed it to ``sampling.reservoir_sample`` to sample a file too large to load.
+    """
+    with pa.memory_map(str(path), "r") as source:
+        reader = ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i).to_pandas(split_blocks=True)
+
+
+def catalog_dataset(name: str, timeout: float = CATALOG_TIMEOUT) -> pd.DataFrame:
+    """``seaborn.load_dataset(name)``, with any download bounded by ``timeout`` seconds.
+
+    Raises ``OSError`` (``URLError``, ``TimeoutError``) when the catalog cannot
+    be reached in time.
+    """
+    import seaborn as sns
+
+    cached = Path(sns.get_data_home()) / f"{name}.csv"
+    if not cached.exists():
+        with urlopen(CATALOG_URL.format(name=name), timeout=timeout) as response:
+            data = response.read()
+        partial = cached.with_name(f"{cached.name}.part")
+        partial.write_bytes(data)
+        partial.replace(cached)
+    return sns.load_dataset(name)
+
+
+def load_dataset(
+    name: str,
+    root: Path | None = None,
+    online: bool = ONLINE_CATALOG,
+) -> pd.DataFrame:
+    """Vendored copy of a catalog dataset, or the online catalog as a fallback."""
+    path = store_path(name, root)
+    if path.exists():
+        return read_arrow(path)
+    if not online:
+        raise FileNotFoundError(f"No vendored file for {name!r} at {path}")
+    return catalog_dataset(name)
@@ -0,0 +1,105 @@
+"""Compiled plot themes, applied per render.
+
+A theme is the sidebar's choice of Seaborn context, style and palette plus
+the figure mode. ``compile_theme`` resolves it once into a read-only mapping
+of rcParams (what ``sns.set_theme`` and ``sns.set_palette`` would set, plus
+the app's own defaults, plus the dark colours in the "Dark" figure mode),
+cached per distinct theme. ``use_theme`` applies that mapping inside
+``matplotlib.rc_context``, so artists get their final colours when they are
+created and the global rcParams are restored when the render is done.
+
+rcParams are a single process-wide dict: a second thread entering
+``rc_context`` while the first is still drawing would see, and on exit
+restore, the wrong values. ``use_theme`` therefore holds ``RENDER_LOCK``
+for its duration; concurrent sessions take turns drawing instead of
+repainting each other's figures.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any
+
+import matplotlib as mpl
+import seaborn as sns
+
+DEFAULT_THEME = {"context": "notebook", "style": "whitegrid", "palette": "deep", "dark": True}
+
+# Applied over the Seaborn style and context.
+BASE_RC: Mapping[str, Any] = MappingProxyType(
+    {
+        "figure.figsize": (10, 6),
+        "savefig.dpi": 300,
+        "figure.dpi": 150,
+        "axes.spines.top": False,
+        "axes.spines.right": False,
+        "figure.autolayout": True,
+        "grid.alpha": 0.3,
+        "grid.linestyle": "--",
+        "font.size": 10,
+        "axes.labelsize": 11,
+        "axes.titlesize": 13,
+        "legend.fontsize": 9,
+    }
+)
+
+# Colours of the "Dark" figure mode, applied over everything else.
+DARK_BACKGROUND = "#020617"
+DARK_FOREGROUND = "#e5e7eb"
+DARK_RC: Mapping[str, Any] = MappingProxyType(
+    {
+        "figure.facecolor": DARK_BACKGROUND,
+        "savefig.facecolor": DARK_BACKGROUND,
+        "axes.facecolor": DARK_BACKGROUND,
+        "axes.edgecolor": "#4b5563",
+        "axes.labelcolor": DARK_FOREGROUND,
+        "axes.titlecolor": DARK_FOREGROUND,
+        "text.color": DARK_FOREGROUND,
+        "xtick.color": DARK_FOREGROUND,
+        "ytick.color": DARK_FOREGROUND,
+        "legend.facecolor": DARK_BACKGROUND,
+    }
+)
+
+RENDER_LOCK = threading.RLock()
+
+
+@dataclass(frozen=True)
+class CompiledTheme:
+    """rcParams of one theme; ``dark`` tells whether they include ``DARK_RC``."""
+
+    rc: Mapping[str, Any]
+    dark: bool
+
+
+@lru_cache(maxsize=64)
+def _compile(context: str, style: str, palette: str, dark: bool) -> CompiledTheme:
+    rc: dict[str, Any] = {"font.family": "sans-serif"}
+    rc.update(sns.axes_style(style))
+    rc.update(sns.plotting_context(context))
+    rc["axes.prop_cycle"] = mpl.cycler(color=sns.color_palette(palette))
+    rc.update(BASE_RC)
+    if dark:
+        rc.update(DARK_RC)
+    return CompiledTheme(rc=MappingProxyType(rc), dark=dark)
+
+
+def compile_theme(theme: Mapping[str, Any]) -> CompiledTheme:
+    """The compiled form of ``theme`` (keys as in ``DEFAULT_THEME``), cached."""
+    theme = {**DEFAULT_THEME, **theme}
+    return _compile(
+        str(theme["context"]), str(theme["style"]), str(theme["palette"]), bool(theme["dark"])
+    )
+
+
+@contextmanager
+def use_theme(theme: Mapping[str, Any] | CompiledTheme) -> Iterator[CompiledTheme]:
+    """Apply ``theme`` to rcParams for the block, holding ``RENDER_LOCK``."""
+    compiled = theme if isinstance(theme, CompiledTheme) else compile_theme(theme)
+    with RENDER_LOCK, mpl.rc_context(compiled.rc):
+        yield compiled
@@ -0,0 +1,378 @@
+"""Bounded process pool for figure renders.
+
+Matplotlib work holds the GIL (and, for theming, ``theme.RENDER_LOCK``), so
+renders on the sessions' script threads serialize and a few heavy pairplots
+stall every other session. ``RenderPool`` runs them in worker processes
+instead, behind a queue it manages itself:
+
+- at most ``max_queue`` renders wait; ``submit`` raises ``QueueFull`` beyond
+  that, and callers back off and retry;
+- a session has at most ``per_session`` renders running at once, so one user
+  cannot occupy every worker while others queue;
+- a submission replaces the queued render of the same session and slot (e.g.
+  the previous slider position), which is dropped without being started.
+
+Renders are handed to the executor only when a worker is free, so the queue
+depth and each render's wait are known exactly; ``stats`` reports both.
+
+Workers receive a ``RenderJob`` naming the dataset rather than the frame
+itself: each process loads datasets through its own ``DatasetRegistry`` and
+checks the fingerprint, so nothing larger than a spec crosses the process
+boundary on the way in.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+from collections import Counter, deque
+from collections.abc import Callable, Iterator, Mapping
+from concurrent.futures import (
+    BrokenExecutor,
+    CancelledError,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+)
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+import pandas as pd
+
+from visual_lab import engine
+from visual_lab.datasets import (
+    BUILTIN_LOADERS,
+    FALLBACK_LOADERS,
+    DatasetRegistry,
+    enable_copy_on_write,
+)
+from visual_lab.figures import FigureManager
+from visual_lab.profile import DatasetProfile
+from visual_lab.specs import spec_from_dict
+
+# One core is left to the server and the script threads, so a single-core host
+# renders in-process.
+DEFAULT_WORKERS = max(0, min(2, (os.cpu_count() or 1) - 1))
+DEFAULT_MAX_QUEUE = 16
+DEFAULT_PER_SESSION = 2
+# Renders whose queue wait is kept for the wait-time statistics.
+WAIT_WINDOW = 256
+
+
+class QueueFull(RuntimeError):
+    """The render queue is at its limit; retry once it has drained."""
+
+
+# ==================== WORKER SIDE ====================
+@dataclass(frozen=True)
+class RenderJob:
+    """Everything a worker needs to render one figure, by dataset name."""
+
+    dataset: str
+    fingerprint: str
+    spec: Mapping[str, Any]
+    theme: Mapping[str, Any]
+    dpi: int
+    max_width: int | None = None
+
+
+_registry: DatasetRegistry | None = None
+_profiles: dict[str, DatasetProfile] = {}
+_figures = FigureManager()
+
+
+def init_worker(arrow_strings: bool = False) -> None:
+    """Process initializer: Agg backend, Copy-on-Write and a registry configured like the app's."""
+    global _registry
+    import matplotlib
+
+    matplotlib.use("Agg")
+    enable_copy_on_write()
+    _registry = DatasetRegistry(
+        BUILTIN_LOADERS, fallback=FALLBACK_LOADERS, arrow_strings=arrow_strings
+    )
+    _profiles.clear()
+
+
+def worker_dataset(
+    name: str, fingerprint: str | None = None
+) -> tuple[pd.DataFrame, DatasetProfile]:
+    """Dataset ``name`` and its profile, each loaded once per process.
+
+    Raises ``ValueError`` when ``fingerprint`` is given and the data this
+    process loaded differs from it.
+    """
+    if _registry is None:
+        init_worker()
+    entry = _registry.entry(name)
+    if fingerprint is not None and entry.fingerprint != fingerprint:
+        raise ValueError(f"Dataset {name!r} differs from the one the plot was built on")
+    profile = _profiles.get(entry.fingerprint)
+    if profile is None:
+        profile = _profiles[entry.fingerprint] = DatasetProfile.from_frame(entry.frame)
+    return entry.frame.copy(deep=False), profile
+
+
+def render_job(job: RenderJob) -> bytes:
+    """Render ``job`` in this process (a worker, or the caller as a fallback)."""
+    frame, profile = worker_dataset(job.dataset, job.fingerprint)
+    return engine.render(
+        spec_from_dict(dict(job.spec)),
+        frame,
+        job.theme,
+        job.dpi,
+        figures=_figures,
+        profile=profile,
+        max_width=job.max_width,
+    )
+
+
+# ==================== POOL ====================
+class Ticket:
+    """A submitted render: queued, then running, then done (or cancelled)."""
+
+    def __init__(
+        self,
+        pool: RenderPool,
+        session: str,
+        slot: str,
+        fn: Callable[..., Any],
+        args: tuple[Any, ...],
+    ) -> None:
+        self._pool = pool
+        self.session = session
+        self.slot = slot
+        self.fn = fn
+        self.args = args
+        self.future: Future[Any] = Future()
+        self.submitted = time.perf_counter()
+        self.started: float | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.started is not None and not self.future.done()
+
+    def position(self) -> int | None:
+        """Renders queued ahead of this one (None once it has left the queue)."""
+        return self._pool.position(self)
+
+    def cancel(self) -> bool:
+        """Drop the render if it has not started; a running one completes."""
+        return self._pool.cancel(self)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block up to ``timeout`` seconds; whether the render is done."""
+        try:
+            self.future.exception(timeout)
+        except TimeoutError:
+            return False
+        except CancelledError:
+            pass
+        return True
+
+    def result(self, timeout: float | None = None) -> Any:
+        return self.future.result(timeout)
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    workers: int
+    queued: int
+    running: int
+    submitted: int
+    completed: int
+    failed: int
+    cancelled: int
+    superseded: int
+    rejected: int
+    wait_mean_ms: float
+    wait_max_ms: float
+
+
+@contextmanager
+def _plain_main() -> Iterator[None]:
+    """Hide the caller's ``__main__`` from worker processes started in the block.
+
+    Streamlit runs the app script as ``__main__``, and ``spawn`` re-imports
+    the parent's main module in every child, which would run the whole app
+    there.
+    """
+    main = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        if main is not None:
+            sys.modules["__main__"] = main
+
+
+class _SpawnExecutor(ProcessPoolExecutor):
+    # Workers are started on demand from submit().
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future[Any]:
+        with _plain_main():
+            return super().submit(fn, *args, **kwargs)
+
+
+def process_executor(
+    workers: int, initializer: Callable[..., None] | None = None, initargs: tuple[Any, ...] = ()
+) -> Executor:
+    """Worker processes started with ``spawn`` (forking a threaded server is unsafe)."""
+    return _SpawnExecutor(
+        workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer,
+        initargs=initargs,
+    )
+
+
+class RenderPool:
+    """Queue in front of an executor, with per-session caps and supersession.
+
+    ``executor`` builds the executor when the first render is dispatched (and
+    again after a worker crash broke the previous one); by default it is a
+    ``process_executor`` with ``workers`` processes, which must be at least 1.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        per_session: int = DEFAULT_PER_SESSION,
+        initializer: Callable[..., None] | None = None,
+        initargs: tuple[Any, ...] = (),
+        executor: Callable[[], Executor] | None = None,
+    ) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.per_session = per_session
+        self._make_executor = executor or (lambda: process_executor(workers, initializer, initargs))
+        self._executor: Executor | None = None
+        self._queue: deque[Ticket] = deque()
+        self._running: set[Ticket] = set()
+        self._per_session: Counter[str] = Counter()
+        self._slots: dict[tuple[str, str], Ticket] = {}
+        self._waits: deque[float] = deque(maxlen=WAIT_WINDOW)
+        self._counts: Counter[str] = Counter()
+        self._lock = threading.RLock()
+
+    def submit(self, session: str, slot: str, fn: Callable[..., Any], *args: Any) -> Ticket:
+        """Queue ``fn(*args)`` for ``session``, replacing its queued render in ``slot``.
+
+        ``fn`` and ``args`` must be picklable for process executors. Raises
+        ``QueueFull`` when ``max_queue`` renders are already waiting.
+        """
+        ticket = Ticket(self, session, slot, fn, args)
+        with self._lock:
+            previous = self._slots.get((session, slot))
+            if previous is not None and self._drop(previous):
+                self._counts["superseded"] += 1
+            if len(self._queue) >= self.max_queue:
+                self._counts["rejected"] += 1
+                raise QueueFull(f"{len(self._queue)} renders already queued")
+            self._slots[(session, slot)] = ticket
+            self._queue.append(ticket)
+            self._counts["submitted"] += 1
+            self._dispatch()
+        return ticket
+
+    def cancel(self, ticket: Ticket) -> bool:
+        with self._lock:
+            dropped = self._drop(ticket)
+            if dropped:
+                self._counts["cancelled"] += 1
+            return dropped
+
+    def position(self, ticket: Ticket) -> int | None:
+        with self._lock:
+            try:
+                return self._queue.index(ticket)
+            except ValueError:
+                return None
+
+    def _drop(self, ticket: Ticket) -> bool:
+        if ticket not in self._queue:
+            return False
+        self._queue.remove(ticket)
+        self._forget(ticket)
+        ticket.future.cancel()
+        return True
+
+    def _forget(self, ticket: Ticket) -> None:
+        key = (ticket.session, ticket.slot)
+        if self._slots.get(key) is ticket:
+            del self._slots[key]
+
+    def _next(self) -> Ticket | None:
+        for ticket in self._queue:
+            if self._per_session[ticket.session] < self.per_session:
+                self._queue.remove(ticket)
+                return ticket
+        return None
+
+    def _dispatch(self) -> None:
+        while len(self._running) < self.workers:
+            ticket = self._next()
+            if ticket is None:
+                return
+            ticket.future.set_running_or_notify_cancel()
+            ticket.started = time.perf_counter()
+            self._waits.append(ticket.started - ticket.submitted)
+            self._running.add(ticket)
+            self._per_session[ticket.session] += 1
+            try:
+                if self._executor is None:
+                    self._executor = self._make_executor()
+                work = self._executor.submit(ticket.fn, *ticket.args)
+            except (BrokenExecutor, RuntimeError) as exc:
+                self._executor = None
+                work = Future()
+                work.set_exception(exc)
+            work.add_done_callback(lambda done, t=ticket: self._finished(t, done))
+
+    def _finished(self, ticket: Ticket, work: Future[Any]) -> None:
+        exc = work.exception()
+        with self._lock:
+            self._running.discard(ticket)
+            self._per_session[ticket.session] -= 1
+            if self._per_session[ticket.session] <= 0:
+                del self._per_session[ticket.session]
+            self._forget(ticket)
+            self._counts["failed" if exc else "completed"] += 1
+            if isinstance(exc, BrokenExecutor):
+                self._executor = None
+        if exc is None:
+            ticket.future.set_result(work.result())
+        else:
+            ticket.future.set_exception(exc)
+        with self._lock:
+            self._dispatch()
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            waits = list(self._waits)
+            return PoolStats(
+                workers=self.workers,
+                queued=len(self._queue),
+                running=len(self._running),
+                submitted=self._counts["submitted"],
+                completed=self._counts["completed"],
+                failed=self._counts["failed"],
+                cancelled=self._counts["cancelled"],
+                superseded=self._counts["superseded"],
+                rejected=self._counts["rejected"],
+                wait_mean_ms=sum(waits) / len(waits) * 1000 if waits else 0.0,
+                wait_max_ms=max(waits) * 1000 if waits else 0.0,
+            )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for ticket in list(self._queue):
+                self._drop(ticket)
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)